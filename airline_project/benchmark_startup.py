@@ -0,0 +1,95 @@
+"""
+Startup benchmark for the settings profiles.
+
+Boots a fresh interpreter per run for each SETTINGS_PROFILE and measures:
+
+- setup: importing Django, loading settings and apps and building the WSGI
+  handler (what every worker pays before serving anything)
+- first request: the first GET through the WSGI handler, which resolves and
+  imports the URLconf, views and serializers
+- warm request: the mean of the following requests
+- modules: the number of imported modules after the first request
+
+Run from the project root with the usual environment (.env) in place:
+
+    python -m airline_project.benchmark_startup --runs 5 --path /api/airplanes/
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROFILES = ('full', 'api')
+
+# Executed in a fresh interpreter so nothing is imported before timing starts
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+setup = time.perf_counter() - start
+
+from django.test.client import RequestFactory
+path, accept, warm = sys.argv[1], sys.argv[2], int(sys.argv[3])
+environ = RequestFactory().get(path, HTTP_HOST='localhost', HTTP_ACCEPT=accept).environ
+statuses = []
+
+def start_response(status, headers, exc_info=None):
+    statuses.append(status)
+
+def request():
+    began = time.perf_counter()
+    b''.join(application(dict(environ), start_response))
+    return time.perf_counter() - began
+
+first = request()
+warm_total = sum(request() for _ in range(warm))
+print(json.dumps({
+    'setup': setup,
+    'first': first,
+    'warm': warm_total / warm if warm else 0,
+    'modules': len(sys.modules),
+    'status': statuses[0],
+}))
+'''
+
+
+def run_once(profile, path, accept, warm):
+    env = dict(os.environ, SETTINGS_PROFILE=profile)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'airline_project.settings')
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD, path, accept, str(warm)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare worker startup across settings profiles.')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per profile (median is reported)')
+    parser.add_argument('--warm', type=int, default=20, help='Requests timed after the first one')
+    parser.add_argument('--path', default='/api/airplanes/', help='Path requested through the WSGI handler')
+    parser.add_argument(
+        '--accept', default='text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        help='Accept header (the default is what a browser sends, which selects the browsable API if enabled)'
+    )
+    options = parser.parse_args(argv)
+
+    print(f'{options.runs} run(s) per profile, GET {options.path} (Accept: {options.accept})')
+    print(f'{"profile":<8} {"setup ms":>9} {"first ms":>9} {"warm ms":>8} {"modules":>8}  status')
+    for profile in PROFILES:
+        runs = [run_once(profile, options.path, options.accept, options.warm) for _ in range(options.runs)]
+        print(
+            f'{profile:<8} '
+            f'{statistics.median(r["setup"] for r in runs) * 1000:>9.1f} '
+            f'{statistics.median(r["first"] for r in runs) * 1000:>9.1f} '
+            f'{statistics.median(r["warm"] for r in runs) * 1000:>8.2f} '
+            f'{statistics.median(r["modules"] for r in runs):>8.0f}  '
+            f'{runs[0]["status"]}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Compound documents: ``?expand=airplane,reservations``.
+
+A viewset declares the related objects it can embed in ``expansions``. Each
+``Expansion`` names the serializer used for the embedded data and how the
+queryset loads it (``select_related`` for a join, ``Prefetch`` for a second
+query), so an expanded list costs a fixed number of queries however many
+rows it returns. Dotted names expand inside an expanded object
+(``flight.airplane``) and imply their parent; nesting is limited to
+MAX_EXPAND_DEPTH levels. To-many expansions are capped per object, with the
+cap adjustable up to ``max_limit`` through ``?<name>_limit=``.
+"""
+from rest_framework.exceptions import ValidationError
+
+MAX_EXPAND_DEPTH = 2
+
+
+class Expansion:
+    """One ``?expand=`` option of a viewset."""
+
+    def __init__(self, serializer_class, prepare=None, source=None, many=False,
+                 prefetched=False, default_limit=20, max_limit=100):
+        self.serializer_class = serializer_class
+        # prepare(queryset, limit) -> queryset that loads the related data
+        self.prepare = prepare
+        self.source = source
+        self.many = many
+        # Loaded by prefetch_related, so it adds no columns to the main query
+        self.prefetched = prefetched or many
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+    def build_field(self):
+        kwargs = {'read_only': True, 'many': self.many}
+        if self.source:
+            kwargs['source'] = self.source
+        field = self.serializer_class(**kwargs)
+        field.prefetched = self.prefetched
+        return field
+
+
+class ExpandMixin:
+    """
+    Viewset mixin adding the ``expand`` query parameter to list and retrieve.
+
+    Unknown or too deeply nested expansions are rejected with 400.
+    """
+    expansions = {}
+    expand_actions = ('list', 'retrieve')
+
+    def get_expansions(self):
+        """Return the requested expansion names, parents before children."""
+        if not hasattr(self, '_expansions'):
+            self._expansions = []
+            value = self.request.query_params.get('expand') if self.action in self.expand_actions else None
+            if value:
+                names = set()
+                for name in (name.strip() for name in value.split(',')):
+                    if not name:
+                        continue
+                    parts = name.split('.')
+                    if len(parts) > MAX_EXPAND_DEPTH:
+                        raise ValidationError({'expand': f'Expansions can be nested at most {MAX_EXPAND_DEPTH} levels.'})
+                    if name not in self.expansions:
+                        raise ValidationError({
+                            'expand': f'Unknown expansion: {name}. Available: {", ".join(self.expansions)}.'
+                        })
+                    # Expanding a nested object implies expanding its parent
+                    names.update('.'.join(parts[:depth]) for depth in range(1, len(parts) + 1))
+                self._expansions = sorted(names, key=lambda name: (name.count('.'), name))
+        return self._expansions
+
+    def get_expand_limit(self, name):
+        """Return the per-object cap of a to-many expansion (``?<name>_limit=``)."""
+        expansion = self.expansions[name]
+        param = f'{name.split(".")[-1]}_limit'
+        value = self.request.query_params.get(param)
+        if value is None:
+            return expansion.default_limit
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValidationError({param: 'Must be an integer.'})
+        return max(1, min(limit, expansion.max_limit))
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        for name in self.get_expansions():
+            parent = getattr(serializer, 'child', serializer)
+            *path, leaf = name.split('.')
+            for part in path:
+                field = parent.fields[part]
+                parent = getattr(field, 'child', field)
+            parent.fields[leaf] = self.expansions[name].build_field()
+        return serializer
+
+    def filter_queryset(self, queryset):
+        """Load the related data of every requested expansion."""
+        queryset = super().filter_queryset(queryset)
+        for name in self.get_expansions():
+            expansion = self.expansions[name]
+            if expansion.prepare:
+                limit = self.get_expand_limit(name) if expansion.many else None
+                queryset = expansion.prepare(queryset, limit)
+        return queryset
@@ -0,0 +1,128 @@
+"""
+Sparse fieldsets for the API viewsets.
+
+``?fields=id,reservation_code,status`` on a list or retrieve request limits
+the response to those fields. The other fields are removed from the
+serializer, so computed fields that were not asked for are never evaluated,
+and the queryset is narrowed with ``.only()`` to the columns the remaining
+fields read (joins that are no longer needed are dropped as well).
+
+Columns are derived from each field's ``source``. Fields computed from
+several columns (``SerializerMethodField`` and the like) declare them in the
+serializer's ``Meta.field_columns``; a computed field without a declaration
+disables column pruning for that request. Objects embedded with ``?expand=``
+and loaded by a prefetch only need their foreign key. Annotations are the
+viewset's job: it should only add them when ``wants_field()`` says a
+requested field needs them.
+"""
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def serializer_columns(serializer, names, prefix=''):
+    """
+    Return the model columns (``__`` paths) needed to serialize ``names``.
+
+    Returns None if some field's columns cannot be determined.
+    """
+    declared = getattr(getattr(serializer, 'Meta', None), 'field_columns', {})
+    columns = set()
+    for name in names:
+        field = serializer.fields[name]
+        if name in declared:
+            columns.update(prefix + column for column in declared[name])
+            continue
+
+        if field.source == '*':
+            return None
+        path = prefix + '__'.join(field.source_attrs)
+
+        # Loaded by a separate prefetch query (see airline_project.expansions)
+        if getattr(field, 'prefetched', False):
+            if not isinstance(field, serializers.ListSerializer):
+                columns.add(path)
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            nested = getattr(field, 'child', field)
+            nested_columns = serializer_columns(nested, list(nested.fields), path + '__')
+            if nested_columns is None:
+                return None
+            columns.update(nested_columns)
+        columns.add(path)
+    return columns
+
+
+def _relations(columns):
+    """Return the ``select_related()`` paths traversed by ``columns``."""
+    relations = set()
+    for column in columns:
+        parts = column.split('__')
+        for depth in range(1, len(parts)):
+            relations.add('__'.join(parts[:depth]))
+    return relations
+
+
+class SparseFieldsetMixin:
+    """
+    Viewset mixin adding the ``fields`` query parameter.
+
+    Unknown field names are rejected with 400.
+    """
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def get_requested_fields(self):
+        """Return the requested field names in order, or None for all fields."""
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = None
+            value = self.request.query_params.get('fields') if self.action in self.sparse_fieldset_actions else None
+            if value is not None:
+                names = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+                if not names:
+                    raise ValidationError({'fields': 'Provide at least one field name.'})
+                self._requested_fields = names
+        return self._requested_fields
+
+    def wants_field(self, *names):
+        """Return True if any of ``names`` will be serialized."""
+        requested = self.get_requested_fields()
+        return requested is None or any(name in requested for name in names)
+
+    def _sparse_serializer(self, serializer):
+        """Drop every unrequested field from ``serializer`` (or its child)."""
+        requested = self.get_requested_fields()
+        target = getattr(serializer, 'child', serializer)
+        unknown = [name for name in requested if name not in target.fields]
+        if unknown:
+            raise ValidationError({
+                'fields': f'Unknown field(s): {", ".join(unknown)}. '
+                          f'Available: {", ".join(target.fields)}.'
+            })
+        for name in list(target.fields):
+            if name not in requested:
+                target.fields.pop(name)
+        return serializer
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.get_requested_fields() is not None:
+            self._sparse_serializer(serializer)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        """Restrict the queryset to the columns of the requested fields."""
+        queryset = super().filter_queryset(queryset)
+        requested = self.get_requested_fields()
+        if requested is None:
+            return queryset
+
+        columns = serializer_columns(self.get_serializer(), requested)
+        if columns is None:
+            return queryset
+
+        # select_related() with no arguments would follow every relation
+        queryset = queryset.select_related(None)
+        relations = _relations(columns)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*columns)
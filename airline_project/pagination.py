@@ -1,6 +1,12 @@
 """
 Custom pagination classes for the Airline Management System API.
 """
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
@@ -38,3 +44,67 @@ class CustomPageNumberPagination(PageNumberPagination):
             'previous': self.page.previous_page_number() if self.page.has_previous() else None,
             'results': data
         })
+
+
+class KeysetPagination:
+    """
+    Keyset (seek) pagination over a unique ``(field, id)`` ordering, where
+    ``field`` is a datetime.
+
+    Instead of OFFSET/COUNT, each page is fetched with
+    ``WHERE (field, id) > (last_field, last_id) ORDER BY field, id LIMIT n``,
+    so every page costs the same index range scan no matter how deep it is.
+
+    Query Parameters:
+    - cursor: Opaque cursor from the previous page's ``next_cursor``
+    - limit: Number of items per page (default: 20, max: 100)
+    """
+    page_size = 20
+    max_page_size = 100
+
+    def __init__(self, field, descending=False):
+        self.field = field
+        self.descending = descending
+
+    def _encode(self, obj):
+        value = getattr(obj, self.field)
+        raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value, obj.pk])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def _decode(self, cursor):
+        """Return the ``(datetime, pk)`` position in ``cursor``; 400 if it is malformed."""
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            # parse_datetime() raises ValueError for well-formed but impossible dates
+            parsed = parse_datetime(value) if isinstance(value, str) else None
+        except (ValueError, TypeError):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        if parsed is None or not isinstance(pk, int) or isinstance(pk, bool):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        return parsed, pk
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(limit, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request):
+        """Return ``(items, next_cursor)`` for the page requested by ``request``."""
+        limit = self.get_limit(request)
+        direction = '-' if self.descending else ''
+        queryset = queryset.order_by(f'{direction}{self.field}', f'{direction}pk')
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            value, pk = self._decode(cursor)
+            after = 'lt' if self.descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{after}': value}) |
+                Q(**{self.field: value, f'pk__{after}': pk})
+            )
+
+        items = list(queryset[:limit + 1])
+        next_cursor = self._encode(items[limit - 1]) if len(items) > limit else None
+        return items[:limit], next_cursor
@@ -0,0 +1,150 @@
+"""
+OpenAPI schema served from a precomputed document.
+
+Generating the schema introspects every viewset and serializer, so it is done
+once per deploy rather than on every request. The document is read from
+settings.OPENAPI_SCHEMA_FILE, which the deploy writes with drf-spectacular's
+own command:
+
+    python manage.py spectacular --format openapi-json --file openapi-schema.json
+
+Generated documents carry settings.BUILD_VERSION in ``info.x-build-version``,
+and a file stamped with another build is never served: the full profile
+regenerates it, api workers answer 503. If the file is missing or stale, the
+first request generates the schema and writes the file, but only when
+BUILD_VERSION is set (otherwise a leftover file could not be told apart from
+a current one, so the full profile never reads it). Either way the document
+is then kept in memory, rendered once per format
+(YAML by default, JSON with ``?format=json`` or a JSON Accept header), and
+served with an ETag so clients can revalidate and get 304 Not Modified.
+drf-spectacular is only imported to generate the schema or render YAML.
+
+The 'api' settings profile does not load drf-spectacular's AutoSchema at all,
+so its workers only serve the file written at deploy time (run the command
+above with SETTINGS_PROFILE=full). With DEBUG on (full profile), the file is
+ignored so the schema always matches the running code.
+"""
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    'yaml': 'application/vnd.oai.openapi',
+    'json': 'application/vnd.oai.openapi+json',
+}
+
+_lock = threading.Lock()
+_rendered = {}  # format -> (body, etag)
+
+
+def generate_schema():
+    """Generate the OpenAPI document and return it as JSON bytes."""
+    from drf_spectacular.renderers import OpenApiJsonRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+def _write_schema_file(path, body):
+    """Atomically write ``body`` to ``path``; a read-only filesystem only costs the disk cache."""
+    try:
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f'.{path.name}.', delete=False) as f:
+            f.write(body)
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+        logger.info(f'OpenAPI schema written to {path}')
+    except OSError as e:
+        logger.warning(f'Could not write OpenAPI schema to {path}: {e}')
+
+
+def _build_version(body):
+    """Return the build a schema document was generated for, or None if unreadable."""
+    try:
+        return json.loads(body).get('info', {}).get('x-build-version', '')
+    except (ValueError, AttributeError):
+        return None
+
+
+def _load_schema():
+    """Return the JSON schema from the schema file, generating (and saving) it if needed."""
+    path = Path(settings.OPENAPI_SCHEMA_FILE)
+    can_generate = apps.is_installed('drf_spectacular')
+    versioned = bool(settings.BUILD_VERSION)
+    if path.exists() and not (can_generate and (settings.DEBUG or not versioned)):
+        body = path.read_bytes()
+        found = _build_version(body)
+        if found == settings.BUILD_VERSION:
+            return body
+        if not can_generate:
+            raise ImproperlyConfigured(
+                f'OpenAPI schema file {path} was generated for build {found!r}, '
+                f'not {settings.BUILD_VERSION!r}; regenerate it on deploy.'
+            )
+        logger.info(f'OpenAPI schema file {path} is from build {found!r}; regenerating')
+    if not can_generate:
+        raise ImproperlyConfigured(f'OpenAPI schema file {path} is missing; generate it on deploy.')
+    body = generate_schema()
+    if settings.DEBUG or not versioned:
+        return body
+    _write_schema_file(path, body)
+    return body
+
+
+def get_schema(fmt):
+    """Return ``(body, etag)`` of the schema rendered as ``fmt`` ('json' or 'yaml')."""
+    if fmt in _rendered:
+        return _rendered[fmt]
+
+    with _lock:
+        if 'json' not in _rendered:
+            body = _load_schema()
+            _rendered['json'] = (body, f'"{hashlib.sha256(body).hexdigest()}"')
+        if fmt == 'yaml' and 'yaml' not in _rendered:
+            from drf_spectacular.renderers import OpenApiYamlRenderer
+
+            body = OpenApiYamlRenderer().render(json.loads(_rendered['json'][0]), renderer_context={})
+            _rendered['yaml'] = (body, f'"{hashlib.sha256(body).hexdigest()}"')
+    return _rendered[fmt]
+
+
+def _requested_format(request):
+    fmt = request.GET.get('format')
+    if fmt in CONTENT_TYPES:
+        return fmt
+    return 'json' if 'json' in request.headers.get('Accept', '') else 'yaml'
+
+
+@require_safe
+def schema_view(request):
+    """Serve the cached OpenAPI schema, honouring If-None-Match."""
+    fmt = _requested_format(request)
+    try:
+        body, etag = get_schema(fmt)
+    except ImproperlyConfigured as e:
+        logger.error(str(e))
+        return JsonResponse({'error': 'OpenAPI schema is not available.'}, status=503)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    return HttpResponse(body, content_type=f'{CONTENT_TYPES[fmt]}; charset=utf-8', headers=headers)
@@ -11,7 +11,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,6 +30,16 @@ DEBUG = config('DEBUG', default=False, cast=bool)
 
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1', cast=Csv())
 
+# Settings profile
+# - 'full' (default): everything, including the admin, browsable API, API docs UIs and django-extensions
+# - 'api': lean profile for production API workers; keeps only what the JSON API needs
+#   (no admin, sessions, messages, static files, browsable API or docs UIs) so workers
+#   boot faster and never render HTML. The OpenAPI schema stays available, loaded on first use.
+SETTINGS_PROFILE = config('SETTINGS_PROFILE', default='full')
+if SETTINGS_PROFILE not in ('full', 'api'):
+    raise ImproperlyConfigured("SETTINGS_PROFILE must be 'full' or 'api'.")
+API_ONLY = SETTINGS_PROFILE == 'api'
+
 
 # Application definition
 
@@ -49,6 +61,8 @@ INSTALLED_APPS = [
     'airplanes',
     'flights',
     'reservations',
+    'analytics',
+    'changes',
 ]
 
 MIDDLEWARE = [
@@ -62,6 +76,25 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if API_ONLY:
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS
+        if app not in (
+            'django.contrib.admin',
+            'django.contrib.sessions',
+            'django.contrib.messages',
+            'django.contrib.staticfiles',
+            'django_extensions',
+            'drf_spectacular',
+        )
+    ]
+    # Sessions, auth, messages and CSRF only serve the admin and the browsable API
+    MIDDLEWARE = [
+        'django.middleware.security.SecurityMiddleware',
+        'corsheaders.middleware.CorsMiddleware',
+        'django.middleware.common.CommonMiddleware',
+    ]
+
 ROOT_URLCONF = 'airline_project.urls'
 
 TEMPLATES = [
@@ -148,8 +181,62 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    # Booking rate limits (see reservations/throttling.py); counters are kept in the
+    # default cache, so use a shared CACHE_BACKEND to enforce them across workers
+    'DEFAULT_THROTTLE_RATES': {
+        'booking': config('BOOKING_RATE', default='30/min'),
+        'flight_booking': config('FLIGHT_BOOKING_RATE', default='600/min'),
+    },
+}
+
+if API_ONLY:
+    # JSON only, and no session lookup on every request (the API is unauthenticated)
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ['rest_framework.renderers.JSONRenderer']
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = []
+    # The schema is precomputed on deploy (see airline_project/schema.py), so views
+    # don't need drf-spectacular's AutoSchema, which DRF would otherwise import on first request
+    REST_FRAMEWORK['DEFAULT_SCHEMA_CLASS'] = 'rest_framework.schemas.inspectors.ViewInspector'
+    # Templates only render emails, which need no request context
+    TEMPLATES[0]['OPTIONS']['context_processors'] = []
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Defaults to a per-process memory cache; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache) in production
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='airline-cache'),
+    }
 }
 
+# Seconds a serialized reservation stays in the by-code lookup cache
+RESERVATION_CACHE_TTL = config('RESERVATION_CACHE_TTL', default=300, cast=int)
+
+# Seconds analytics results are cached (one cache bucket)
+ANALYTICS_CACHE_TTL = config('ANALYTICS_CACHE_TTL', default=60, cast=int)
+
+# Seconds between availability stream updates; changes within one interval
+# are coalesced into a single event per flight
+AVAILABILITY_STREAM_INTERVAL = config('AVAILABILITY_STREAM_INTERVAL', default=1, cast=float)
+
+# Seconds a stored Idempotency-Key response is replayed for retries
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=86400, cast=int)
+
+# Seat holds
+# Number of seconds a checkout seat hold counts against flight capacity
+SEAT_HOLD_TTL = config('SEAT_HOLD_TTL', default=600, cast=int)
+
+# Booking load protection (see reservations/throttling.py)
+# Seconds a flight stays marked sold out after a booking failed on capacity
+SOLD_OUT_CACHE_TTL = config('SOLD_OUT_CACHE_TTL', default=30, cast=int)
+# Booking requests one worker runs at once (0 disables load shedding)
+BOOKING_CONCURRENCY_LIMIT = config('BOOKING_CONCURRENCY_LIMIT', default=32, cast=int)
+# Average query time (ms) above which the concurrency limit shrinks
+BOOKING_DB_LATENCY_THRESHOLD = config('BOOKING_DB_LATENCY_THRESHOLD', default=50, cast=float)
+# Retry-After (seconds) sent with 503 responses when a booking is shed
+BOOKING_RETRY_AFTER = config('BOOKING_RETRY_AFTER', default=1, cast=int)
+
 # CORS Settings
 # https://github.com/adamchainz/django-cors-headers
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only allow all origins in development
@@ -157,6 +244,7 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')  # Retry-safe POSTs
 
 # API Documentation with drf-spectacular
 # https://drf-spectacular.readthedocs.io/
@@ -167,6 +255,15 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# Identifier of the deployed build (e.g. the git commit). Generated schemas are
+# stamped with it, and a schema file from another build is not served.
+BUILD_VERSION = config('BUILD_VERSION', default='')
+SPECTACULAR_SETTINGS['EXTENSIONS_INFO'] = {'x-build-version': BUILD_VERSION}
+
+# Precomputed OpenAPI schema served by /api/schema/ (see airline_project/schema.py)
+# Regenerate on deploy: python manage.py spectacular --format openapi-json --file <this path>
+OPENAPI_SCHEMA_FILE = config('OPENAPI_SCHEMA_FILE', default=str(BASE_DIR / 'openapi-schema.json'))
+
 
 # Email Configuration
 # https://docs.djangoproject.com/en/5.2/topics/email/
@@ -0,0 +1,81 @@
+"""
+Fixtures shared by the apps' test modules.
+
+Each created flight gets its own four hour slot, so flights created for the
+same airplane never trip the one hour turnaround check.
+"""
+from datetime import timedelta
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from airplanes.models import Airplane
+from flights.models import Flight
+from reservations.models import Reservation
+
+_sequence = count(1)
+
+
+def create_airplane(capacity=150, **kwargs):
+    number = next(_sequence)
+    return Airplane.objects.create(**{
+        'tail_number': f'N{number:04d}',
+        'model': 'A320',
+        'capacity': capacity,
+        'production_year': 2010,
+        **kwargs,
+    })
+
+
+def create_flight(airplane=None, departure_time=None, duration=timedelta(hours=2), **kwargs):
+    number = next(_sequence)
+    if departure_time is None:
+        departure_time = timezone.now() + timedelta(days=1, hours=4 * number)
+    return Flight.objects.create(**{
+        'flight_number': f'AB{number:04d}',
+        'departure': 'AAA',
+        'destination': 'BBB',
+        'departure_time': departure_time,
+        'arrival_time': departure_time + duration,
+        'airplane': airplane or create_airplane(),
+        **kwargs,
+    })
+
+
+def create_reservation(flight, **kwargs):
+    number = next(_sequence)
+    return Reservation.objects.create(**{
+        'flight': flight,
+        'passenger_name': 'Jane Doe',
+        'passenger_email': f'jane{number}@example.com',
+        **kwargs,
+    })
+
+
+class APITestCase(TestCase):
+    """TestCase starting every test with an empty cache (rate limits, sold-out markers, payloads)."""
+
+    def setUp(self):
+        cache.clear()
+
+
+class AdminTestCase(APITestCase):
+    """TestCase logged in to the admin as a superuser."""
+
+    def setUp(self):
+        super().setUp()
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+
+    def assertConstantQueries(self, url, add_rows):
+        """Assert that ``url`` runs as many queries after ``add_rows()`` as before."""
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        add_rows()
+        with self.assertNumQueries(len(queries)):
+            self.assertEqual(self.client.get(url).status_code, 200)
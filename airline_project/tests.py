@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+# Settings are read once per process, so each profile is loaded in a fresh interpreter
+PROBE = """
+import django
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+django.setup()
+for path in ('/admin/', '/api/docs/', '/api/redoc/', '/api/schema/', '/api/flights/'):
+    try:
+        resolve(path)
+        print(path, 'found')
+    except Resolver404:
+        print(path, 'missing')
+print('renderers', ','.join(settings.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']))
+"""
+
+
+class SettingsProfileTests(SimpleTestCase):
+
+    def probe(self, profile):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'airline_project.settings', 'SETTINGS_PROFILE': profile}
+        return subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+
+    def routes(self, profile):
+        result = self.probe(profile)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return dict(line.split(' ', 1) for line in result.stdout.splitlines())
+
+    def test_full_profile(self):
+        routes = self.routes('full')
+        for path in ('/admin/', '/api/docs/', '/api/redoc/', '/api/schema/', '/api/flights/'):
+            self.assertEqual(routes[path], 'found', path)
+        self.assertIn('BrowsableAPIRenderer', routes['renderers'])
+
+    def test_api_profile_drops_admin_and_docs_uis(self):
+        routes = self.routes('api')
+        for path in ('/admin/', '/api/docs/', '/api/redoc/'):
+            self.assertEqual(routes[path], 'missing', path)
+        for path in ('/api/schema/', '/api/flights/'):
+            self.assertEqual(routes[path], 'found', path)
+        self.assertEqual(routes['renderers'], 'rest_framework.renderers.JSONRenderer')
+
+    def test_unknown_profile(self):
+        result = self.probe('lean')
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("SETTINGS_PROFILE must be 'full' or 'api'.", result.stderr)
@@ -0,0 +1,41 @@
+"""
+Detection of which fields a model save actually changes.
+
+Signal handlers that do expensive follow-up work (waitlist promotion, cache
+eviction, capacity re-resolution) only need it when particular columns
+change, so ``save()`` records the changed ones on the instance first.
+"""
+
+
+def changed_fields(instance, fields, update_fields=None):
+    """
+    Return the names in ``fields`` whose value the upcoming save of ``instance`` changes.
+
+    Every name counts as changed for a new row. Otherwise the stored values
+    are read with one primary key lookup, skipped entirely when
+    ``update_fields`` leaves none of ``fields`` to write.
+    """
+    if instance._state.adding or instance.pk is None:
+        return set(fields)
+
+    attnames = {name: instance._meta.get_field(name).attname for name in fields}
+    if update_fields is not None:
+        written = {instance._meta.get_field(name).attname for name in update_fields}
+        attnames = {name: attname for name, attname in attnames.items() if attname in written}
+        if not attnames:
+            return set()
+
+    stored = type(instance)._base_manager.filter(pk=instance.pk).values(*attnames.values()).first()
+    if stored is None:
+        return set(attnames)
+    return {name for name, attname in attnames.items() if stored[attname] != getattr(instance, attname)}
+
+
+def saved_changes(instance):
+    """
+    Return the tracked fields the last ``save()`` of ``instance`` changed.
+
+    For use in post_save handlers; every tracked field counts as changed when
+    ``save()`` was bypassed (``loaddata`` calls ``save_base()`` directly).
+    """
+    return getattr(instance, 'changed_fields', set(instance.TRACKED_FIELDS))
@@ -5,50 +5,28 @@ This file defines the main URL routing for the entire project.
 It includes all app URLs and additional features like admin and API documentation.
 """
 
-# Import Django's admin interface
-from django.contrib import admin
+# Import apps registry to check which optional apps are installed
+# (the lean 'api' settings profile leaves out the admin and the docs UIs)
+from django.apps import apps
 
 # Import path and include functions for URL routing
 # - path(): Creates a URL pattern
 # - include(): Includes URL patterns from other files
 from django.urls import path, include
 
-# Import drf-spectacular views for API documentation
-# These provide Swagger/OpenAPI documentation for your API
-from drf_spectacular.views import (
-    SpectacularAPIView,  # Generates OpenAPI schema
-    SpectacularRedocView,  # ReDoc documentation UI
-    SpectacularSwaggerView,  # Swagger UI documentation
-)
+# OpenAPI schema view; serves a precomputed, cached schema (see airline_project/schema.py)
+from airline_project.schema import schema_view
 
 # Define URL patterns
 # urlpatterns is a list of URL patterns that Django will try to match
 # Django checks these patterns in order from top to bottom
 urlpatterns = [
-    # Django Admin Interface
-    # URL: /admin/
-    # This provides a web interface for managing your database
-    path('admin/', admin.site.urls),
-
-    # API Documentation URLs (using drf-spectacular)
-    # These provide interactive documentation for testing your API
-
     # OpenAPI Schema (JSON format)
     # URL: /api/schema/
-    # This returns the API specification in OpenAPI format
+    # This returns the API specification in OpenAPI format (YAML, or JSON with ?format=json)
     # You can download this file and import it into Postman
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-
-    # Swagger UI Documentation
-    # URL: /api/docs/
-    # This provides an interactive web interface for testing your API
-    # You can see all endpoints and try them directly from your browser
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-
-    # ReDoc Documentation (alternative UI)
-    # URL: /api/redoc/
-    # Another documentation interface with a different style
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    # The schema is generated once per deploy and served with an ETag
+    path('api/schema/', schema_view, name='schema'),
 
     # API Endpoints
     # include(): Includes all URL patterns from the specified app
@@ -68,11 +46,54 @@ urlpatterns = [
     # URL: /api/reservations/...
     # Includes: /api/reservations/, /api/reservations/{id}/, /api/reservations/{id}/cancel/
     path('api/', include('reservations.urls')),
+
+    # Analytics API endpoints
+    # URL: /api/analytics/...
+    # Includes: /api/analytics/load-factor/, /api/analytics/daily-stats/,
+    #           /api/analytics/fleet-utilization/
+    path('api/', include('analytics.urls')),
+
+    # Change feed endpoint
+    # URL: /api/changes/...
+    # Includes: /api/changes/?since=<cursor>
+    path('api/', include('changes.urls')),
 ]
 
+# Django Admin Interface (full profile only)
+# URL: /admin/
+# This provides a web interface for managing your database
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+# API Documentation UIs (using drf-spectacular, full profile only)
+# These provide interactive documentation for testing your API
+if apps.is_installed('drf_spectacular'):
+    from drf_spectacular.views import (
+        SpectacularRedocView,  # ReDoc documentation UI
+        SpectacularSwaggerView,  # Swagger UI documentation
+    )
+
+    urlpatterns += [
+        # Swagger UI Documentation
+        # URL: /api/docs/
+        # This provides an interactive web interface for testing your API
+        # You can see all endpoints and try them directly from your browser
+        path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+
+        # ReDoc Documentation (alternative UI)
+        # URL: /api/redoc/
+        # Another documentation interface with a different style
+        path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    ]
+
 """
 Summary of all available endpoints:
 
+List and detail GETs of airplanes, flights and reservations accept ?fields=a,b,c
+Flights accept ?expand=airplane,reservations; reservations accept ?expand=flight,flight.airplane
+
 AIRPLANES:
 - GET    /api/airplanes/              - List all airplanes
 - POST   /api/airplanes/              - Create new airplane
@@ -80,14 +101,19 @@ AIRPLANES:
 - PATCH  /api/airplanes/{id}/         - Update airplane
 - DELETE /api/airplanes/{id}/         - Delete airplane
 - GET    /api/airplanes/{id}/flights/ - Get flights for airplane
+- POST   /api/airplanes/{id}/archive/ - Archive airplane
 
 FLIGHTS:
 - GET    /api/flights/                    - List all flights (supports filtering)
 - POST   /api/flights/                    - Create new flight
 - GET    /api/flights/{id}/               - Get flight details
 - PATCH  /api/flights/{id}/               - Update flight
-- DELETE /api/flights/{id}/               - Delete flight
+- DELETE /api/flights/{id}/               - Archive flight (soft delete)
 - GET    /api/flights/{id}/reservations/  - Get reservations for flight
+- GET    /api/flights/connections/        - Search connecting itineraries
+- GET    /api/flights/availability/stream/ - Live seat availability (Server-Sent Events, ASGI)
+- POST   /api/flights/disrupt/            - Delay/retime flights with knock-on propagation
+- GET    /api/flights/batch/?ids=         - Get many flights by ID
 
 RESERVATIONS:
 - GET    /api/reservations/            - List all reservations
@@ -95,10 +121,33 @@ RESERVATIONS:
 - GET    /api/reservations/{id}/       - Get reservation details
 - PATCH  /api/reservations/{id}/       - Update reservation
 - POST   /api/reservations/{id}/cancel/ - Cancel reservation
+- GET    /api/reservations/timeline/   - Passenger booking timeline
+- GET    /api/reservations/by-code/{code}/ - Get reservation by code (cached)
+- POST   /api/reservations/bulk-cancel/ - Cancel many reservations
+- GET    /api/reservations/batch/?codes= - Get many reservations by code (cached)
+
+SEAT HOLDS:
+- POST   /api/holds/                   - Hold seats during checkout
+- GET    /api/holds/{token}/           - Get hold details
+- DELETE /api/holds/{token}/           - Release held seats
+- POST   /api/holds/{token}/confirm/   - Convert a held seat into a reservation
+
+WAITLIST:
+- POST   /api/waitlist/                - Join the waitlist of a fully booked flight
+- GET    /api/waitlist/{id}/           - Get entry status and queue position
+- DELETE /api/waitlist/{id}/           - Leave the waitlist
+
+ANALYTICS:
+- GET    /api/analytics/load-factor/   - Load factor per flight, route, airplane or day
+- GET    /api/analytics/daily-stats/   - Bookings and cancellations per day or flight
+- GET    /api/analytics/fleet-utilization/ - Block hours and idle windows per airplane and day
+
+CHANGES:
+- GET    /api/changes/?since=<cursor>  - Airplane, flight and reservation changes after a cursor
 
 DOCUMENTATION:
-- GET    /api/schema/                  - OpenAPI schema (JSON)
-- GET    /api/docs/                    - Swagger UI
-- GET    /api/redoc/                   - ReDoc UI
-- GET    /admin/                       - Django Admin
+- GET    /api/schema/                  - OpenAPI schema (precomputed, ETag; ?format=json|yaml)
+- GET    /api/docs/                    - Swagger UI (full profile)
+- GET    /api/redoc/                   - ReDoc UI (full profile)
+- GET    /admin/                       - Django Admin (full profile)
 """
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db import transaction
+from flights.connections import graph_cache
 from .models import Airplane
 
 
@@ -10,10 +12,31 @@ class AirplaneAdmin(admin.ModelAdmin):
     list_filter = ['status', 'production_year']
     search_fields = ['tail_number', 'model']
     ordering = ['-production_year', 'tail_number']
-    readonly_fields = ['id']
+    readonly_fields = ['id', 'archived_at']
+    actions = ['archive_airplanes']
+
+    def get_queryset(self, request):
+        """Annotate flight counts so the changelist runs a constant number of queries."""
+        return super().get_queryset(request).with_flight_counts()
 
     def get_flight_count(self, obj):
         """Return number of flights for this airplane."""
-        return obj.flights.count()
+        return obj.flight_count
 
     get_flight_count.short_description = 'Total Flights'
+    get_flight_count.admin_order_field = 'flight_count'
+
+    def archive_airplanes(self, request, queryset):
+        """Bulk action to archive (soft delete) airplanes and hide their flights."""
+        with transaction.atomic():
+            ids = list(queryset.active().values_list('id', flat=True))
+            archived = queryset.archive()
+
+            # Their flights must stop showing up in cached connection graphs
+            def invalidate_graphs():
+                for airplane_id in ids:
+                    graph_cache.airplane_archived(airplane_id)
+            transaction.on_commit(invalidate_graphs)
+        self.message_user(request, f"{archived} airplane(s) archived successfully.")
+
+    archive_airplanes.short_description = 'Archive selected airplanes'
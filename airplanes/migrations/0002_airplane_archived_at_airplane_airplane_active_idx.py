@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airplanes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airplane',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Set when the airplane is archived (soft deleted); purged later', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='airplane',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['-production_year', 'tail_number'], name='airplane_active_idx'),
+        ),
+    ]
@@ -1,4 +1,34 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+
+from airline_project.tracking import changed_fields
+from changes.log import record_change, record_changes
+
+
+class AirplaneQuerySet(models.QuerySet):
+    """Custom queryset for Airplane with archival and flight count helpers."""
+
+    def active(self):
+        """Exclude archived airplanes (served by the partial index on active rows)."""
+        return self.filter(archived_at__isnull=True)
+
+    def archive(self):
+        """Archive every airplane in the queryset with a single UPDATE."""
+        with transaction.atomic():
+            ids = list(self.active().values_list('id', flat=True))
+            archived = self.model.objects.filter(id__in=ids).update(archived_at=timezone.now())
+            record_changes(self.model, ids, 'updated', ['archived_at'])
+        return archived
+
+    def with_flight_counts(self):
+        """Annotate each airplane with its number of non-archived flights."""
+        queryset = self.annotate(
+            flight_count=models.Count('flights', filter=models.Q(flights__archived_at__isnull=True))
+        )
+        # Meta.ordering is not applied to GROUP BY queries, so keep it explicitly
+        if not queryset.query.order_by:
+            queryset = queryset.order_by(*self.model._meta.ordering)
+        return queryset
 
 
 class Airplane(models.Model):
@@ -28,14 +58,48 @@ class Airplane(models.Model):
         help_text="Aircraft operational status (True=Active, False=Inactive)"
     )
 
+    archived_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Set when the airplane is archived (soft deleted); purged later"
+    )
+
+    objects = AirplaneQuerySet.as_manager()
+
+    # Fields whose changes the signal handlers act on (capacity, cached payloads)
+    TRACKED_FIELDS = ['capacity', 'tail_number', 'model']
+
     class Meta:
         ordering = ['-production_year', 'tail_number']
         verbose_name = "Airplane"
         verbose_name_plural = "Airplanes"
+        indexes = [
+            models.Index(
+                fields=['-production_year', 'tail_number'],
+                condition=models.Q(archived_at__isnull=True),
+                name='airplane_active_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.tail_number} ({self.model})"
 
+    def save(self, *args, **kwargs):
+        """Record which tracked fields the save changes, for the signal handlers."""
+        self.changed_fields = changed_fields(self, self.TRACKED_FIELDS, kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
+
     def is_operational(self):
         """Check if airplane is operational."""
         return self.status
+
+    def is_archived(self):
+        """Check if airplane has been archived."""
+        return self.archived_at is not None
+
+    def archive(self):
+        """Archive this airplane (soft delete) without touching its flights."""
+        self.archived_at = timezone.now()
+        Airplane.objects.filter(pk=self.pk).update(archived_at=self.archived_at)
+        record_change(self, 'updated', ['archived_at'])
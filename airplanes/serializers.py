@@ -20,9 +20,13 @@ class AirplaneSerializer(serializers.ModelSerializer):
             'total_flights',
         ]
         read_only_fields = ['id', 'total_flights']
+        # Columns read by computed fields (for ?fields= query pruning)
+        field_columns = {'total_flights': []}
 
     def get_total_flights(self, obj):
-        """Return total number of flights for this airplane."""
+        """Return total number of flights (annotated by the viewset when available)."""
+        if hasattr(obj, 'flight_count'):
+            return obj.flight_count
         return obj.flights.count()
 
     def validate_capacity(self, value):
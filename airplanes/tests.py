@@ -1,3 +1,12 @@
-from django.test import TestCase
+from airline_project.testing import AdminTestCase, create_airplane, create_flight
 
-# Create your tests here.
+
+class AirplaneAdminTests(AdminTestCase):
+
+    def test_changelist_query_count_is_constant(self):
+        def add_rows():
+            for _ in range(20):
+                create_flight(create_airplane())
+
+        add_rows()
+        self.assertConstantQueries('/admin/airplanes/airplane/', add_rows)
@@ -1,27 +1,36 @@
+from django.db import transaction
+from django.db.models import ProtectedError
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from airline_project.fieldsets import SparseFieldsetMixin
 from .models import Airplane
 from .serializers import AirplaneSerializer, AirplaneListSerializer
+from flights.connections import graph_cache
 from flights.serializers import FlightListSerializer
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing airplanes.
 
     Provides CRUD operations and custom actions for airplane management.
+    List and detail responses can be narrowed with ?fields=.
     """
-    queryset = Airplane.objects.all()
+    queryset = Airplane.objects.active()
     serializer_class = AirplaneSerializer
 
     def get_queryset(self):
         """Filter airplanes by status if provided in query params."""
-        queryset = Airplane.objects.all()
+        queryset = Airplane.objects.active()
+
+        # total_flights is only serialized outside of list views (and only if requested)
+        if self.action != 'list' and self.wants_field('total_flights'):
+            queryset = queryset.with_flight_counts()
 
         status_param = self.request.query_params.get('status')
         if status_param is not None:
@@ -41,19 +50,32 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         Delete airplane if it has no associated flights.
 
         Prevents deletion of airplanes that have flights assigned to maintain data integrity.
+        Use the archive action to retire an airplane that still has flights.
         """
         instance = self.get_object()
 
-        if instance.flights.exists():
+        # flight_count is annotated by get_queryset, so no extra query is needed
+        if instance.flight_count:
             return Response(
                 {
                     'error': f'Cannot delete airplane {instance.tail_number}. '
-                            f'It has {instance.flights.count()} associated flights.'
+                            f'It has {instance.flight_count} associated flights. '
+                            f'Archive it instead.'
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        self.perform_destroy(instance)
+        try:
+            self.perform_destroy(instance)
+        except ProtectedError:
+            # Only archived flights remain and they have not been purged yet
+            return Response(
+                {
+                    'error': f'Cannot delete airplane {instance.tail_number}. '
+                            f'It has archived flights awaiting purge. Archive it instead.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
         logger.info(f'Airplane deleted: {instance.tail_number}')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -61,7 +83,7 @@ class AirplaneViewSet(viewsets.ModelViewSet):
     def flights(self, request, pk=None):
         """Get all flights assigned to this airplane (with pagination)."""
         airplane = self.get_object()
-        flights = airplane.flights.all()
+        flights = airplane.flights.active().select_related('airplane').with_seat_counts()
 
         # Apply pagination
         page = self.paginate_queryset(flights)
@@ -72,3 +94,21 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         # Fallback if pagination is not configured
         serializer = FlightListSerializer(flights, many=True, context={'request': request})
         return Response(serializer.data)
+
+    @action(detail=True, methods=['post'], url_path='archive')
+    def archive(self, request, pk=None):
+        """
+        Archive (soft delete) this airplane and hide its flights.
+
+        This is a single-row update; archived rows are removed later by the
+        purge_archived management command.
+        """
+        airplane = self.get_object()
+        airplane.archive()
+        transaction.on_commit(lambda: graph_cache.airplane_archived(airplane.id))
+
+        logger.info(f'Airplane archived: {airplane.tail_number}')
+        return Response({
+            'message': f'Airplane {airplane.tail_number} archived successfully.',
+            'archived_at': airplane.archived_at,
+        })
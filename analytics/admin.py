@@ -0,0 +1,35 @@
+from django.contrib import admin
+from .models import DailyFlightStats, FlightLoadRollup
+
+
+@admin.register(FlightLoadRollup)
+class FlightLoadRollupAdmin(admin.ModelAdmin):
+    """Read-only admin interface for precomputed load factor rows."""
+
+    list_display = ['flight_number', 'day', 'departure', 'destination', 'tail_number', 'booked', 'capacity', 'computed_at']
+    list_filter = ['day']
+    search_fields = ['flight_number', 'tail_number', 'departure', 'destination']
+    ordering = ['day', 'flight_number']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyFlightStats)
+class DailyFlightStatsAdmin(admin.ModelAdmin):
+    """Read-only admin interface for the incremental daily booking rollup."""
+
+    list_display = ['flight', 'day', 'bookings', 'cancellations', 'updated_at']
+    list_filter = ['day']
+    list_select_related = ['flight']
+    search_fields = ['flight__flight_number']
+    ordering = ['-day']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
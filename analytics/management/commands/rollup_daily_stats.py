@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import refresh_daily_flight_stats
+
+
+class Command(BaseCommand):
+    """Fold reservations changed since the last run into the daily flight stats table."""
+
+    help = 'Incrementally refresh daily booking/cancellation stats per flight'
+
+    def handle(self, *args, **options):
+        written = refresh_daily_flight_stats()
+        self.stdout.write(self.style.SUCCESS(f'Updated {written} daily flight stats row(s).'))
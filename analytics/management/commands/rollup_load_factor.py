@@ -0,0 +1,60 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from analytics.models import FlightLoadRollup
+from analytics.queries import live_flights
+
+ROLLUP_FIELDS = [
+    'flight_number', 'departure', 'destination', 'day',
+    'airplane_id', 'tail_number', 'booked', 'capacity',
+]
+
+
+class Command(BaseCommand):
+    """
+    Precompute per-flight load factor inputs into FlightLoadRollup.
+
+    One grouped query reads the live figures and one upsert writes them, so the
+    command can run every few minutes from cron.
+    """
+
+    help = 'Refresh the flight load factor rollup table for a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First departure date, YYYY-MM-DD (default: yesterday)')
+        parser.add_argument('--end', help='Last departure date, YYYY-MM-DD (default: 30 days ahead)')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        try:
+            start_day = datetime.strptime(options['start'], '%Y-%m-%d').date() if options['start'] else today - timedelta(days=1)
+            end_day = datetime.strptime(options['end'], '%Y-%m-%d').date() if options['end'] else today + timedelta(days=30)
+        except ValueError:
+            raise CommandError('Dates must use the YYYY-MM-DD format.')
+
+        start = timezone.make_aware(datetime.combine(start_day, time.min))
+        end = timezone.make_aware(datetime.combine(end_day + timedelta(days=1), time.min))
+
+        run_started = timezone.now()
+        rows = live_flights(start, end).values('flight_id', *ROLLUP_FIELDS)
+        rollups = [FlightLoadRollup(**row) for row in rows]
+
+        with transaction.atomic():
+            FlightLoadRollup.objects.bulk_create(
+                rollups,
+                update_conflicts=True,
+                unique_fields=['flight'],
+                update_fields=ROLLUP_FIELDS + ['computed_at'],
+                batch_size=1000,
+            )
+            # Rows not touched by this run belong to archived or retimed flights
+            stale = FlightLoadRollup.objects.filter(
+                day__gte=start_day, day__lte=end_day, computed_at__lt=run_started
+            ).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up {len(rollups)} flight(s) from {start_day} to {end_day}; removed {stale} stale row(s).'
+        ))
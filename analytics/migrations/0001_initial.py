@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('airplanes', '0002_airplane_archived_at_airplane_airplane_active_idx'),
+        ('flights', '0003_flight_archived_at_alter_flight_airplane_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightLoadRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flight_number', models.CharField(max_length=20)),
+                ('departure', models.CharField(max_length=200)),
+                ('destination', models.CharField(max_length=200)),
+                ('day', models.DateField(help_text='Departure date of the flight')),
+                ('tail_number', models.CharField(max_length=20)),
+                ('booked', models.PositiveIntegerField(help_text='Active reservations when the rollup was computed')),
+                ('capacity', models.PositiveIntegerField(help_text='Airplane capacity when the rollup was computed')),
+                ('computed_at', models.DateTimeField(auto_now=True, help_text='Timestamp of the last rollup run that updated this row')),
+                ('airplane', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='airplanes.airplane')),
+                ('flight', models.OneToOneField(help_text='The flight these figures belong to', on_delete=django.db.models.deletion.CASCADE, related_name='load_rollup', to='flights.flight')),
+            ],
+            options={
+                'verbose_name': 'Flight Load Rollup',
+                'verbose_name_plural': 'Flight Load Rollups',
+                'ordering': ['day', 'flight_number'],
+                'indexes': [models.Index(fields=['day'], name='analytics_f_day_9dfcb4_idx')],
+            },
+        ),
+    ]
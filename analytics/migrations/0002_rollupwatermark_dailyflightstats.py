@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('flights', '0003_flight_archived_at_alter_flight_airplane_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Name of the rollup pipeline', max_length=100, unique=True)),
+                ('value', models.DateTimeField(blank=True, help_text='Source rows changed before this time have been processed', null=True)),
+            ],
+            options={
+                'verbose_name': 'Rollup Watermark',
+                'verbose_name_plural': 'Rollup Watermarks',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyFlightStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Date the bookings were made / cancellations happened')),
+                ('bookings', models.PositiveIntegerField(default=0, help_text='Reservations created on this day')),
+                ('cancellations', models.PositiveIntegerField(default=0, help_text='Reservations cancelled on this day')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp of the last rollup run that updated this row')),
+                ('flight', models.ForeignKey(help_text='The flight these figures belong to', on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='flights.flight')),
+            ],
+            options={
+                'verbose_name': 'Daily Flight Stats',
+                'verbose_name_plural': 'Daily Flight Stats',
+                'ordering': ['day', 'flight'],
+                'indexes': [models.Index(fields=['day'], name='analytics_d_day_41f3df_idx')],
+                'constraints': [models.UniqueConstraint(fields=('flight', 'day'), name='unique_flight_day_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_rollupwatermark_dailyflightstats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='flightloadrollup',
+            name='capacity',
+            field=models.PositiveIntegerField(help_text='Effective flight capacity when the rollup was computed'),
+        ),
+    ]
@@ -0,0 +1,129 @@
+from django.db import models
+
+
+class FlightLoadRollup(models.Model):
+    """
+    Precomputed load factor inputs for one flight.
+
+    Filled by the ``rollup_load_factor`` management command so dashboards can
+    aggregate a small summary table instead of counting reservations live.
+    Route and airplane columns are copied so reads need no joins.
+    """
+
+    flight = models.OneToOneField(
+        'flights.Flight',
+        on_delete=models.CASCADE,
+        related_name='load_rollup',
+        help_text="The flight these figures belong to"
+    )
+
+    flight_number = models.CharField(max_length=20)
+    departure = models.CharField(max_length=200)
+    destination = models.CharField(max_length=200)
+
+    day = models.DateField(
+        help_text="Departure date of the flight"
+    )
+
+    airplane = models.ForeignKey(
+        'airplanes.Airplane',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    tail_number = models.CharField(max_length=20)
+
+    booked = models.PositiveIntegerField(
+        help_text="Active reservations when the rollup was computed"
+    )
+
+    capacity = models.PositiveIntegerField(
+        help_text="Effective flight capacity when the rollup was computed"
+    )
+
+    computed_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Timestamp of the last rollup run that updated this row"
+    )
+
+    class Meta:
+        ordering = ['day', 'flight_number']
+        verbose_name = "Flight Load Rollup"
+        verbose_name_plural = "Flight Load Rollups"
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+
+    def __str__(self):
+        return f"{self.flight_number} on {self.day}: {self.booked}/{self.capacity}"
+
+
+class DailyFlightStats(models.Model):
+    """
+    Bookings and cancellations per flight per calendar day.
+
+    Maintained incrementally by ``analytics.rollups.refresh_daily_flight_stats``;
+    reporting endpoints read only this table.
+    """
+
+    flight = models.ForeignKey(
+        'flights.Flight',
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        help_text="The flight these figures belong to"
+    )
+
+    day = models.DateField(
+        help_text="Date the bookings were made / cancellations happened"
+    )
+
+    bookings = models.PositiveIntegerField(
+        default=0,
+        help_text="Reservations created on this day"
+    )
+
+    cancellations = models.PositiveIntegerField(
+        default=0,
+        help_text="Reservations cancelled on this day"
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Timestamp of the last rollup run that updated this row"
+    )
+
+    class Meta:
+        ordering = ['day', 'flight']
+        verbose_name = "Daily Flight Stats"
+        verbose_name_plural = "Daily Flight Stats"
+        constraints = [
+            models.UniqueConstraint(fields=['flight', 'day'], name='unique_flight_day_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+
+    def __str__(self):
+        return f"Flight {self.flight_id} on {self.day}: +{self.bookings} / -{self.cancellations}"
+
+
+class RollupWatermark(models.Model):
+    """High-water mark of source rows already folded into a rollup table."""
+
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Name of the rollup pipeline"
+    )
+
+    value = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Source rows changed before this time have been processed"
+    )
+
+    class Meta:
+        verbose_name = "Rollup Watermark"
+        verbose_name_plural = "Rollup Watermarks"
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
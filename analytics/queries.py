@@ -0,0 +1,98 @@
+"""
+Load factor queries.
+
+Load factor is ``active reservations / effective capacity`` (see
+``Flight.effective_capacity``; overbooked flights can exceed 1). Every grouping is
+computed by a single SQL statement: per-flight booked seats come from a
+correlated subquery (so capacities are never multiplied by a reservations
+join), groups are aggregated with GROUP BY, and rankings/route averages use
+window functions.
+
+The same aggregation runs either on live flights or on the precomputed
+``FlightLoadRollup`` table, which exposes identically named columns.
+"""
+from django.db.models import (
+    Count, F, FloatField, OuterRef, Subquery, Sum, Value, Window,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Rank, TruncDate
+
+from flights.models import Flight
+from reservations.models import Reservation
+from .models import FlightLoadRollup
+
+# Columns returned for each grouping
+GROUPINGS = {
+    'flight': ['flight_id', 'flight_number', 'departure', 'destination', 'day', 'tail_number'],
+    'route': ['departure', 'destination'],
+    'airplane': ['airplane_id', 'tail_number'],
+    'day': ['day'],
+}
+
+
+def _ratio(numerator, denominator):
+    """Divide as floats; NULL when the denominator is 0 (e.g. a capacity override of 0)."""
+    return Cast(numerator, FloatField()) / NullIf(Cast(denominator, FloatField()), Value(0.0))
+
+
+def live_flights(start, end):
+    """Return live flights departing in [start, end) annotated with load factor inputs."""
+    booked = (
+        Reservation.objects.filter(flight=OuterRef('pk'), status=True)
+        .order_by()
+        .values('flight')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Flight.objects.active().filter(
+        departure_time__gte=start,
+        departure_time__lt=end,
+    ).annotate(
+        flight_id=F('pk'),
+        day=TruncDate('departure_time'),
+        tail_number=F('airplane__tail_number'),
+        booked=Coalesce(Subquery(booked), Value(0)),
+        capacity=F('effective_capacity'),
+    )
+
+
+def rollup_flights(start, end):
+    """Return precomputed rollup rows for flights departing between the given dates."""
+    return FlightLoadRollup.objects.filter(day__gte=start.date(), day__lt=end.date())
+
+
+def load_factor(queryset, group_by):
+    """Aggregate an annotated flight queryset into load factor rows for ``group_by``."""
+    fields = GROUPINGS[group_by]
+
+    if group_by == 'flight':
+        route = [F('departure'), F('destination')]
+        rows = queryset.annotate(
+            booked_seats=F('booked'),
+            capacity_seats=F('capacity'),
+        ).values(*fields, 'booked_seats', 'capacity_seats').annotate(
+            load_factor=_ratio(F('booked'), F('capacity')),
+            route_load_factor=_ratio(
+                Window(Sum('booked'), partition_by=route),
+                Window(Sum('capacity'), partition_by=route),
+            ),
+        )
+    else:
+        rows = queryset.values(*fields).annotate(
+            flights=Count('pk'),
+            booked_seats=Sum('booked'),
+            capacity_seats=Sum('capacity'),
+            load_factor=_ratio(Sum('booked'), Sum('capacity')),
+        )
+
+    rows = rows.annotate(
+        rank=Window(Rank(), order_by=F('load_factor').desc(nulls_last=True)),
+    )
+    # Days read best chronologically; every other grouping is a ranking
+    rows = rows.order_by('day') if group_by == 'day' else rows.order_by('rank', *fields)
+
+    results = list(rows)
+    for row in results:
+        for key in ('load_factor', 'route_load_factor'):
+            if row.get(key) is not None:
+                row[key] = round(row[key], 4)
+    return results
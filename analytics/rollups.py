@@ -0,0 +1,121 @@
+"""
+Incremental daily rollup of bookings and cancellations.
+
+Each run only looks at reservations created or cancelled since the stored
+watermark (both columns are indexed), works out which (flight, day) cells
+those changes touch, recounts just those cells and upserts the absolute
+values. A reactivated reservation loses its ``cancelled_at``, so the cell it
+was cancelled on cannot be found that way; every stored cell of a flight with
+reservations updated since the watermark (per the change log) is recounted
+as well. Because cells are recomputed rather than incremented, re-running a
+window is harmless and the pipeline is idempotent.
+
+The upper bound of every run lags behind "now" so rows from transactions
+that commit slightly late are still picked up by the next run.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from changes.models import Change
+from reservations.models import Reservation
+from .models import DailyFlightStats, RollupWatermark
+
+WATERMARK_NAME = 'daily_flight_stats'
+
+# How far behind "now" each run stops
+SAFETY_LAG = timedelta(minutes=1)
+
+
+def _touched_cells(field, lower, upper):
+    """Return the (flight_id, day) cells with rows whose ``field`` is in [lower, upper)."""
+    changed = Reservation.objects.filter(**{f'{field}__lt': upper})
+    if lower is not None:
+        changed = changed.filter(**{f'{field}__gte': lower})
+    return set(
+        changed.annotate(day=TruncDate(field))
+        .order_by()
+        .values_list('flight_id', 'day')
+        .distinct()
+    )
+
+
+def _stored_cells_of_updated_flights(lower, upper):
+    """Return the stored cells of flights whose reservations were updated in [lower, upper)."""
+    updates = Change.objects.filter(entity='reservation', action='updated', changed_at__lt=upper)
+    if lower is not None:
+        updates = updates.filter(changed_at__gte=lower)
+    flight_ids = Reservation.objects.filter(pk__in=updates.values('object_id')).values('flight_id')
+    return set(
+        DailyFlightStats.objects.filter(flight_id__in=flight_ids).values_list('flight_id', 'day')
+    )
+
+
+def _count_by_flight(field, day, flight_ids):
+    """Count reservations of the given flights whose ``field`` falls on ``day``."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return dict(
+        Reservation.objects.filter(
+            flight_id__in=flight_ids,
+            **{f'{field}__gte': start, f'{field}__lt': start + timedelta(days=1)}
+        )
+        .order_by()
+        .values('flight_id')
+        .annotate(count=Count('pk'))
+        .values_list('flight_id', 'count')
+    )
+
+
+def refresh_daily_flight_stats(now=None):
+    """
+    Fold reservations changed since the last run into DailyFlightStats.
+
+    Returns the number of (flight, day) rows written.
+    """
+    upper = (now or timezone.now()) - SAFETY_LAG
+
+    with transaction.atomic():
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK_NAME)
+        lower = watermark.value
+        if lower is not None and lower >= upper:
+            return 0
+
+        cells = (
+            _touched_cells('created_at', lower, upper)
+            | _touched_cells('cancelled_at', lower, upper)
+            | _stored_cells_of_updated_flights(lower, upper)
+        )
+
+        flights_by_day = {}
+        for flight_id, day in cells:
+            flights_by_day.setdefault(day, []).append(flight_id)
+
+        rows = []
+        for day, flight_ids in flights_by_day.items():
+            bookings = _count_by_flight('created_at', day, flight_ids)
+            cancellations = _count_by_flight('cancelled_at', day, flight_ids)
+            rows.extend(
+                DailyFlightStats(
+                    flight_id=flight_id,
+                    day=day,
+                    bookings=bookings.get(flight_id, 0),
+                    cancellations=cancellations.get(flight_id, 0),
+                )
+                for flight_id in flight_ids
+            )
+
+        DailyFlightStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['flight', 'day'],
+            update_fields=['bookings', 'cancellations', 'updated_at'],
+            batch_size=1000,
+        )
+
+        watermark.value = upper
+        watermark.save(update_fields=['value'])
+
+    return len(rows)
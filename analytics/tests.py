@@ -0,0 +1,52 @@
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airline_project.testing import APITestCase, create_flight, create_reservation
+from .models import DailyFlightStats
+from .rollups import SAFETY_LAG, refresh_daily_flight_stats
+
+
+class LoadFactorTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.flight = create_flight()
+
+    def test_zero_capacity_override(self):
+        response = self.client.patch(f'/api/flights/{self.flight.id}/', {'capacity_override': 0}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        for group_by in ('flight', 'route', 'airplane', 'day'):
+            response = self.client.get('/api/analytics/load-factor/', {'group_by': group_by})
+            self.assertEqual(response.status_code, 200, group_by)
+            row = response.data['results'][0]
+            self.assertEqual(row['capacity_seats'], 0)
+            self.assertIsNone(row['load_factor'])
+
+
+class DailyFlightStatsTests(APITestCase):
+
+    def refresh(self):
+        return refresh_daily_flight_stats(now=timezone.now() + SAFETY_LAG)
+
+    def test_reactivation_recounts_cancellation_day(self):
+        reservation = create_reservation(create_flight())
+        reservation.status = False
+        reservation.save()
+        self.refresh()
+        stats = DailyFlightStats.objects.get()
+        self.assertEqual((stats.bookings, stats.cancellations), (1, 1))
+
+        reservation.status = True
+        reservation.save()
+        self.refresh()
+        stats.refresh_from_db()
+        self.assertEqual((stats.bookings, stats.cancellations), (1, 0))
+
+    def test_default_range_is_the_last_30_days(self):
+        create_reservation(create_flight())
+        self.refresh()
+        response = APIClient().get('/api/analytics/daily-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['bookings_total'], 1)
@@ -0,0 +1,18 @@
+# Import routers from Django REST Framework
+from rest_framework.routers import DefaultRouter
+
+# Import our viewset
+from .views import AnalyticsViewSet
+
+# Create a router instance
+router = DefaultRouter()
+
+# Register the AnalyticsViewSet
+# This creates URL patterns for its custom actions:
+# - GET /analytics/load-factor/ -> Load factor per flight, route, airplane or day
+# - GET /analytics/daily-stats/ -> Bookings and cancellations per day or flight
+# - GET /analytics/fleet-utilization/ -> Block hours and idle windows per airplane and day
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
+
+# Export the URL patterns
+urlpatterns = router.urls
@@ -0,0 +1,184 @@
+"""
+Fleet utilization: block hours and idle windows per airplane and day.
+
+Results are cached per calendar day. The days missing from the cache are
+computed together from a single query returning the active flights of the
+whole span ordered by airplane and departure time, which the
+``(airplane, departure_time)`` index serves without a sort. A single pass
+over the rows then splits each airplane's flights and the ground time
+between them into days.
+
+Block time is taken as departure to arrival. An idle window is the ground
+time between two flights of the same airplane, clipped to the day; its
+schedulable part leaves the TURNAROUND required by
+``Flight._check_flight_conflicts()`` after the previous arrival and before
+the next departure, so any flight fitting in it could actually be added.
+The query reaches TURNAROUND past both ends of the span, so each day's
+result is the same however the requested range is cut.
+"""
+from bisect import bisect_right
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from itertools import groupby
+import time as time_module
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from airplanes.models import Airplane
+from flights.models import Flight, TURNAROUND
+
+
+def _day_bounds(day):
+    """
+    Return the [start, end) datetimes of a local calendar day, in UTC.
+
+    Python subtracts datetimes sharing a tzinfo by wall clock, so local bounds
+    would make every day 24 hours long, DST changes included.
+    """
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start.astimezone(dt_timezone.utc), end.astimezone(dt_timezone.utc)
+
+
+def _minutes(delta):
+    return round(delta.total_seconds() / 60, 1)
+
+
+def _gaps(flights, window_start, window_end):
+    """
+    Yield ``(start, end, schedulable_start, schedulable_end)`` for the ground
+    time around ``flights`` (ordered ``(departure, arrival)`` pairs) in the window.
+    """
+    previous_arrival = None
+    for departure, arrival in flights:
+        start = window_start if previous_arrival is None else previous_arrival
+        if departure > start:
+            schedulable_start = start if previous_arrival is None else start + TURNAROUND
+            yield start, departure, schedulable_start, departure - TURNAROUND
+        previous_arrival = arrival if previous_arrival is None else max(previous_arrival, arrival)
+
+    start = window_start if previous_arrival is None else previous_arrival
+    if window_end > start:
+        schedulable_start = start if previous_arrival is None else start + TURNAROUND
+        yield start, window_end, schedulable_start, window_end
+
+
+def _airplane_days(flights, days, bounds):
+    """Split one airplane's flights and gaps into per-day figures."""
+    starts = [day_start for day_start, _ in bounds]
+    results = [{'flights': 0, 'block': timedelta(0), 'idle_windows': []} for _ in days]
+
+    def overlapping(start, end):
+        """Indexes of the days that [start, end) overlaps."""
+        index = max(bisect_right(starts, start) - 1, 0)
+        while index < len(days) and bounds[index][0] < end:
+            if bounds[index][1] > start:
+                yield index
+            index += 1
+
+    for departure, arrival in flights:
+        for index in overlapping(departure, arrival):
+            day_start, day_end = bounds[index]
+            if day_start <= departure < day_end:
+                results[index]['flights'] += 1
+            results[index]['block'] += min(arrival, day_end) - max(departure, day_start)
+
+    for start, end, schedulable_start, schedulable_end in _gaps(flights, bounds[0][0] - TURNAROUND, bounds[-1][1] + TURNAROUND):
+        for index in overlapping(start, end):
+            day_start, day_end = bounds[index]
+            window_start, window_end = max(start, day_start), min(end, day_end)
+            usable_start, usable_end = max(schedulable_start, day_start), min(schedulable_end, day_end)
+            usable = usable_end > usable_start
+            results[index]['idle_windows'].append({
+                'start': window_start,
+                'end': window_end,
+                'idle_minutes': _minutes(window_end - window_start),
+                'schedulable_start': usable_start if usable else None,
+                'schedulable_end': usable_end if usable else None,
+                'schedulable_minutes': _minutes(usable_end - usable_start) if usable else 0,
+            })
+    return results
+
+
+def compute_utilization(days):
+    """Return ``{day: [airplane rows]}`` for consecutive ``days`` using one flight query."""
+    bounds = [_day_bounds(day) for day in days]
+    airplanes = list(Airplane.objects.active().order_by('tail_number').values_list('id', 'tail_number'))
+    rows = (
+        Flight.objects.active()
+        .filter(departure_time__lt=bounds[-1][1] + TURNAROUND, arrival_time__gt=bounds[0][0] - TURNAROUND)
+        .order_by('airplane_id', 'departure_time')
+        .values_list('airplane_id', 'departure_time', 'arrival_time')
+    )
+    flights = {
+        airplane_id: [(departure, arrival) for _, departure, arrival in group]
+        for airplane_id, group in groupby(rows.iterator(), key=lambda row: row[0])
+    }
+
+    results = {day: [] for day in days}
+    for airplane_id, tail_number in airplanes:
+        per_day = _airplane_days(flights.get(airplane_id, []), days, bounds)
+        for day, (day_start, day_end), figures in zip(days, bounds, per_day):
+            block = figures['block']
+            results[day].append({
+                'airplane_id': airplane_id,
+                'tail_number': tail_number,
+                'flights': figures['flights'],
+                'block_hours': round(block.total_seconds() / 3600, 2),
+                'utilization': round(block / (day_end - day_start), 4),
+                'idle_windows': figures['idle_windows'],
+            })
+    return results
+
+
+def fleet_utilization(start_day, end_day):
+    """
+    Return ``[{'day', 'airplanes'}]`` for every day from ``start_day`` to ``end_day`` inclusive.
+
+    Days are cached for settings.ANALYTICS_CACHE_TTL seconds (one cache
+    bucket); the missing ones are computed together.
+    """
+    days = [start_day + timedelta(days=offset) for offset in range((end_day - start_day).days + 1)]
+    ttl = settings.ANALYTICS_CACHE_TTL
+    bucket = int(time_module.time() // ttl)
+    keys = {day: f'analytics:utilization:{day}:{bucket}' for day in days}
+
+    cached = cache.get_many(keys.values())
+    by_day = {day: cached[key] for day, key in keys.items() if key in cached}
+    missing = [day for day in days if day not in by_day]
+    if missing:
+        span = [missing[0] + timedelta(days=offset) for offset in range((missing[-1] - missing[0]).days + 1)]
+        computed = compute_utilization(span)
+        cache.set_many({keys[day]: computed[day] for day in missing}, ttl)
+        by_day.update((day, computed[day]) for day in missing)
+
+    return [{'day': day, 'airplanes': by_day[day]} for day in days]
+
+
+def summarize(days):
+    """Return per-airplane totals over the ``fleet_utilization()`` result."""
+    totals = {}
+    for day in days:
+        for row in day['airplanes']:
+            total = totals.setdefault(row['airplane_id'], {
+                'airplane_id': row['airplane_id'],
+                'tail_number': row['tail_number'],
+                'flights': 0,
+                'block_hours': 0,
+                'schedulable_hours': 0,
+            })
+            total['flights'] += row['flights']
+            total['block_hours'] += row['block_hours']
+            total['schedulable_hours'] += sum(window['schedulable_minutes'] for window in row['idle_windows']) / 60
+
+    # Local days are 23 or 25 hours long across DST changes, like in compute_utilization()
+    hours = sum(
+        (day_end - day_start).total_seconds() / 3600
+        for day_start, day_end in (_day_bounds(day['day']) for day in days)
+    )
+    for total in totals.values():
+        total['utilization'] = round(total['block_hours'] / hours, 4) if hours else 0
+        total['block_hours'] = round(total['block_hours'], 2)
+        total['schedulable_hours'] = round(total['schedulable_hours'], 2)
+    return sorted(totals.values(), key=lambda total: total['utilization'], reverse=True)
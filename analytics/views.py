@@ -0,0 +1,194 @@
+from datetime import datetime, time, timedelta
+import time as time_module
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.utils import timezone
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .models import DailyFlightStats
+from .queries import GROUPINGS, live_flights, load_factor, rollup_flights
+from .utilization import fleet_utilization, summarize
+
+# Longest date range of a fleet utilization request
+UTILIZATION_MAX_DAYS = 31
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """
+    ViewSet for operational analytics computed in SQL.
+
+    Results are cached per time bucket (settings.ANALYTICS_CACHE_TTL seconds),
+    so repeated dashboard reads within a bucket never reach the database.
+    """
+
+    def _date_range(self, request, past=False):
+        """
+        Return the aware [start, end) range from start/end query params (inclusive dates).
+
+        Defaults to the next 30 days (metrics by departure date), or the last
+        30 days with ``past`` (activity that has already happened).
+        """
+        today = timezone.localdate()
+        default_start, default_end = (today - timedelta(days=30), today) if past else (today, today + timedelta(days=30))
+        start_param = request.query_params.get('start')
+        end_param = request.query_params.get('end')
+        start_day = datetime.strptime(start_param, '%Y-%m-%d').date() if start_param else default_start
+        end_day = datetime.strptime(end_param, '%Y-%m-%d').date() if end_param else default_end
+        start = timezone.make_aware(datetime.combine(start_day, time.min))
+        end = timezone.make_aware(datetime.combine(end_day + timedelta(days=1), time.min))
+        return start, end
+
+    @action(detail=False, methods=['get'], url_path='load-factor')
+    def load_factor(self, request):
+        """
+        Load factor (active reservations / capacity) grouped by flight, route, airplane or day.
+
+        Query Parameters:
+        - group_by: 'flight', 'route' (default), 'airplane' or 'day'
+        - start, end: Departure date range, YYYY-MM-DD (default: today to 30 days ahead)
+        - source: 'live' (default) or 'rollup' to read the precomputed summary table
+        """
+        group_by = request.query_params.get('group_by', 'route')
+        source = request.query_params.get('source', 'live')
+
+        if group_by not in GROUPINGS:
+            return Response(
+                {'error': f"group_by must be one of: {', '.join(GROUPINGS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if source not in ('live', 'rollup'):
+            return Response(
+                {'error': "source must be 'live' or 'rollup'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start, end = self._date_range(request)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ttl = settings.ANALYTICS_CACHE_TTL
+        bucket = int(time_module.time() // ttl)
+        cache_key = f'analytics:load_factor:{group_by}:{source}:{start.date()}:{end.date()}:{bucket}'
+
+        results = cache.get(cache_key)
+        if results is None:
+            queryset = live_flights(start, end) if source == 'live' else rollup_flights(start, end)
+            results = load_factor(queryset, group_by)
+            cache.set(cache_key, results, ttl)
+
+        return Response({
+            'group_by': group_by,
+            'source': source,
+            'start': start.date(),
+            'end': (end - timedelta(days=1)).date(),
+            'count': len(results),
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'], url_path='fleet-utilization')
+    def fleet_utilization(self, request):
+        """
+        Block hours, utilization and idle windows of every active airplane, per day.
+
+        Query Parameters:
+        - start, end: Date range, YYYY-MM-DD (default: today to 30 days ahead, max 31 days)
+
+        Idle windows report the ground time between flights and the part of
+        it that leaves the 1 hour turnaround on both sides, i.e. where
+        another flight could be scheduled. Each day is cached separately.
+        """
+        try:
+            start, end = self._date_range(request)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start_day, end_day = start.date(), (end - timedelta(days=1)).date()
+        if end_day < start_day:
+            return Response(
+                {'error': 'end must not be before start.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end_day - start_day).days + 1 > UTILIZATION_MAX_DAYS:
+            return Response(
+                {'error': f'Date range cannot exceed {UTILIZATION_MAX_DAYS} days.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        days = fleet_utilization(start_day, end_day)
+        return Response({
+            'start': start_day,
+            'end': end_day,
+            'summary': summarize(days),
+            'days': days,
+        })
+
+    @action(detail=False, methods=['get'], url_path='daily-stats')
+    def daily_stats(self, request):
+        """
+        Bookings and cancellations per day or per flight, read from the rollup table.
+
+        Query Parameters:
+        - group_by: 'day' (default) or 'flight'
+        - start, end: Date range the bookings/cancellations happened in, YYYY-MM-DD
+          (default: the last 30 days up to today)
+        - flight: Restrict to one flight ID
+
+        Figures are as fresh as the last rollup_daily_stats run.
+        """
+        group_by = request.query_params.get('group_by', 'day')
+        if group_by not in ('day', 'flight'):
+            return Response(
+                {'error': "group_by must be 'day' or 'flight'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start, end = self._date_range(request, past=True)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = DailyFlightStats.objects.filter(day__gte=start.date(), day__lt=end.date())
+
+        flight_id = request.query_params.get('flight')
+        if flight_id:
+            try:
+                flight_id = int(flight_id)
+            except ValueError:
+                return Response(
+                    {'error': 'flight must be an integer.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            queryset = queryset.filter(flight_id=flight_id)
+
+        if group_by == 'day':
+            rows = queryset.values('day').order_by('day')
+        else:
+            rows = queryset.annotate(flight_number=F('flight__flight_number')).values(
+                'flight_id', 'flight_number'
+            ).order_by('flight_number')
+
+        results = list(rows.annotate(
+            bookings_total=Sum('bookings'),
+            cancellations_total=Sum('cancellations'),
+        ))
+
+        return Response({
+            'group_by': group_by,
+            'start': start.date(),
+            'end': (end - timedelta(days=1)).date(),
+            'count': len(results),
+            'results': results,
+        })
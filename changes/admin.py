@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import Change
+
+
+@admin.register(Change)
+class ChangeAdmin(admin.ModelAdmin):
+    """Read-only admin interface for the change log."""
+
+    list_display = ['id', 'entity', 'object_id', 'action', 'fields', 'changed_at']
+    list_filter = ['entity', 'action']
+    search_fields = ['object_id']
+    ordering = ['-id']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,32 @@
+"""
+Helpers that append entries to the change log.
+
+Saves and deletes done through the ORM are recorded by the signal handlers in
+``changes/signals.py``. Code paths that bypass signals (``queryset.update()``
+in bulk actions, fast ``queryset.delete()``) call ``record_changes()``
+themselves. Entries are written in the caller's transaction, so a rolled back
+change never shows up in the feed.
+"""
+from .models import Change
+
+RECORD_BATCH_SIZE = 1000
+
+
+def record_change(instance, action, fields=None):
+    """Append one entry for a saved or deleted model instance."""
+    Change.objects.create(
+        entity=instance._meta.model_name,
+        object_id=instance.pk,
+        action=action,
+        fields=sorted(fields or []),
+    )
+
+
+def record_changes(model, object_ids, action, fields=None):
+    """Append one entry per id for a bulk update or delete on ``model``."""
+    entity = model._meta.model_name
+    fields = sorted(fields or [])
+    Change.objects.bulk_create(
+        [Change(entity=entity, object_id=object_id, action=action, fields=fields) for object_id in object_ids],
+        batch_size=RECORD_BATCH_SIZE,
+    )
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from changes.models import Change
+
+
+class Command(BaseCommand):
+    """
+    Delete change log entries older than the retention window.
+
+    Consumers that fall further behind than the window must resync with a
+    full read. Rows are deleted in id-ordered chunks, one short transaction each.
+    """
+
+    help = 'Delete change feed entries older than --older-than-days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=30,
+                            help='Keep entries from the last N days (default: 30)')
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Rows deleted per transaction (default: 5000)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        last_id = Change.objects.filter(changed_at__lt=cutoff).order_by('-id').values_list('id', flat=True).first()
+
+        deleted = 0
+        while last_id is not None:
+            ids = list(
+                Change.objects.filter(id__lte=last_id).order_by('id').values_list('id', flat=True)[:options['chunk_size']]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                deleted += Change.objects.filter(id__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} change(s).'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entity', models.CharField(choices=[('airplane', 'Airplane'), ('flight', 'Flight'), ('reservation', 'Reservation')], help_text='Type of the changed row', max_length=20)),
+                ('object_id', models.BigIntegerField(help_text='Primary key of the changed row')),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('fields', models.JSONField(blank=True, default=list, help_text='Names of the changed fields, empty when unknown (e.g. a full save)')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Time the change was recorded')),
+            ],
+            options={
+                'verbose_name': 'Change',
+                'verbose_name_plural': 'Changes',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['entity', 'id'], name='changes_cha_entity_bcd180_idx'), models.Index(fields=['changed_at'], name='changes_cha_changed_e13d0c_idx')],
+            },
+        ),
+    ]
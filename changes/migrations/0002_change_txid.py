@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:21
+
+import changes.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('changes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='change',
+            name='changes_cha_entity_bcd180_idx',
+        ),
+        migrations.AddField(
+            model_name='change',
+            name='txid',
+            field=models.BigIntegerField(db_default=changes.models.CurrentTransactionId(), editable=False, help_text='Id of the transaction that wrote the entry (PostgreSQL only)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['txid', 'id'], name='changes_cha_txid_2dfdba_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['entity', 'txid', 'id'], name='changes_cha_entity_8459bb_idx'),
+        ),
+    ]
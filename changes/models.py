@@ -0,0 +1,118 @@
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+
+class CurrentTransactionId(models.Func):
+    """The writing transaction's id (``txid_current()``) on PostgreSQL, NULL elsewhere."""
+    output_field = models.BigIntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return 'NULL', []
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return 'txid_current()', []
+
+
+class ChangeQuerySet(models.QuerySet):
+    """Custom queryset for Change with feed ordering helpers."""
+
+    def committed(self):
+        """
+        Entries whose position in the feed is final, in feed order.
+
+        On PostgreSQL entries are ordered by (txid, id) and only those written
+        by transactions older than every running one are returned: no entry
+        can appear before them later, whenever it commits. Other backends
+        (SQLite) serialize writers, so ids are already in commit order.
+        """
+        if not self._ordered_by_txid():
+            return self.order_by('id')
+        return self.filter(
+            txid__lt=RawSQL('txid_snapshot_xmin(txid_current_snapshot())', []),
+        ).order_by('txid', 'id')
+
+    def after(self, txid, change_id):
+        """Entries after the feed position ``(txid, change_id)``."""
+        if not self._ordered_by_txid():
+            return self.filter(id__gt=change_id)
+        # The txid__gte bound lets the (txid, id) index scan start at the cursor
+        return self.filter(txid__gte=txid).filter(
+            models.Q(txid__gt=txid) | models.Q(txid=txid, id__gt=change_id)
+        )
+
+    def _ordered_by_txid(self):
+        return connections[self.db].vendor == 'postgresql'
+
+
+class Change(models.Model):
+    """
+    One entry of the append-only change log.
+
+    Entries only say which row changed (and which fields, when known);
+    consumers of the change feed re-read the current state of the rows they
+    care about. The feed position is (txid, id) on PostgreSQL and id
+    elsewhere (see ``ChangeQuerySet.committed()``).
+    """
+
+    ENTITY_CHOICES = [
+        ('airplane', 'Airplane'),
+        ('flight', 'Flight'),
+        ('reservation', 'Reservation'),
+    ]
+
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+
+    entity = models.CharField(
+        max_length=20,
+        choices=ENTITY_CHOICES,
+        help_text="Type of the changed row"
+    )
+
+    object_id = models.BigIntegerField(
+        help_text="Primary key of the changed row"
+    )
+
+    action = models.CharField(
+        max_length=10,
+        choices=ACTION_CHOICES,
+    )
+
+    fields = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Names of the changed fields, empty when unknown (e.g. a full save)"
+    )
+
+    changed_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Time the change was recorded"
+    )
+
+    txid = models.BigIntegerField(
+        null=True,
+        editable=False,
+        db_default=CurrentTransactionId(),
+        help_text="Id of the transaction that wrote the entry (PostgreSQL only)"
+    )
+
+    objects = ChangeQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = "Change"
+        verbose_name_plural = "Changes"
+        indexes = [
+            models.Index(fields=['txid', 'id']),
+            models.Index(fields=['entity', 'txid', 'id']),
+            models.Index(fields=['changed_at']),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.entity} {self.object_id} {self.action}"
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from .models import Change
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    """Serializer for change feed entries."""
+
+    class Meta:
+        model = Change
+        fields = ['id', 'entity', 'object_id', 'action', 'fields', 'changed_at']
+        read_only_fields = fields
@@ -0,0 +1,26 @@
+"""
+Signal handlers that append saves and deletes to the change log.
+
+Reservation deletes are recorded by their callers instead (see
+``purge_archived`` and ``ReservationAdmin``): a post_delete receiver would
+make Django load every row before a ``queryset.delete()``.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .log import record_change
+
+
+@receiver(post_save, sender='airplanes.Airplane')
+@receiver(post_save, sender='flights.Flight')
+@receiver(post_save, sender='reservations.Reservation')
+def model_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Record a created or updated row."""
+    record_change(instance, 'created' if created else 'updated', update_fields)
+
+
+@receiver(post_delete, sender='airplanes.Airplane')
+@receiver(post_delete, sender='flights.Flight')
+def model_deleted(sender, instance, **kwargs):
+    """Record a deleted airplane or flight."""
+    record_change(instance, 'deleted')
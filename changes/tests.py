@@ -0,0 +1,75 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airline_project.testing import APITestCase, create_airplane, create_flight
+from .models import Change
+
+
+class ChangeFeedTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.flight = create_flight()  # Records the airplane, then the flight
+        self.airplane = self.flight.airplane
+
+    def feed(self, **params):
+        response = self.client.get('/api/changes/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def entries(self, data):
+        return [(row['entity'], row['object_id'], row['action']) for row in data['results']]
+
+    def test_cursor_round_trip(self):
+        first = self.feed(limit=1)
+        self.assertEqual(self.entries(first), [('airplane', self.airplane.id, 'created')])
+        self.assertTrue(first['has_more'])
+
+        second = self.feed(since=first['next_cursor'])
+        self.assertEqual(self.entries(second), [('flight', self.flight.id, 'created')])
+        self.assertFalse(second['has_more'])
+
+        self.flight.archive()
+        third = self.feed(since=second['next_cursor'])
+        self.assertEqual(self.entries(third), [('flight', self.flight.id, 'updated')])
+        self.assertEqual(third['results'][0]['fields'], ['archived_at'])
+
+        caught_up = self.feed(since=third['next_cursor'])
+        self.assertEqual(caught_up['results'], [])
+        self.assertEqual(caught_up['next_cursor'], third['next_cursor'])
+
+    def test_legacy_and_txid_cursors(self):
+        airplane_change = Change.objects.get(entity='airplane')
+        # A plain '<id>' cursor from before txids were recorded
+        self.assertEqual(
+            self.entries(self.feed(since=str(airplane_change.id))),
+            [('flight', self.flight.id, 'created')],
+        )
+        self.assertEqual(
+            self.entries(self.feed(since=f'0.{airplane_change.id}')),
+            [('flight', self.flight.id, 'created')],
+        )
+
+    def test_invalid_parameters(self):
+        for params in ({'since': '1.2.3'}, {'since': 'abc'}, {'limit': 'x'}, {'entity': 'passenger'}):
+            self.assertEqual(self.client.get('/api/changes/', params).status_code, 400, params)
+
+    def test_entity_filter(self):
+        self.assertEqual(self.entries(self.feed(entity='flight')), [('flight', self.flight.id, 'created')])
+
+
+class PruneChangesTests(APITestCase):
+
+    def test_deletes_entries_older_than_the_window(self):
+        for _ in range(3):
+            create_airplane()
+        Change.objects.update(changed_at=timezone.now() - timedelta(days=40))
+        recent = create_airplane()
+
+        call_command('prune_changes', older_than_days=30, chunk_size=2, stdout=StringIO())
+        self.assertEqual(list(Change.objects.values_list('object_id', flat=True)), [recent.id])
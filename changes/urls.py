@@ -0,0 +1,16 @@
+# Import routers from Django REST Framework
+from rest_framework.routers import DefaultRouter
+
+# Import our viewset
+from .views import ChangeFeedViewSet
+
+# Create a router instance
+router = DefaultRouter()
+
+# Register the ChangeFeedViewSet
+# This creates URL patterns:
+# - GET /changes/?since=<cursor> -> Changes recorded after the cursor
+router.register(r'changes', ChangeFeedViewSet, basename='change')
+
+# Export the URL patterns
+urlpatterns = router.urls
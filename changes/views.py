@@ -0,0 +1,82 @@
+from rest_framework import viewsets, status
+from rest_framework.response import Response
+
+from .models import Change
+from .serializers import ChangeSerializer
+
+
+def _parse_cursor(value):
+    """Return the ``(txid, id)`` feed position of a cursor ('<txid>.<id>', or '<id>' off PostgreSQL)."""
+    parts = [int(part) for part in value.split('.')]
+    if len(parts) == 1:
+        return 0, parts[0]
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    raise ValueError(value)
+
+
+def _cursor(change):
+    return str(change.id) if change.txid is None else f'{change.txid}.{change.id}'
+
+
+class ChangeFeedViewSet(viewsets.GenericViewSet):
+    """
+    Incremental change feed over airplanes, flights and reservations.
+
+    Consumers keep the ``next_cursor`` of each batch and pass it back as
+    ``since`` to get only what changed afterwards, instead of re-reading the
+    full collections. Each batch is an index range scan.
+    """
+    queryset = Change.objects.all()
+    serializer_class = ChangeSerializer
+    pagination_class = None
+
+    default_limit = 100
+    max_limit = 1000
+
+    def list(self, request):
+        """
+        Return changes recorded after the ``since`` cursor, oldest first.
+
+        Query Parameters:
+        - since: Cursor from the previous batch's next_cursor (default: 0, the start of the log)
+        - limit: Number of changes per batch (default: 100, max: 1000)
+        - entity: Comma-separated filter, e.g. 'flight,reservation'
+
+        Only entries whose feed position is final are returned (see
+        ChangeQuerySet.committed()), so an entry committed late is never
+        skipped; a long-running transaction delays the feed instead.
+        """
+        since = request.query_params.get('since', '0')
+        try:
+            txid, change_id = _parse_cursor(since)
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return Response(
+                {'error': 'since must be a next_cursor value and limit an integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, self.max_limit))
+
+        queryset = self.get_queryset().committed().after(txid, change_id)
+
+        entity = request.query_params.get('entity')
+        if entity:
+            entities = [name.strip() for name in entity.split(',') if name.strip()]
+            valid = {choice for choice, _ in Change.ENTITY_CHOICES}
+            if not set(entities) <= valid:
+                return Response(
+                    {'error': f"entity must be one of: {', '.join(sorted(valid))}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            queryset = queryset.filter(entity__in=entities)
+
+        changes = list(queryset[:limit + 1])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        return Response({
+            'next_cursor': _cursor(changes[-1]) if changes else since,
+            'has_more': has_more,
+            'results': self.get_serializer(changes, many=True).data,
+        })
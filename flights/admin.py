@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import F
+from .connections import graph_cache
 from .models import Flight
 
 
@@ -20,7 +23,8 @@ class FlightAdmin(admin.ModelAdmin):
     list_filter = ['departure_time', 'departure', 'destination', 'airplane']
     search_fields = ['flight_number', 'departure', 'destination', 'airplane__tail_number']
     ordering = ['departure_time']
-    readonly_fields = ['id']
+    readonly_fields = ['id', 'archived_at', 'effective_capacity']
+    actions = ['archive_flights']
 
     fieldsets = (
         ('Flight Information', {
@@ -32,14 +36,40 @@ class FlightAdmin(admin.ModelAdmin):
         ('Schedule', {
             'fields': ('departure_time', 'arrival_time')
         }),
+        ('Capacity', {
+            'fields': ('capacity_override', 'overbooking_percent', 'effective_capacity')
+        }),
     )
 
+    def get_queryset(self, request):
+        """Join airplanes and annotate seat counts so each changelist row needs no extra queries."""
+        queryset = super().get_queryset(request).select_related('airplane').with_seat_counts()
+        return queryset.annotate(
+            seats_left=F('effective_capacity') - F('active_reservation_count') - F('held_seats')
+        )
+
     def get_airplane_info(self, obj):
         """Return airplane tail number and model."""
         return f"{obj.airplane.tail_number} ({obj.airplane.model})"
     get_airplane_info.short_description = 'Airplane'
+    get_airplane_info.admin_order_field = 'airplane__tail_number'
 
     def get_available_seats(self, obj):
-        """Return available seats / total capacity."""
-        return f"{obj.available_seats()} / {obj.airplane.capacity}"
+        """Return available seats / effective capacity."""
+        return f"{obj.available_seats()} / {obj.effective_capacity}"
     get_available_seats.short_description = 'Available Seats'
+    get_available_seats.admin_order_field = 'seats_left'
+
+    def archive_flights(self, request, queryset):
+        """Bulk action to archive (soft delete) flights; purge_archived removes them later."""
+        with transaction.atomic():
+            ids = list(queryset.active().values_list('id', flat=True))
+            archived = queryset.archive()
+
+            # queryset.update() sends no signals, so drop the flights from cached connection graphs here
+            def invalidate_graphs():
+                for flight_id in ids:
+                    graph_cache.flight_deleted(flight_id)
+            transaction.on_commit(invalidate_graphs)
+        self.message_user(request, f"{archived} flight(s) archived successfully.")
+    archive_flights.short_description = "Archive selected flights"
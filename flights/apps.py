@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FlightsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'flights'
+
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
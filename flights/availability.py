@@ -0,0 +1,130 @@
+"""
+In-process pub/sub for live seat availability.
+
+Booking, cancellation, seat hold and capacity changes call
+``availability_hub.publish()`` after commit; that only adds the flight ids to
+a "dirty" set, so it is cheap enough to call from any request thread.
+
+Server-Sent Events connections subscribe to a set of flight ids. A single
+pump task per event loop wakes up every settings.AVAILABILITY_STREAM_INTERVAL
+seconds, recomputes availability for the dirty flights that somebody is
+watching in one grouped query, and hands the result to their subscribers.
+A burst of bookings on one flight therefore produces at most one event per
+interval, and unchanged figures are not re-sent.
+
+Only changes made in the same process are seen; run the stream next to the
+API workers that take bookings, or put a shared broker in front of ``publish``.
+"""
+import asyncio
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Flight
+
+
+def availability_snapshot(flight_ids):
+    """Return ``{flight_id: availability}`` for active flights, computed in one query."""
+    flights = Flight.objects.active().filter(id__in=flight_ids).with_seat_counts()
+    return {
+        flight.id: {
+            'flight_id': flight.id,
+            'flight_number': flight.flight_number,
+            'available_seats': flight.available_seats(),
+            'total_capacity': flight.effective_capacity,
+            'is_fully_booked': flight.is_fully_booked(),
+        }
+        for flight in flights
+    }
+
+
+class Subscription:
+    """
+    Availability updates for a fixed set of flights, consumed by one stream.
+
+    Only the latest unread update per flight is kept, so a slow client holds
+    at most one pending event per watched flight instead of a growing backlog
+    of stale figures.
+    """
+
+    def __init__(self, flight_ids):
+        self.flight_ids = frozenset(flight_ids)
+        self._pending = {}  # flight id -> latest unread availability
+        self._ready = asyncio.Event()
+
+    def put(self, availability):
+        self._pending[availability['flight_id']] = availability
+        self._ready.set()
+
+    async def get(self):
+        while not self._pending:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._pending.pop(next(iter(self._pending)))
+
+
+class AvailabilityHub:
+    """Process-wide registry of availability subscriptions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._subscribers = {}  # flight id -> set of Subscription
+        self._last_sent = {}  # flight id -> last availability pushed
+        self._pump = None
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, flight_ids):
+        """Mark flights as changed; watched ones are pushed on the next pump tick."""
+        with self._lock:
+            self._dirty.update(flight_id for flight_id in flight_ids if flight_id in self._subscribers)
+
+    def subscribe(self, flight_ids):
+        """Register a subscription (must be called from the event loop)."""
+        subscription = Subscription(flight_ids)
+        with self._lock:
+            for flight_id in subscription.flight_ids:
+                self._subscribers.setdefault(flight_id, set()).add(subscription)
+                # The new stream starts from a fresh snapshot, so resend the next update
+                self._last_sent.pop(flight_id, None)
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.get_running_loop().create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for flight_id in subscription.flight_ids:
+                watchers = self._subscribers.get(flight_id)
+                if watchers is None:
+                    continue
+                watchers.discard(subscription)
+                if not watchers:
+                    del self._subscribers[flight_id]
+                    self._last_sent.pop(flight_id, None)
+
+    async def _run(self):
+        """Coalesce dirty flights and fan their availability out until nobody listens."""
+        while self._subscribers:
+            await asyncio.sleep(settings.AVAILABILITY_STREAM_INTERVAL)
+            await self.flush()
+
+    async def flush(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+
+        snapshot = await sync_to_async(availability_snapshot)(dirty)
+        with self._lock:
+            for flight_id, availability in snapshot.items():
+                if self._last_sent.get(flight_id) == availability:
+                    continue
+                self._last_sent[flight_id] = availability
+                for subscription in self._subscribers.get(flight_id, ()):
+                    subscription.put(availability)
+
+
+availability_hub = AvailabilityHub()
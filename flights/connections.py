@@ -0,0 +1,320 @@
+"""
+Connection search over the flight schedule.
+
+Flights are loaded one departure day at a time into an in-memory,
+time-expanded graph: for every departure location we keep that day's
+departures sorted by departure time, so the onward flights that respect a
+layover window are found with a binary search instead of a query.
+
+Day graphs are cached per process and kept current by signal handlers
+(see ``flights/signals.py``): flight saves/deletes patch the affected day in
+place, and reservation and capacity changes only mark seat counts as stale so
+they can be refreshed in a single aggregated query on the next search.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+import heapq
+import itertools
+import threading
+import time as time_module
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Flight
+
+
+# Minimum time needed to change planes between two legs
+MIN_CONNECTION_TIME = timedelta(minutes=45)
+
+# Longest layover we are willing to offer in an itinerary
+MAX_CONNECTION_TIME = timedelta(hours=24)
+
+# Hard limits for a single search request
+MAX_LEGS = 3
+MAX_RESULTS = 20
+
+# Wall-clock budget for a search; partial results are returned when exceeded
+SEARCH_TIME_BUDGET = 0.05  # seconds
+
+# Cached day graphs are rebuilt after this long to pick up changes made
+# outside the ORM signals (e.g. queryset.update() in admin bulk actions)
+GRAPH_TTL = 300  # seconds
+
+
+def normalize_location(value):
+    """Return the key used to match locations inside the graph."""
+    return (value or '').strip().lower()
+
+
+class Leg:
+    """A single flight stored in a day graph."""
+
+    __slots__ = (
+        'id', 'flight_number', 'departure', 'destination',
+        'departure_time', 'arrival_time', 'airplane_id', 'capacity', 'booked',
+    )
+
+    def __init__(self, row):
+        self.id = row['id']
+        self.flight_number = row['flight_number']
+        self.departure = row['departure']
+        self.destination = row['destination']
+        self.departure_time = row['departure_time']
+        self.arrival_time = row['arrival_time']
+        self.airplane_id = row['airplane_id']
+        self.capacity = row['effective_capacity']
+        self.booked = row['booked']
+
+    @property
+    def available_seats(self):
+        return self.capacity - self.booked
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'flight_number': self.flight_number,
+            'departure': self.departure,
+            'destination': self.destination,
+            'departure_time': self.departure_time,
+            'arrival_time': self.arrival_time,
+            'available_seats': self.available_seats,
+        }
+
+
+def _booked():
+    """Seats taken on a flight: active reservations plus checkout holds."""
+    return Count('reservations', filter=Q(reservations__status=True)) + F('held_seats')
+
+
+def _leg_rows(queryset):
+    """Return the flight rows needed to build graph legs."""
+    return queryset.annotate(booked=_booked()).values(
+        'id', 'flight_number', 'departure', 'destination',
+        'departure_time', 'arrival_time', 'airplane_id', 'effective_capacity', 'booked',
+    )
+
+
+def _day_bounds(day):
+    """Return the aware [start, end) datetimes of a calendar day."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+class DayGraph:
+    """All flights departing on one calendar day, indexed by departure location."""
+
+    def __init__(self, day):
+        self.day = day
+        self.built_at = time_module.monotonic()
+        self.legs = {}  # flight id -> Leg
+        self._by_location = {}  # location key -> (departure times, legs), both sorted
+        self._stale_seats = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, day):
+        graph = cls(day)
+        start, end = _day_bounds(day)
+        rows = _leg_rows(Flight.objects.active().filter(departure_time__gte=start, departure_time__lt=end))
+        for row in rows:
+            graph.legs[row['id']] = Leg(row)
+        graph._reindex()
+        return graph
+
+    def is_expired(self):
+        return time_module.monotonic() - self.built_at > GRAPH_TTL
+
+    def _reindex(self):
+        by_location = {}
+        for leg in sorted(self.legs.values(), key=lambda leg: leg.departure_time):
+            times, legs = by_location.setdefault(normalize_location(leg.departure), ([], []))
+            times.append(leg.departure_time)
+            legs.append(leg)
+        self._by_location = by_location
+
+    def departures(self, location, earliest, latest):
+        """Return legs leaving ``location`` with earliest <= departure_time <= latest."""
+        entry = self._by_location.get(location)
+        if entry is None:
+            return []
+        times, legs = entry
+        return legs[bisect_left(times, earliest):bisect_right(times, latest)]
+
+    def upsert(self, row):
+        """Insert or replace a single flight."""
+        with self._lock:
+            self.legs[row['id']] = Leg(row)
+            self._reindex()
+
+    def remove(self, flight_id):
+        with self._lock:
+            if self.legs.pop(flight_id, None) is not None:
+                self._reindex()
+
+    def remove_airplane(self, airplane_id):
+        with self._lock:
+            self.legs = {
+                flight_id: leg for flight_id, leg in self.legs.items() if leg.airplane_id != airplane_id
+            }
+            self._reindex()
+
+    def mark_seats_stale(self, flight_id):
+        if flight_id in self.legs:
+            self._stale_seats.add(flight_id)
+
+    def refresh_seats(self):
+        """Reload capacity and booked counts for stale flights in one grouped query."""
+        if not self._stale_seats:
+            return
+        with self._lock:
+            stale, self._stale_seats = self._stale_seats, set()
+        counts = Flight.objects.filter(id__in=stale).annotate(
+            booked=_booked()
+        ).values_list('id', 'effective_capacity', 'booked')
+        for flight_id, capacity, booked in counts:
+            leg = self.legs.get(flight_id)
+            if leg is not None:
+                leg.capacity, leg.booked = capacity, booked
+
+
+class GraphCache:
+    """Process-wide cache of day graphs."""
+
+    def __init__(self):
+        self._graphs = {}
+        self._lock = threading.Lock()
+
+    def get(self, day):
+        graph = self._graphs.get(day)
+        if graph is None or graph.is_expired():
+            graph = DayGraph.build(day)
+            with self._lock:
+                self._graphs[day] = graph
+        graph.refresh_seats()
+        return graph
+
+    def cached(self):
+        return list(self._graphs.values())
+
+    def clear(self):
+        with self._lock:
+            self._graphs.clear()
+
+    def flight_changed(self, flight):
+        """Move a saved flight into the right cached day graph."""
+        for graph in self.cached():
+            graph.remove(flight.id)
+
+        day = timezone.localtime(flight.departure_time).date()
+        graph = self._graphs.get(day)
+        if graph is not None:
+            row = _leg_rows(Flight.objects.active().filter(id=flight.id)).first()
+            if row is not None:
+                graph.upsert(row)
+
+    def flight_deleted(self, flight_id):
+        for graph in self.cached():
+            graph.remove(flight_id)
+
+    def airplane_archived(self, airplane_id):
+        for graph in self.cached():
+            graph.remove_airplane(airplane_id)
+
+    def seats_changed(self, flight_id):
+        for graph in self.cached():
+            graph.mark_seats_stale(flight_id)
+
+
+graph_cache = GraphCache()
+
+
+def search_connections(departure, destination, day, max_legs=2, limit=5, passengers=1,
+                       min_connection=MIN_CONNECTION_TIME, max_connection=MAX_CONNECTION_TIME):
+    """
+    Find the earliest-arriving itineraries from ``departure`` to ``destination``.
+
+    Itineraries start on ``day`` and may continue on following days as long as
+    every layover is between ``min_connection`` and ``max_connection``. Only
+    flights with at least ``passengers`` free seats are used.
+
+    This is a bounded k-shortest search ordered by arrival time: partial
+    itineraries are expanded from a heap, each location is expanded at most
+    ``limit`` times, and no itinerary visits the same location twice.
+
+    Returns a ``(itineraries, truncated)`` tuple where ``truncated`` is True
+    if the time budget ran out before the search completed.
+    """
+    origin = normalize_location(departure)
+    target = normalize_location(destination)
+    max_legs = max(1, min(max_legs, MAX_LEGS))
+    limit = max(1, min(limit, MAX_RESULTS))
+    deadline = time_module.monotonic() + SEARCH_TIME_BUDGET
+
+    graphs = {}
+
+    def graph_for(graph_day):
+        if graph_day not in graphs:
+            graphs[graph_day] = graph_cache.get(graph_day)
+        return graphs[graph_day]
+
+    def onward(location, earliest, latest):
+        graph_day = timezone.localtime(earliest).date()
+        last_day = timezone.localtime(latest).date()
+        while graph_day <= last_day:
+            for leg in graph_for(graph_day).departures(location, earliest, latest):
+                if leg.available_seats >= passengers:
+                    yield leg
+            graph_day += timedelta(days=1)
+
+    start, end = _day_bounds(day)
+    counter = itertools.count()
+    heap = []
+    for leg in onward(origin, start, end - timedelta(microseconds=1)):
+        heapq.heappush(heap, (leg.arrival_time, next(counter), (leg,)))
+
+    results = []
+    expansions = {}
+    truncated = False
+
+    while heap and len(results) < limit:
+        if time_module.monotonic() > deadline:
+            truncated = True
+            break
+
+        arrival_time, _, path = heapq.heappop(heap)
+        last = path[-1]
+        location = normalize_location(last.destination)
+
+        if location == target:
+            results.append(path)
+            continue
+
+        if len(path) >= max_legs:
+            continue
+
+        # k-shortest bound: a location only needs expanding once per wanted result
+        expansions[location] = expansions.get(location, 0) + 1
+        if expansions[location] > limit:
+            continue
+
+        visited = {origin} | {normalize_location(leg.destination) for leg in path}
+        for leg in onward(location, arrival_time + min_connection, arrival_time + max_connection):
+            if normalize_location(leg.destination) in visited:
+                continue
+            heapq.heappush(heap, (leg.arrival_time, next(counter), path + (leg,)))
+
+    return [_itinerary(path) for path in results], truncated
+
+
+def _itinerary(path):
+    """Return the API representation of a list of legs."""
+    first, last = path[0], path[-1]
+    return {
+        'departure_time': first.departure_time,
+        'arrival_time': last.arrival_time,
+        'duration_minutes': int((last.arrival_time - first.departure_time).total_seconds() // 60),
+        'connections': len(path) - 1,
+        'available_seats': min(leg.available_seats for leg in path),
+        'legs': [leg.to_dict() for leg in path],
+    }
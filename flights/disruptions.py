@@ -0,0 +1,156 @@
+"""
+Flight disruption (delay / retime) propagation.
+
+``apply_disruption()`` shifts any number of flights at once and, optionally,
+pushes knock-on delays down each airplane's rotation. Instead of saving every
+flight (one conflict query plus ``full_clean()`` each), the rotation of each
+affected airplane is loaded and locked once, the new schedule is planned and
+checked against the turnaround rule in memory, and everything is written in
+one transaction with ``bulk_update()``. Passenger notifications are queued
+after commit and sent in the background in chunks.
+"""
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from changes.log import record_changes
+from reservations.cache import invalidate_codes
+from reservations.emails import queue_flight_update_emails
+from reservations.models import Reservation
+from .connections import graph_cache
+from .models import Flight, TURNAROUND
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Knock-on delays are rounded up to this step to keep schedules on round times
+KNOCK_ON_STEP = timedelta(minutes=5)
+
+
+def _knock_on(required):
+    """Smallest multiple of KNOCK_ON_STEP strictly greater than ``required``."""
+    return (required // KNOCK_ON_STEP + 1) * KNOCK_ON_STEP
+
+
+def _plan_rotation(rotation, delays, propagate):
+    """
+    Return ``{flight_id: (departure_time, arrival_time)}`` for one airplane's rotation.
+
+    ``rotation`` is the airplane's flights ordered by departure time. Flights in
+    ``delays`` are shifted by exactly their delay; with ``propagate``, any other
+    flight that no longer has TURNAROUND of ground time after its predecessor
+    is pushed back just enough (rounded up to KNOCK_ON_STEP).
+    """
+    planned = {}
+    previous_arrival = None
+    for flight in rotation:
+        explicit = flight.id in delays
+        shift = delays.get(flight.id, timedelta(0))
+        departure_time = flight.departure_time + shift
+        if (propagate and not explicit and previous_arrival is not None
+                and departure_time <= previous_arrival + TURNAROUND):
+            shift += _knock_on(previous_arrival + TURNAROUND - departure_time)
+            departure_time = flight.departure_time + shift
+        planned[flight.id] = (departure_time, flight.arrival_time + shift)
+        previous_arrival = planned[flight.id][1]
+    return planned
+
+
+def _check_rotation(rotation, planned):
+    """Raise ValidationError if the planned rotation breaks the turnaround rule."""
+    by_departure = sorted(rotation, key=lambda flight: planned[flight.id][0])
+    for previous, flight in zip(by_departure, by_departure[1:]):
+        if planned[flight.id][0] <= planned[previous.id][1] + TURNAROUND:
+            raise ValidationError(
+                f'Flight {flight.flight_number} would depart less than 1 hour after '
+                f'flight {previous.flight_number} arrives on the same airplane.'
+            )
+
+
+def apply_disruption(delays, propagate=True, reason='', notify=True):
+    """
+    Shift flights by the given delays in one transaction.
+
+    ``delays`` maps flight ids to a timedelta (negative values move a flight
+    earlier). Returns ``(moved, queued)``: a list of ``{'flight',
+    'previous_departure_time', 'shift'}`` dicts for every flight that moved,
+    knock-on delays included, and the number of passenger notifications
+    queued. Raises ValidationError if a flight is
+    unknown, would move into the past, or the new schedule breaks the 1 hour
+    turnaround rule on any airplane.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        targets = {
+            flight.id: flight
+            for flight in Flight.objects.active().filter(id__in=delays).only(
+                'id', 'airplane_id', 'departure_time', 'arrival_time'
+            )
+        }
+        missing = set(delays) - set(targets)
+        if missing:
+            raise ValidationError(f'Unknown or archived flight(s): {", ".join(map(str, sorted(missing)))}.')
+
+        # Everything from the earliest (old or new) departure onwards can be affected
+        windows = {}
+        for flight_id, flight in targets.items():
+            start = min(flight.departure_time, flight.departure_time + delays[flight_id]) - TURNAROUND
+            windows[flight.airplane_id] = min(start, windows.get(flight.airplane_id, start))
+
+        moved = []
+        for airplane_id, window_start in sorted(windows.items()):
+            rotation = list(
+                Flight.objects.active()
+                .filter(airplane_id=airplane_id, arrival_time__gte=window_start)
+                .select_for_update(of=('self',))
+                .order_by('departure_time')
+            )
+            planned = _plan_rotation(rotation, delays, propagate)
+            _check_rotation(rotation, planned)
+
+            for flight in rotation:
+                departure_time, arrival_time = planned[flight.id]
+                if departure_time == flight.departure_time:
+                    continue
+                if departure_time <= now:
+                    raise ValidationError(f'Flight {flight.flight_number} cannot be moved into the past.')
+                moved.append({
+                    'flight': flight,
+                    'previous_departure_time': flight.departure_time,
+                    'shift': departure_time - flight.departure_time,
+                })
+                flight.departure_time, flight.arrival_time = departure_time, arrival_time
+
+        if not moved:
+            return moved, 0
+
+        flights = [change['flight'] for change in moved]
+        flight_ids = [flight.id for flight in flights]
+        Flight.objects.bulk_update(flights, ['departure_time', 'arrival_time'], batch_size=500)
+
+        # Keep the reservations' partition key in sync, in a single UPDATE
+        Reservation.objects.filter(flight_id__in=flight_ids).update(
+            flight_departure=Case(
+                *[When(flight_id=flight.id, then=Value(flight.departure_time)) for flight in flights],
+                output_field=DateTimeField(),
+            )
+        )
+        record_changes(Flight, flight_ids, 'updated', ['arrival_time', 'departure_time'])
+
+        # bulk_update() skips post_save, so refresh the caches the signal handlers maintain
+        codes = list(Reservation.objects.filter(flight_id__in=flight_ids).values_list('reservation_code', flat=True))
+        transaction.on_commit(lambda: invalidate_codes(codes))
+        transaction.on_commit(lambda: [graph_cache.flight_changed(flight) for flight in flights])
+
+        queued = 0
+        if notify:
+            queued = queue_flight_update_emails(
+                {change['flight'].id: change['previous_departure_time'] for change in moved}, reason
+            )
+
+    logger.info(f'Disruption applied: {len(moved)} flight(s) moved, {queued} notification(s) queued')
+    return moved, queued
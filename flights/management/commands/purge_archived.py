@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from airplanes.models import Airplane
+from changes.log import record_changes
+from flights.models import Flight
+from reservations.models import Reservation, SeatHold
+
+
+class Command(BaseCommand):
+    """
+    Permanently delete archived flights and airplanes.
+
+    Reservations are deleted in small chunks, each in its own short
+    transaction, so no long-running lock is held on the reservations table.
+    Only then are the (now childless) flights and airplanes removed.
+    """
+
+    help = 'Purge archived flights, their reservations, and archived airplanes in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Rows deleted per transaction (default: 1000)')
+        parser.add_argument('--older-than-days', type=int, default=0,
+                            help='Only purge rows archived at least this many days ago')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be purged without deleting anything')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+
+        archived_airplanes = Airplane.objects.filter(archived_at__lte=cutoff)
+        flight_ids = list(
+            Flight.objects.filter(
+                Q(archived_at__lte=cutoff) | Q(airplane__in=archived_airplanes)
+            ).values_list('id', flat=True)
+        )
+
+        if options['dry_run']:
+            reservations = Reservation.objects.filter(flight_id__in=flight_ids).count()
+            self.stdout.write(
+                f'Would purge {len(flight_ids)} flight(s), {reservations} reservation(s) '
+                f'and {archived_airplanes.count()} airplane(s).'
+            )
+            return
+
+        purged_reservations = 0
+        for start in range(0, len(flight_ids), chunk_size):
+            flight_chunk = flight_ids[start:start + chunk_size]
+            purged_reservations += self._delete_in_chunks(
+                Reservation.objects.filter(flight_id__in=flight_chunk), chunk_size
+            )
+            self._delete_in_chunks(SeatHold.objects.filter(flight_id__in=flight_chunk), chunk_size)
+            with transaction.atomic():
+                Flight.objects.filter(id__in=flight_chunk).delete()
+
+        # Airplanes that still have live flights (archived later) are kept for the next run
+        purged_airplanes = 0
+        for airplane_id in archived_airplanes.filter(flights__isnull=True).values_list('id', flat=True):
+            with transaction.atomic():
+                purged_airplanes += Airplane.objects.filter(id=airplane_id).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {len(flight_ids)} flight(s), {purged_reservations} reservation(s) '
+            f'and {purged_airplanes} airplane(s).'
+        ))
+
+    def _delete_in_chunks(self, queryset, chunk_size):
+        """Delete rows of ``queryset`` by primary key, one short transaction per chunk."""
+        deleted = 0
+        while True:
+            ids = list(queryset.order_by().values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                return deleted
+            with transaction.atomic():
+                deleted += queryset.model.objects.filter(id__in=ids).delete()[0]
+                # Reservation deletes have no post_delete receiver (see changes/signals.py)
+                if queryset.model is Reservation:
+                    record_changes(Reservation, ids, 'deleted')
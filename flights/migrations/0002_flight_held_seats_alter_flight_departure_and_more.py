@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='held_seats',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Seats temporarily held during checkout (see reservations.SeatHold)'),
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='departure',
+            field=models.CharField(help_text='Departure airport or location', max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='destination',
+            field=models.CharField(help_text='Destination airport or location', max_length=200),
+        ),
+    ]
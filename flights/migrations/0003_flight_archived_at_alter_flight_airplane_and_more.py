@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airplanes', '0002_airplane_archived_at_airplane_airplane_active_idx'),
+        ('flights', '0002_flight_held_seats_alter_flight_departure_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Set when the flight is archived (soft deleted); purged later', null=True),
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='airplane',
+            field=models.ForeignKey(help_text='The airplane assigned to this flight', on_delete=django.db.models.deletion.PROTECT, related_name='flights', to='airplanes.airplane'),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['departure_time'], name='flight_active_departure_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['airplane', 'departure_time'], name='flight_active_airplane_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:06
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_effective_capacity(apps, schema_editor):
+    # No flight has an override or overbooking yet, so it is the airplane's capacity
+    Flight = apps.get_model('flights', 'Flight')
+    Airplane = apps.get_model('airplanes', 'Airplane')
+    Flight.objects.update(
+        effective_capacity=Subquery(
+            Airplane.objects.filter(pk=OuterRef('airplane_id')).values('capacity')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airplanes', '0002_airplane_archived_at_airplane_airplane_active_idx'),
+        ('flights', '0003_flight_archived_at_alter_flight_airplane_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='flight',
+            name='flight_active_departure_idx',
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='capacity_override',
+            field=models.PositiveIntegerField(blank=True, help_text="Seats for sale on this flight instead of the airplane's capacity", null=True),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='effective_capacity',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Seats that may be sold: override or airplane capacity, plus overbooking'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_effective_capacity, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='flight',
+            name='overbooking_percent',
+            field=models.DecimalField(decimal_places=1, default=Decimal('0'), help_text='Extra seats sold on top of the capacity, as a percentage (expected no-shows)', max_digits=4, validators=[django.core.validators.MinValueValidator(Decimal('0')), django.core.validators.MaxValueValidator(Decimal('50'))]),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['departure_time'], include=('effective_capacity', 'held_seats'), name='flight_active_departure_idx'),
+        ),
+    ]
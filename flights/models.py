@@ -1,7 +1,96 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from datetime import timedelta
+from decimal import Decimal
+import math
+
+from airline_project.tracking import changed_fields
+from changes.log import record_change, record_changes
+
+# Minimum ground time between two flights of the same airplane
+TURNAROUND = timedelta(hours=1)
+
+# Largest overbooking allowance revenue ops may set on a flight
+MAX_OVERBOOKING_PERCENT = Decimal('50')
+
+
+def resolve_capacity(airplane_capacity, capacity_override=None, overbooking_percent=0):
+    """
+    Return the number of seats that may be sold on a flight.
+
+    The override (e.g. seats blocked for crew) replaces the airplane's
+    capacity but never exceeds it, and the overbooking allowance is added on
+    top, rounded down.
+    """
+    base = airplane_capacity if capacity_override is None else min(capacity_override, airplane_capacity)
+    return base + math.floor(base * Decimal(overbooking_percent) / 100)
+
+
+class FlightQuerySet(models.QuerySet):
+    """Custom queryset for Flight with archival and seat availability helpers."""
+
+    def active(self):
+        """
+        Exclude archived flights and flights of archived airplanes.
+
+        Archiving an airplane is a single-row flip, so its flights are hidden
+        through the join rather than updated one by one.
+        """
+        return self.filter(archived_at__isnull=True, airplane__archived_at__isnull=True)
+
+    def archive(self):
+        """Archive every flight in the queryset with a single UPDATE."""
+        with transaction.atomic():
+            ids = list(self.filter(archived_at__isnull=True).values_list('id', flat=True))
+            archived = self.model.objects.filter(id__in=ids).update(archived_at=timezone.now())
+            record_changes(self.model, ids, 'updated', ['archived_at'])
+        return archived
+
+    def with_seat_counts(self):
+        """
+        Annotate each flight with its active reservation count.
+
+        Flight.get_reservation_count() (and everything built on it) uses the
+        annotation instead of running one COUNT query per flight.
+        """
+        queryset = self.annotate(
+            active_reservation_count=models.Count(
+                'reservations', filter=models.Q(reservations__status=True)
+            )
+        )
+        # Meta.ordering is not applied to GROUP BY queries, so keep it explicitly
+        if not queryset.query.order_by:
+            queryset = queryset.order_by(*self.model._meta.ordering)
+        return queryset
+
+    def with_free_seats(self, seats=1):
+        """Keep flights with at least ``seats`` seats neither booked nor held."""
+        queryset = self if 'active_reservation_count' in self.query.annotations else self.with_seat_counts()
+        return queryset.filter(
+            effective_capacity__gte=models.F('active_reservation_count') + models.F('held_seats') + seats
+        )
+
+    def refresh_effective_capacity(self):
+        """
+        Re-resolve the effective capacity of every flight in the queryset.
+
+        Called after an airplane's capacity changes; only flights whose value
+        changed are written (in one bulk UPDATE). Returns their ids.
+        """
+        changed = []
+        for flight in self.select_related('airplane').only(
+                'id', 'capacity_override', 'overbooking_percent', 'effective_capacity', 'airplane__capacity'):
+            effective_capacity = flight.resolve_effective_capacity()
+            if effective_capacity != flight.effective_capacity:
+                flight.effective_capacity = effective_capacity
+                changed.append(flight)
+
+        with transaction.atomic():
+            self.model.objects.bulk_update(changed, ['effective_capacity'], batch_size=500)
+            record_changes(self.model, [flight.id for flight in changed], 'updated', ['effective_capacity'])
+        return [flight.id for flight in changed]
 
 
 class Flight(models.Model):
@@ -33,11 +122,51 @@ class Flight(models.Model):
 
     airplane = models.ForeignKey(
         'airplanes.Airplane',
-        on_delete=models.CASCADE,
+        on_delete=models.PROTECT,
         related_name='flights',
         help_text="The airplane assigned to this flight"
     )
 
+    held_seats = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Seats temporarily held during checkout (see reservations.SeatHold)"
+    )
+
+    archived_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Set when the flight is archived (soft deleted); purged later"
+    )
+
+    capacity_override = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Seats for sale on this flight instead of the airplane's capacity"
+    )
+
+    overbooking_percent = models.DecimalField(
+        max_digits=4,
+        decimal_places=1,
+        default=Decimal('0'),
+        validators=[MinValueValidator(Decimal('0')), MaxValueValidator(MAX_OVERBOOKING_PERCENT)],
+        help_text="Extra seats sold on top of the capacity, as a percentage (expected no-shows)"
+    )
+
+    effective_capacity = models.PositiveIntegerField(
+        editable=False,
+        help_text="Seats that may be sold: override or airplane capacity, plus overbooking"
+    )
+
+    objects = FlightQuerySet.as_manager()
+
+    # Fields whose changes the signal handlers act on (capacity, cached payloads)
+    TRACKED_FIELDS = [
+        'flight_number', 'departure', 'destination', 'departure_time', 'arrival_time',
+        'airplane', 'effective_capacity',
+    ]
+
     class Meta:
         ordering = ['departure_time']
         verbose_name = "Flight"
@@ -48,6 +177,22 @@ class Flight(models.Model):
                 name='arrival_after_departure'
             )
         ]
+        indexes = [
+            # Partial indexes only cover live rows, the ones every API query reads
+            # Covers the seat columns, so "flights with seats" searches over a
+            # departure window read capacity without visiting the table
+            models.Index(
+                fields=['departure_time'],
+                include=['effective_capacity', 'held_seats'],
+                condition=models.Q(archived_at__isnull=True),
+                name='flight_active_departure_idx',
+            ),
+            models.Index(
+                fields=['airplane', 'departure_time'],
+                condition=models.Q(archived_at__isnull=True),
+                name='flight_active_airplane_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.flight_number}: {self.departure} → {self.destination}"
@@ -67,6 +212,12 @@ class Flight(models.Model):
         if self.airplane_id:
             self._check_flight_conflicts()
 
+        if self.capacity_override is not None and self.airplane_id and self.capacity_override > self.airplane.capacity:
+            raise ValidationError({
+                'capacity_override': f'Cannot exceed the airplane capacity ({self.airplane.capacity}); '
+                                     f'use overbooking_percent to sell extra seats.'
+            })
+
     def _check_flight_conflicts(self):
         """
         Check for flight time conflicts with the same airplane.
@@ -74,12 +225,11 @@ class Flight(models.Model):
         Business Rule: An airplane must have at least 1 hour gap between flights
         to allow for passenger boarding/disembarking, cleaning, and maintenance.
         """
-        buffer_time = timedelta(hours=1)
-        conflict_start = self.departure_time - buffer_time
-        conflict_end = self.arrival_time + buffer_time
+        conflict_start = self.departure_time - TURNAROUND
+        conflict_end = self.arrival_time + TURNAROUND
 
         # Find overlapping flights for the same airplane
-        conflicting_flights = Flight.objects.filter(
+        conflicting_flights = Flight.objects.active().filter(
             airplane=self.airplane
         ).exclude(
             id=self.id  # Exclude this flight when updating
@@ -98,18 +248,64 @@ class Flight(models.Model):
             })
 
     def save(self, *args, **kwargs):
-        """Ensure validation runs before saving."""
+        """
+        Resolve the effective capacity and ensure validation runs before saving.
+
+        The tracked fields the save changes are recorded in ``changed_fields``
+        for the signal handlers.
+        """
+        if self.airplane_id:
+            self.effective_capacity = self.resolve_effective_capacity()
         self.full_clean()
+
+        self.changed_fields = changed_fields(self, self.TRACKED_FIELDS, kwargs.get('update_fields'))
+        retimed = not self._state.adding and 'departure_time' in self.changed_fields
+
+        # held_seats is moved concurrently with F() updates by reservations.holds;
+        # writing back the in-memory value would undo them
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'held_seats'
+            ]
+
         super().save(*args, **kwargs)
 
+        # Keep the reservations' partition key in sync when a flight is retimed
+        if retimed:
+            self.reservations.update(flight_departure=self.departure_time)
+
+    def is_archived(self):
+        """Check if flight has been archived."""
+        return self.archived_at is not None
+
+    def archive(self):
+        """Archive this flight (soft delete); reservations are purged later in chunks."""
+        self.archived_at = timezone.now()
+        Flight.objects.filter(pk=self.pk).update(archived_at=self.archived_at)
+        record_change(self, 'updated', ['archived_at'])
+
     def get_reservation_count(self):
-        """Return the number of reservations for this flight."""
+        """Return the number of active reservations for this flight."""
+        if hasattr(self, 'active_reservation_count'):
+            return self.active_reservation_count
         return self.reservations.filter(status=True).count()
 
+    def resolve_effective_capacity(self):
+        """Compute the effective capacity from the airplane and the flight's overrides."""
+        return resolve_capacity(self.airplane.capacity, self.capacity_override, self.overbooking_percent)
+
     def is_fully_booked(self):
-        """Check if flight has reached maximum capacity."""
-        return self.get_reservation_count() >= self.airplane.capacity
+        """Check if flight has reached its effective capacity (including held seats)."""
+        return self.available_seats() <= 0
 
-    def available_seats(self):
-        """Return number of available seats on this flight."""
-        return self.airplane.capacity - self.get_reservation_count()
+    def available_seats(self, booked=None):
+        """
+        Return number of seats that are neither booked nor held.
+
+        Every capacity check goes through here. ``booked`` defaults to the
+        active reservation count.
+        """
+        if booked is None:
+            booked = self.get_reservation_count()
+        return self.effective_capacity - booked - self.held_seats
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Flight
+from .models import Flight, TURNAROUND
 from airplanes.models import Airplane
 from django.utils import timezone
 
@@ -9,7 +9,7 @@ class FlightSerializer(serializers.ModelSerializer):
     Serializer for Flight model with nested airplane details and computed fields.
     """
     airplane_details = serializers.SerializerMethodField(read_only=True)
-    airplane = serializers.PrimaryKeyRelatedField(queryset=Airplane.objects.all())
+    airplane = serializers.PrimaryKeyRelatedField(queryset=Airplane.objects.active())
 
     available_seats = serializers.SerializerMethodField(read_only=True)
     is_fully_booked = serializers.SerializerMethodField(read_only=True)
@@ -26,11 +26,23 @@ class FlightSerializer(serializers.ModelSerializer):
             'arrival_time',
             'airplane',
             'airplane_details',
+            'capacity_override',
+            'overbooking_percent',
+            'effective_capacity',
             'available_seats',
             'is_fully_booked',
             'reservation_count',
         ]
-        read_only_fields = ['id', 'airplane_details', 'available_seats', 'is_fully_booked', 'reservation_count']
+        read_only_fields = [
+            'id', 'airplane_details', 'effective_capacity', 'available_seats', 'is_fully_booked', 'reservation_count'
+        ]
+        # Columns read by computed fields (for ?fields= query pruning)
+        field_columns = {
+            'airplane_details': ['airplane__id', 'airplane__tail_number', 'airplane__model', 'airplane__capacity'],
+            'available_seats': ['effective_capacity', 'held_seats'],
+            'is_fully_booked': ['effective_capacity', 'held_seats'],
+            'reservation_count': [],
+        }
 
     def get_airplane_details(self, obj):
         """Return nested airplane information."""
@@ -72,17 +84,23 @@ class FlightSerializer(serializers.ModelSerializer):
                     {"arrival_time": "Arrival time must be after departure time."}
                 )
 
+        # A capacity override blocks seats; selling beyond the airplane is what overbooking is for
+        capacity_override = data.get('capacity_override', self.instance.capacity_override if self.instance else None)
+        if airplane and capacity_override is not None and capacity_override > airplane.capacity:
+            raise serializers.ValidationError({
+                'capacity_override': f'Cannot exceed the airplane capacity ({airplane.capacity}); '
+                                     f'use overbooking_percent to sell extra seats.'
+            })
+
         # Check for flight conflicts with the same airplane
         if airplane and departure_time and arrival_time:
-            from datetime import timedelta
             from django.db import models as django_models
 
-            buffer_time = timedelta(hours=1)
-            conflict_start = departure_time - buffer_time
-            conflict_end = arrival_time + buffer_time
+            conflict_start = departure_time - TURNAROUND
+            conflict_end = arrival_time + TURNAROUND
 
             # Find overlapping flights for the same airplane
-            conflicting_flights = Flight.objects.filter(
+            conflicting_flights = Flight.objects.active().filter(
                 airplane=airplane
             )
 
@@ -124,7 +142,38 @@ class FlightListSerializer(serializers.ModelSerializer):
             'airplane_model',
             'available_seats',
         ]
+        # Columns read by computed fields (for ?fields= query pruning)
+        field_columns = {'available_seats': ['effective_capacity', 'held_seats']}
 
     def get_available_seats(self, obj):
         """Return available seats."""
         return obj.available_seats()
+
+
+class FlightDelaySerializer(serializers.Serializer):
+    """One flight of a disruption and how far to move it."""
+    id = serializers.IntegerField(min_value=1)
+    delay_minutes = serializers.IntegerField(
+        min_value=-24 * 60,
+        max_value=48 * 60,
+        help_text="Minutes to move the flight (negative moves it earlier)"
+    )
+
+
+class FlightDisruptionSerializer(serializers.Serializer):
+    """Request body of the disruption endpoint."""
+    flights = FlightDelaySerializer(many=True, allow_empty=False, max_length=500)
+    propagate = serializers.BooleanField(
+        default=True,
+        help_text="Push knock-on delays down each airplane's rotation"
+    )
+    reason = serializers.CharField(max_length=200, required=False, allow_blank=True, default='')
+    notify = serializers.BooleanField(default=True, help_text="Email affected passengers")
+
+    def validate_flights(self, value):
+        """Reject duplicate flight ids."""
+        ids = [item['id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each flight may only appear once.")
+        return value
+
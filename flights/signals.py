@@ -0,0 +1,45 @@
+"""
+Signal handlers that keep the in-memory connection graphs and live
+availability streams current.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from airline_project.tracking import saved_changes
+from .availability import availability_hub
+from .connections import graph_cache
+from .models import Flight
+
+
+@receiver(post_save, sender=Flight)
+def flight_saved(sender, instance, **kwargs):
+    """Patch the cached day graph with the saved flight."""
+    graph_cache.flight_changed(instance)
+    # The flight may have moved to another airplane
+    transaction.on_commit(lambda: availability_hub.publish([instance.id]))
+
+
+@receiver(post_delete, sender=Flight)
+def flight_deleted(sender, instance, **kwargs):
+    """Drop a deleted flight from the cached day graphs."""
+    graph_cache.flight_deleted(instance.id)
+
+
+@receiver(post_save, sender='airplanes.Airplane')
+def airplane_saved(sender, instance, created, **kwargs):
+    """Re-resolve the effective capacity of this airplane's flights after a capacity change."""
+    if created or 'capacity' not in saved_changes(instance):
+        return
+    flight_ids = instance.flights.all().refresh_effective_capacity()
+    for flight_id in flight_ids:
+        graph_cache.seats_changed(flight_id)
+    if flight_ids:
+        transaction.on_commit(lambda: availability_hub.publish(flight_ids))
+
+
+@receiver(post_save, sender='reservations.Reservation')
+def reservation_saved(sender, instance, **kwargs):
+    """Mark the flight's seat count as stale after a booking or cancellation."""
+    graph_cache.seats_changed(instance.flight_id)
+    transaction.on_commit(lambda: availability_hub.publish([instance.flight_id]))
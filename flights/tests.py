@@ -1,3 +1,323 @@
-from django.test import TestCase
+from datetime import datetime, time, timedelta
+from unittest import mock
+import asyncio
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airline_project.testing import AdminTestCase, APITestCase, create_airplane, create_flight, create_reservation
+from .availability import AvailabilityHub, Subscription
+from .connections import graph_cache
+
+
+class FlightAdminTests(AdminTestCase):
+
+    def test_changelist_query_count_is_constant(self):
+        airplane = create_airplane()
+
+        def add_rows():
+            for _ in range(20):
+                create_reservation(create_flight(airplane))
+
+        add_rows()
+        self.assertConstantQueries('/admin/flights/flight/', add_rows)
+
+    def test_add_and_change_forms(self):
+        self.assertEqual(self.client.get('/admin/flights/flight/add/').status_code, 200)
+
+        flight = create_flight(capacity_override=100)
+        response = self.client.get(f'/admin/flights/flight/{flight.id}/change/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Effective capacity')
+
+
+class ConnectionSearchTests(APITestCase):
+    """
+    AAA -> BBB -> CCC with a 60 minute connection, a BBB -> CCC leg only 30
+    minutes after landing (too tight), and a later-arriving direct flight.
+    """
+
+    def setUp(self):
+        super().setUp()
+        graph_cache.clear()
+        self.client = APIClient()
+        self.day = timezone.localdate() + timedelta(days=3)
+        self.first = self.leg('AAA', 'BBB', 8, 10)
+        self.second = self.leg('BBB', 'CCC', 11, 13, capacity=2)
+        self.tight = self.leg('BBB', 'CCC', 10.5, 12.5)
+        self.direct = self.leg('AAA', 'CCC', 9, 15)
+        create_reservation(self.second)
+
+    def at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, time())) + timedelta(hours=hour)
+
+    def leg(self, departure, destination, departs, arrives, capacity=150):
+        return create_flight(
+            create_airplane(capacity), departure=departure, destination=destination,
+            departure_time=self.at(departs), duration=self.at(arrives) - self.at(departs),
+        )
+
+    def search(self, **params):
+        response = self.client.get('/api/flights/connections/', {
+            'departure': 'AAA', 'destination': 'CCC', 'date': self.day.isoformat(), **params,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def itineraries(self, **params):
+        return [[leg['id'] for leg in itinerary['legs']] for itinerary in self.search(**params)['results']]
+
+    def test_multi_leg_itineraries_respect_min_connection_time(self):
+        data = self.search()
+        self.assertFalse(data['truncated'])
+        self.assertEqual(
+            [[leg['id'] for leg in itinerary['legs']] for itinerary in data['results']],
+            [[self.first.id, self.second.id], [self.direct.id]],
+        )
+        self.assertEqual(data['results'][0]['connections'], 1)
+        self.assertEqual(data['results'][0]['available_seats'], 1)
+
+    def test_max_legs(self):
+        self.assertEqual(self.itineraries(max_legs=1), [[self.direct.id]])
+
+    def test_passengers_need_seats_on_every_leg(self):
+        self.assertEqual(self.itineraries(passengers=2), [[self.direct.id]])
+
+    def test_truncated_when_time_budget_runs_out(self):
+        with mock.patch('flights.connections.SEARCH_TIME_BUDGET', -1):
+            data = self.search()
+        self.assertTrue(data['truncated'])
+        self.assertEqual(data['results'], [])
+
+    def test_archive_invalidates_cached_graph(self):
+        self.search()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/api/flights/{self.direct.id}/').status_code, 204)
+        self.assertEqual(self.itineraries(), [[self.first.id, self.second.id]])
+
+    def test_retime_invalidates_cached_graph(self):
+        self.search()
+        response = self.client.patch(f'/api/flights/{self.direct.id}/', {
+            'departure_time': self.at(33), 'arrival_time': self.at(39),
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.itineraries(), [[self.first.id, self.second.id]])
+
+    def test_booking_invalidates_cached_seats(self):
+        self.search()
+        create_reservation(self.second)
+        self.assertEqual(self.itineraries(), [[self.direct.id]])
+
+
+class DisruptionTests(APITestCase):
+    """One airplane flying 08:00-10:00, 11:30-13:30 and 15:00-17:00."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.start = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=3), time(8)))
+        airplane = create_airplane()
+        self.rotation = [
+            create_flight(airplane, departure_time=self.start + timedelta(hours=hours))
+            for hours in (0, 3.5, 7)
+        ]
+
+    def disrupt(self, delays, **options):
+        return self.client.post('/api/flights/disrupt/', {
+            'flights': [{'id': flight_id, 'delay_minutes': minutes} for flight_id, minutes in delays.items()],
+            'notify': False,
+            **options,
+        }, format='json')
+
+    def test_knock_on_delays_follow_the_rotation(self):
+        first, second, third = self.rotation
+        response = self.disrupt({first.id: 60})
+        self.assertEqual(response.status_code, 200)
+        # 30 and 5 minutes short of the turnaround, rounded up past it in 5 minute steps
+        self.assertEqual(
+            [(row['id'], row['delay_minutes']) for row in response.data['flights']],
+            [(first.id, 60), (second.id, 35), (third.id, 10)],
+        )
+        third.refresh_from_db()
+        self.assertEqual(third.departure_time, self.start + timedelta(hours=7, minutes=10))
+
+    def test_without_propagation_conflicts_are_rejected(self):
+        response = self.disrupt({self.rotation[0].id: 60}, propagate=False)
+        self.assertEqual(response.status_code, 400)
+        self.rotation[1].refresh_from_db()
+        self.assertEqual(self.rotation[1].departure_time, self.start + timedelta(hours=3.5))
+
+    def test_negative_delays(self):
+        third = self.rotation[2]
+        response = self.disrupt({third.id: -20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['delay_minutes'] for row in response.data['flights']], [-20])
+
+        # Less than the turnaround after the previous arrival
+        self.assertEqual(self.disrupt({third.id: -40}).status_code, 400)
+
+    def test_rejected_ids(self):
+        archived = create_flight()
+        archived.archive()
+        response = self.disrupt({self.rotation[0].id: 10, archived.id: 10, 999999: 10})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], f'Unknown or archived flight(s): {archived.id}, 999999.')
+        self.rotation[0].refresh_from_db()
+        self.assertEqual(self.rotation[0].departure_time, self.start)
+
+    def test_reservations_follow_the_new_departure(self):
+        reservation = create_reservation(self.rotation[0])
+        other = create_reservation(self.rotation[1])
+        self.assertEqual(self.disrupt({self.rotation[0].id: 60}).status_code, 200)
+
+        reservation.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(reservation.flight_departure, self.start + timedelta(hours=1))
+        self.assertEqual(other.flight_departure, self.start + timedelta(hours=3.5, minutes=35))
+
+
+@override_settings(AVAILABILITY_STREAM_INTERVAL=3600)  # Tests flush the hub themselves
+class AvailabilityStreamTests(APITestCase):
+
+    url = '/api/flights/availability/stream/'
+
+    def setUp(self):
+        super().setUp()
+        self.flight = create_flight(capacity_override=3)
+
+    def test_wsgi_is_not_supported(self):
+        response = self.client.get(self.url, {'ids': self.flight.id})
+        self.assertEqual(response.status_code, 501)
+
+    async def test_invalid_ids(self):
+        for ids in ('', 'a,b', ','.join(str(number) for number in range(1, 52))):
+            response = await self.async_client.get(self.url, {'ids': ids})
+            self.assertEqual(response.status_code, 400, ids)
+
+    async def test_stream_starts_with_a_snapshot(self):
+        hub = AvailabilityHub()
+        with mock.patch('flights.views.availability_hub', hub):
+            response = await self.async_client.get(self.url, {'ids': self.flight.id})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            first = await anext(aiter(response.streaming_content))
+        hub._pump.cancel()
+        self.assertTrue(first.startswith(b'event: availability\n'))
+        self.assertIn(b'"available_seats": 3', first)
+
+    async def test_hub_pushes_changed_availability_once(self):
+        hub = AvailabilityHub()
+        subscription = hub.subscribe([self.flight.id])
+        try:
+            hub.publish([self.flight.id, self.flight.id + 1])
+            await hub.flush()
+            availability = await asyncio.wait_for(subscription.get(), 1)
+            self.assertEqual(availability['available_seats'], 3)
+
+            # Unchanged figures are not sent again
+            hub.publish([self.flight.id])
+            await hub.flush()
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(subscription.get(), 0.05)
+
+            await sync_to_async(create_reservation)(self.flight)
+            hub.publish([self.flight.id])
+            await hub.flush()
+            availability = await asyncio.wait_for(subscription.get(), 1)
+            self.assertEqual(availability['available_seats'], 2)
+        finally:
+            hub.unsubscribe(subscription)
+            hub._pump.cancel()
+
+    async def test_subscription_keeps_only_the_latest_update(self):
+        subscription = Subscription([self.flight.id])
+        subscription.put({'flight_id': self.flight.id, 'available_seats': 3})
+        subscription.put({'flight_id': self.flight.id, 'available_seats': 2})
+        self.assertEqual((await subscription.get())['available_seats'], 2)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(subscription.get(), 0.05)
+
+
+class SparseFieldsetTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.flight = create_flight(capacity_override=5)
+        create_reservation(self.flight)
+
+    def test_list_returns_only_requested_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/flights/', {'fields': 'id,flight_number'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [{'id': self.flight.id, 'flight_number': self.flight.flight_number}])
+        # Only the two columns are read, and reservations are not counted
+        rows_query = queries.captured_queries[-1]['sql']
+        self.assertTrue(rows_query.startswith('SELECT "flights_flight"."id", "flights_flight"."flight_number" FROM'))
+        self.assertNotIn('reservations_reservation', rows_query)
+
+    def test_computed_fields(self):
+        response = self.client.get(f'/api/flights/{self.flight.id}/', {'fields': 'available_seats,is_fully_booked'})
+        self.assertEqual(response.data, {'available_seats': 4, 'is_fully_booked': False})
+
+    def test_nested_fields(self):
+        response = self.client.get('/api/reservations/', {'fields': 'id,flight'})
+        row = response.data['results'][0]
+        self.assertEqual(list(row), ['id', 'flight'])
+        self.assertEqual(row['flight']['available_seats'], 4)
+
+    def test_invalid_fields(self):
+        for fields in ('id,nope', ' , '):
+            response = self.client.get('/api/flights/', {'fields': fields})
+            self.assertEqual(response.status_code, 400, fields)
+            self.assertIn('fields', response.data)
+
+
+class ExpandTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.flight = create_flight()
+        self.reservations = [create_reservation(self.flight) for _ in range(3)]
+
+    def test_expand_airplane(self):
+        response = self.client.get(f'/api/flights/{self.flight.id}/', {'expand': 'airplane', 'fields': 'id,airplane'})
+        self.assertEqual(response.data['airplane']['tail_number'], self.flight.airplane.tail_number)
+
+    def test_expand_reservations_with_limit(self):
+        response = self.client.get('/api/flights/', {'expand': 'reservations', 'reservations_limit': 2})
+        self.assertEqual(
+            [row['id'] for row in response.data['results'][0]['reservations']],
+            [reservation.id for reservation in self.reservations[:0:-1]],
+        )
+
+    def test_expanded_list_query_count_is_constant(self):
+        params = {'expand': 'airplane,reservations'}
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/flights/', params)
+        for _ in range(5):
+            create_reservation(create_flight())
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get('/api/flights/', params)
+        self.assertEqual(response.data['count'], 6)
+
+    def test_nested_expansion_implies_parent(self):
+        response = self.client.get('/api/reservations/', {'expand': 'flight.airplane'})
+        flight = response.data['results'][0]['flight']
+        self.assertEqual(flight['id'], self.flight.id)
+        self.assertEqual(flight['airplane']['tail_number'], self.flight.airplane.tail_number)
+
+    def test_invalid_expansions(self):
+        for url, params, key in (
+            ('/api/flights/', {'expand': 'pilot'}, 'expand'),
+            ('/api/reservations/', {'expand': 'flight.airplane.flights'}, 'expand'),
+            ('/api/flights/', {'expand': 'reservations', 'reservations_limit': 'all'}, 'reservations_limit'),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(key, response.data)
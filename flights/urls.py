@@ -1,8 +1,11 @@
+# Import path for the plain (non-DRF) async view
+from django.urls import path
+
 # Import routers from Django REST Framework
 from rest_framework.routers import DefaultRouter
 
-# Import our viewset
-from .views import FlightViewSet
+# Import our viewset and the availability stream view
+from .views import FlightViewSet, availability_stream
 
 # Create a router instance
 router = DefaultRouter()
@@ -15,7 +18,11 @@ router = DefaultRouter()
 # - PATCH /flights/{id}/ -> Update flight
 # - DELETE /flights/{id}/ -> Delete flight
 # - GET /flights/{id}/reservations/ -> Get reservations for flight (custom action)
+# - POST /flights/disrupt/ -> Delay/retime flights and their rotations (custom action)
 router.register(r'flights', FlightViewSet, basename='flight')
 
 # Export the URL patterns
-urlpatterns = router.urls
+# - GET /flights/availability/stream/?ids=1,2 -> Server-Sent Events seat availability (ASGI only, 501 under WSGI)
+urlpatterns = [
+    path('flights/availability/stream/', availability_stream, name='flight-availability-stream'),
+] + router.urls
@@ -1,25 +1,79 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from airline_project.expansions import Expansion, ExpandMixin
+from airline_project.fieldsets import SparseFieldsetMixin
+from airplanes.serializers import AirplaneListSerializer
 from .models import Flight
-from .serializers import FlightSerializer, FlightListSerializer
-from reservations.serializers import ReservationListSerializer
-from datetime import datetime
+from .serializers import FlightSerializer, FlightListSerializer, FlightDisruptionSerializer
+from .connections import graph_cache, search_connections
+from .availability import availability_hub, availability_snapshot
+from .disruptions import apply_disruption
+from reservations.models import Reservation
+from reservations.serializers import ReservationListSerializer, ReservationSummarySerializer
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of flight IDs per batch request
+FLIGHT_BATCH_MAX = 500
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(SparseFieldsetMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing flights.
 
-    Supports filtering by departure, destination, and dates.
+    Supports filtering by departure, destination, and dates, narrowing
+    list and detail responses with ?fields= and embedding the airplane and
+    active reservations with ?expand=.
     Provides custom action to retrieve flight reservations.
     """
-    queryset = Flight.objects.all()
+    queryset = Flight.objects.active()
     serializer_class = FlightSerializer
+    sparse_fieldset_actions = ('list', 'retrieve', 'batch')
+    expand_actions = ('list', 'retrieve', 'batch')
+    expansions = {
+        # Already joined by get_queryset
+        'airplane': Expansion(AirplaneListSerializer),
+        # Newest active reservations, at most ?reservations_limit= per flight, in one query
+        'reservations': Expansion(
+            ReservationSummarySerializer,
+            many=True,
+            source='active_reservations',
+            prepare=lambda queryset, limit: queryset.prefetch_related(Prefetch(
+                'reservations',
+                queryset=Reservation.objects.filter(status=True).order_by('-created_at', '-id')[:limit],
+                to_attr='active_reservations',
+            )),
+        ),
+    }
 
     def get_queryset(self):
         """Apply filters based on query parameters."""
-        queryset = Flight.objects.select_related('airplane').all()
+        queryset = Flight.objects.active().select_related('airplane')
+
+        # Count reservations in the same query, only if a seat field will be serialized
+        if self.action in ('list', 'retrieve', 'batch') and self.wants_field(
+                'available_seats', 'is_fully_booked', 'reservation_count'):
+            queryset = queryset.with_seat_counts()
+
+        # Only flights with at least this many seats neither booked nor held
+        min_seats = self.request.query_params.get('min_seats')
+        if min_seats:
+            try:
+                queryset = queryset.with_free_seats(max(1, int(min_seats)))
+            except ValueError:
+                pass  # Invalid number, skip filtering
 
         # Filter by departure location
         departure = self.request.query_params.get('departure')
@@ -57,11 +111,24 @@ class FlightViewSet(viewsets.ModelViewSet):
             return FlightListSerializer
         return FlightSerializer
 
+    def perform_destroy(self, instance):
+        """
+        Archive (soft delete) the flight instead of deleting it.
+
+        Deleting would cascade over all of its reservations in one long
+        transaction; archived flights are purged in chunks by the
+        purge_archived management command.
+        """
+        instance.archive()
+        transaction.on_commit(lambda: graph_cache.flight_deleted(instance.id))
+        logger.info(f'Flight archived: {instance.flight_number}')
+
     @action(detail=True, methods=['get'], url_path='reservations')
     def reservations(self, request, pk=None):
         """Get all reservations for this flight (with pagination)."""
         flight = self.get_object()
-        queryset = flight.reservations.all()
+        # Filtering on the partition key lets PostgreSQL scan a single partition
+        queryset = flight.reservations.filter(flight_departure=flight.departure_time)
 
         # Filter by status if provided
         status_param = request.query_params.get('status')
@@ -78,3 +145,190 @@ class FlightViewSet(viewsets.ModelViewSet):
         # Fallback if pagination is not configured
         serializer = ReservationListSerializer(queryset, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='batch')
+    def batch(self, request):
+        """
+        Get many flights by ID in one request.
+
+        Query Parameters:
+        - ids: Comma-separated flight IDs (required, max 500)
+
+        Flights are loaded with one IN query (seat counts included) and
+        serialized like flight details; ?fields= and ?expand= apply. Returns
+        results keyed by ID; unknown or archived IDs map to null and are
+        listed in not_found.
+        """
+        try:
+            ids = list(dict.fromkeys(
+                int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()
+            ))
+        except ValueError:
+            return Response(
+                {'error': 'ids must be a comma-separated list of flight IDs.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not ids:
+            return Response({'error': 'ids query parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > FLIGHT_BATCH_MAX:
+            return Response(
+                {'error': f'At most {FLIGHT_BATCH_MAX} flights can be requested at once.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        flights = list(self.filter_queryset(self.get_queryset()).filter(id__in=ids))
+        data = self.get_serializer(flights, many=True).data
+        found = {flight.id: item for flight, item in zip(flights, data)}
+        return Response({
+            'count': len(found),
+            'results': {str(flight_id): found.get(flight_id) for flight_id in ids},
+            'not_found': [flight_id for flight_id in ids if flight_id not in found],
+        })
+
+    @action(detail=False, methods=['post'], url_path='disrupt')
+    def disrupt(self, request):
+        """
+        Delay or retime flights and propagate knock-on delays.
+
+        Request Body:
+        - flights: List of {"id": flight ID, "delay_minutes": minutes (negative = earlier)}
+        - propagate: Push knock-on delays down each airplane's rotation (default: true)
+        - reason: Optional reason included in passenger emails
+        - notify: Email passengers of every moved flight in the background (default: true)
+        """
+        serializer = FlightDisruptionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            moved, queued = apply_disruption(
+                {item['id']: timedelta(minutes=item['delay_minutes']) for item in data['flights']},
+                propagate=data['propagate'],
+                reason=data['reason'],
+                notify=data['notify'],
+            )
+        except DjangoValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'message': f'{len(moved)} flight(s) rescheduled.',
+            'flights': [
+                {
+                    'id': change['flight'].id,
+                    'flight_number': change['flight'].flight_number,
+                    'previous_departure_time': change['previous_departure_time'],
+                    'departure_time': change['flight'].departure_time,
+                    'arrival_time': change['flight'].arrival_time,
+                    'delay_minutes': int(change['shift'].total_seconds() // 60),
+                }
+                for change in moved
+            ],
+            'notifications_queued': queued,
+        })
+
+    @action(detail=False, methods=['get'], url_path='connections')
+    def connections(self, request):
+        """
+        Search direct and connecting itineraries between two locations.
+
+        Query Parameters:
+        - departure, destination: Locations to travel between (required)
+        - date: Departure date of the first leg, YYYY-MM-DD (required)
+        - max_legs: Maximum number of flights per itinerary (default: 2, max: 3)
+        - limit: Number of itineraries to return (default: 5, max: 20)
+        - passengers: Seats needed on every leg (default: 1)
+        """
+        departure = request.query_params.get('departure')
+        destination = request.query_params.get('destination')
+        date_param = request.query_params.get('date')
+
+        if not departure or not destination or not date_param:
+            return Response(
+                {'error': 'departure, destination and date query parameters are required.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            day = datetime.strptime(date_param, '%Y-%m-%d').date()
+            max_legs = int(request.query_params.get('max_legs', 2))
+            limit = int(request.query_params.get('limit', 5))
+            passengers = int(request.query_params.get('passengers', 1))
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date (YYYY-MM-DD) or numeric parameter.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        itineraries, truncated = search_connections(
+            departure, destination, day,
+            max_legs=max_legs, limit=limit, passengers=max(passengers, 1),
+        )
+        return Response({
+            'count': len(itineraries),
+            'truncated': truncated,
+            'results': itineraries,
+        })
+
+
+# Limits for the availability stream
+AVAILABILITY_STREAM_MAX_FLIGHTS = 50
+AVAILABILITY_STREAM_KEEPALIVE = 15  # seconds between comment lines on an idle stream
+
+
+def _sse_event(availability):
+    return f"event: availability\ndata: {json.dumps(availability)}\n\n"
+
+
+async def availability_stream(request):
+    """
+    Server-Sent Events stream of seat availability for a set of flights.
+
+    Query Parameters:
+    - ids: Comma-separated flight IDs (required, max 50)
+
+    Sends the current availability of every flight first, then one event per
+    flight whenever its availability changes (at most once per
+    settings.AVAILABILITY_STREAM_INTERVAL seconds). Requires an ASGI server;
+    under WSGI it answers 501, since an endless stream would tie up a worker.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'The availability stream requires an ASGI server. Poll /api/flights/batch/ instead.'},
+            status=501
+        )
+
+    try:
+        flight_ids = {int(value) for value in request.GET.get('ids', '').split(',') if value.strip()}
+    except ValueError:
+        return JsonResponse({'error': 'ids must be a comma-separated list of flight IDs.'}, status=400)
+
+    if not flight_ids:
+        return JsonResponse({'error': 'ids query parameter is required.'}, status=400)
+    if len(flight_ids) > AVAILABILITY_STREAM_MAX_FLIGHTS:
+        return JsonResponse(
+            {'error': f'At most {AVAILABILITY_STREAM_MAX_FLIGHTS} flights can be streamed at once.'},
+            status=400
+        )
+
+    async def events():
+        # Subscribe before taking the snapshot so no change falls in between
+        subscription = availability_hub.subscribe(flight_ids)
+        try:
+            snapshot = await sync_to_async(availability_snapshot)(flight_ids)
+            for availability in snapshot.values():
+                yield _sse_event(availability)
+
+            while True:
+                try:
+                    availability = await asyncio.wait_for(subscription.get(), AVAILABILITY_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield _sse_event(availability)
+        finally:
+            availability_hub.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
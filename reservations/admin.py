@@ -1,5 +1,9 @@
 from django.contrib import admin
-from .models import Reservation
+from django.db import transaction
+
+from changes.log import record_change, record_changes
+from .models import Reservation, SeatHold, WaitlistEntry
+from .cancellations import bulk_cancel
 
 
 @admin.register(Reservation)
@@ -16,6 +20,7 @@ class ReservationAdmin(admin.ModelAdmin):
         'created_at',
     ]
 
+    list_select_related = ['flight']
     list_filter = ['status', 'created_at', 'flight__departure', 'flight__destination']
     search_fields = ['reservation_code', 'passenger_name', 'passenger_email', 'flight__flight_number']
     ordering = ['-created_at']
@@ -39,9 +44,50 @@ class ReservationAdmin(admin.ModelAdmin):
         """Return flight number and route."""
         return f"{obj.flight.flight_number}: {obj.flight.departure} → {obj.flight.destination}"
     get_flight_info.short_description = 'Flight'
+    get_flight_info.admin_order_field = 'flight__flight_number'
 
     def cancel_reservations(self, request, queryset):
         """Bulk action to cancel multiple reservations."""
-        updated = queryset.filter(status=True).update(status=False)
-        self.message_user(request, f"{updated} reservation(s) cancelled successfully.")
+        cancelled_ids, _ = bulk_cancel(queryset, notify=False)
+        self.message_user(request, f"{len(cancelled_ids)} reservation(s) cancelled successfully.")
     cancel_reservations.short_description = "Cancel selected reservations"
+
+    # Reservation deletes are not recorded by a signal (see changes/signals.py)
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            record_change(obj, 'deleted')
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            record_changes(Reservation, list(queryset.values_list('id', flat=True)), 'deleted')
+            super().delete_queryset(request, queryset)
+
+
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    """Read-only admin view of active seat holds."""
+
+    list_display = ['token', 'flight', 'seats', 'expires_at', 'created_at']
+    list_select_related = ['flight']
+    ordering = ['expires_at']
+    readonly_fields = ['token', 'flight', 'seats', 'expires_at', 'created_at']
+
+    # Holds must go through reservations.holds to keep Flight.held_seats in sync
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    """Admin view of flight waitlists, oldest entry first."""
+
+    list_display = ['id', 'flight', 'passenger_name', 'passenger_email', 'created_at', 'promoted_at', 'reservation_code']
+    list_select_related = ['flight']
+    list_filter = ['promoted_at']
+    search_fields = ['passenger_name', 'passenger_email', 'reservation_code', 'flight__flight_number']
+    ordering = ['created_at', 'id']
+    readonly_fields = ['created_at', 'promoted_at', 'reservation_code']
@@ -0,0 +1,74 @@
+"""
+Read-through cache of serialized reservations keyed by reservation code.
+
+Check-in and "manage booking" look reservations up by code far more often
+than reservations change, so the serialized payload is cached and evicted
+whenever the reservation (or its flight) is saved or cancelled.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Reservation
+from .serializers import ReservationSerializer
+
+KEY_PREFIX = 'reservation:code:'
+
+
+def cache_key(code):
+    return f'{KEY_PREFIX}{code.upper()}'
+
+
+def load_reservation_payload(code):
+    """Return the serialized reservation for ``code`` from the database, or None."""
+    reservation = (
+        Reservation.objects.select_related('flight', 'flight__airplane')
+        .filter(reservation_code=code.upper())
+        .first()
+    )
+    if reservation is None:
+        return None
+    return ReservationSerializer(reservation).data
+
+
+def get_reservation_payload(code):
+    """Return the serialized reservation for ``code``, reading through the cache."""
+    key = cache_key(code)
+    payload = cache.get(key)
+    if payload is None:
+        payload = load_reservation_payload(code)
+        if payload is not None:
+            cache.set(key, dict(payload), settings.RESERVATION_CACHE_TTL)
+    return payload
+
+
+def get_reservation_payloads(codes):
+    """
+    Return ``{code: payload}`` for the given codes that exist, reading through the cache.
+
+    Cached payloads are fetched in one round trip; the rest are loaded with a
+    single IN query and cached.
+    """
+    codes = [code.upper() for code in codes]
+    cached = cache.get_many([cache_key(code) for code in codes])
+    payloads = {code: cached[cache_key(code)] for code in codes if cache_key(code) in cached}
+
+    missing = [code for code in codes if code not in payloads]
+    if missing:
+        reservations = list(
+            Reservation.objects.select_related('flight', 'flight__airplane').filter(reservation_code__in=missing)
+        )
+        loaded = {
+            reservation.reservation_code: dict(payload)
+            for reservation, payload in zip(reservations, ReservationSerializer(reservations, many=True).data)
+        }
+        if loaded:
+            cache.set_many({cache_key(code): payload for code, payload in loaded.items()}, settings.RESERVATION_CACHE_TTL)
+        payloads.update(loaded)
+    return payloads
+
+
+def invalidate_codes(codes):
+    """Evict the cached payloads of the given reservation codes."""
+    keys = [cache_key(code) for code in codes if code]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,88 @@
+"""
+Bulk cancellation service.
+
+Cancels any number of reservations with a single
+``UPDATE ... SET status = false WHERE id IN (...) AND status = true`` and
+reports the resulting availability of every affected flight from one grouped
+query, instead of the per-reservation save()/count() round trips of
+``Reservation.cancel()``.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from changes.log import record_changes
+from flights.availability import availability_hub
+from flights.connections import graph_cache
+from flights.models import Flight
+from .cache import invalidate_codes
+from .emails import queue_cancellation_emails
+from .models import Reservation
+from .throttling import clear_sold_out
+from .waitlist import promote_waitlist
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _refresh_graph_seats(flight_ids):
+    """Mark seat counts stale in the cached connection graphs and live streams."""
+    for flight_id in flight_ids:
+        graph_cache.seats_changed(flight_id)
+    availability_hub.publish(flight_ids)
+    clear_sold_out(flight_ids)
+
+
+def flight_availability(flight_ids):
+    """Return availability info for each flight id, computed in one query."""
+    flights = Flight.objects.filter(id__in=flight_ids).with_seat_counts()
+    return [
+        {
+            'flight_id': flight.id,
+            'flight_number': flight.flight_number,
+            'available_seats': flight.available_seats(),
+            'total_capacity': flight.effective_capacity,
+            'active_reservations': flight.get_reservation_count(),
+            'is_fully_booked': flight.is_fully_booked(),
+        }
+        for flight in flights
+    ]
+
+
+def bulk_cancel(queryset, notify=True):
+    """
+    Cancel every active reservation in ``queryset``.
+
+    Cancellation emails are queued to be sent after commit when ``notify`` is
+    True; the freed seats are given to the flights' waitlists (whose
+    passengers are always notified). Returns a ``(cancelled_ids, flight_ids)`` tuple.
+    """
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(status=True)
+            .select_for_update(of=('self',))
+            .order_by()
+            .values_list('id', 'flight_id', 'reservation_code')
+        )
+        cancelled_ids = [reservation_id for reservation_id, _, _ in rows]
+        flight_ids = {flight_id for _, flight_id, _ in rows}
+        codes = [code for _, _, code in rows]
+
+        if cancelled_ids:
+            Reservation.objects.filter(id__in=cancelled_ids, status=True).update(
+                status=False, cancelled_at=timezone.now()
+            )
+            record_changes(Reservation, cancelled_ids, 'updated', ['cancelled_at', 'status'])
+
+            # queryset.update() skips post_save, so refresh the connection graph seats here
+            transaction.on_commit(lambda: _refresh_graph_seats(flight_ids))
+            transaction.on_commit(lambda: invalidate_codes(codes))
+
+            if notify:
+                queue_cancellation_emails(cancelled_ids)
+
+            # Freed seats go to waitlisted passengers in the same transaction
+            promote_waitlist(flight_ids)
+
+    if cancelled_ids:
+        logger.info(f'Bulk cancelled {len(cancelled_ids)} reservation(s) on {len(flight_ids)} flight(s)')
+    return cancelled_ids, sorted(flight_ids)
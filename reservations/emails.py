@@ -1,61 +1,122 @@
-from django.core.mail import send_mail
+"""
+Passenger notification emails.
+
+Message bodies are Django templates (plain text plus an HTML alternative)
+under ``templates/reservations/emails/``. Each template is compiled once per
+process and reused, so rendering a message is a context lookup rather than a
+parse. Flight details (including the formatted times) are computed once per
+flight and shared by every passenger's message. Many messages can be sent
+over a single backend connection with ``send_batch()``, e.g. to notify every
+passenger of a delayed flight.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.formats import date_format
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Background workers for notifications that must not block the request
+_email_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='email')
+
+# Messages handed to the backend per send_messages() call in send_batch()
+EMAIL_BATCH_SIZE = 500
+
+# Reservations notified per background task by queue_flight_update_emails()
+NOTIFICATION_CHUNK_SIZE = 500
+
+SUBJECTS = {
+    'confirmation': 'Flight Reservation Confirmation - {code}',
+    'cancellation': 'Reservation Cancelled - {code}',
+    'flight_update': 'Schedule Change for Flight {flight_number} - {code}',
+    'waitlist_promotion': 'Waitlist Seat Confirmed - {code}',
+}
+
+
+# Display format of flight times, e.g. "January 15, 2024 at 10:30 AM"
+TIME_FORMAT = r'F d, Y \a\t h:i A'
+
+
+def _format_time(value):
+    return date_format(timezone.localtime(value), TIME_FORMAT) if value else ''
 
-def send_reservation_confirmation_email(reservation):
-    """Send confirmation email to passenger after reservation is created."""
-    subject = f'Flight Reservation Confirmation - {reservation.reservation_code}'
-    flight = reservation.flight
-    airplane = flight.airplane
 
-    message = f"""
-Dear {reservation.passenger_name},
+def flight_context(flight, previous_departure_time=None, reason=''):
+    """Return the template context shared by every message about ``flight``."""
+    return {
+        'flight': flight,
+        'departure_time': _format_time(flight.departure_time),
+        'arrival_time': _format_time(flight.arrival_time),
+        'previous_departure_time': _format_time(previous_departure_time),
+        'reason': reason,
+    }
 
-Thank you for booking with us! Your flight reservation has been confirmed.
 
-RESERVATION DETAILS
--------------------
-Reservation Code: {reservation.reservation_code}
-Status: {'Active' if reservation.status else 'Cancelled'}
+@lru_cache(maxsize=None)
+def _template(name):
+    """Return the compiled template ``name``, loading it only once per process."""
+    return get_template(name)
 
-FLIGHT INFORMATION
-------------------
-Flight Number: {flight.flight_number}
-Departure: {flight.departure}
-Destination: {flight.destination}
-Departure Time: {flight.departure_time.strftime('%B %d, %Y at %I:%M %p')}
-Arrival Time: {flight.arrival_time.strftime('%B %d, %Y at %I:%M %p')}
 
-AIRCRAFT DETAILS
-----------------
-Aircraft: {airplane.model}
-Tail Number: {airplane.tail_number}
+def render_email(kind, context):
+    """Render the ``(text, html)`` bodies of email ``kind`` with ``context``."""
+    text = _template(f'reservations/emails/{kind}.txt').render(context)
+    html = _template(f'reservations/emails/{kind}.html').render(context)
+    return text.strip(), html
 
-IMPORTANT INFORMATION
----------------------
-- Please arrive at the airport at least 2 hours before departure
-- Bring a valid ID and your reservation code: {reservation.reservation_code}
-- Check-in opens 24 hours before departure
 
-Thank you for choosing our airline!
+def build_message(kind, reservation, shared_context=None, connection=None):
+    """
+    Return the ready-to-send email ``kind`` for a reservation.
 
-Best regards,
-Airline Management Team
-    """.strip()
+    ``shared_context`` is the ``flight_context()`` of the reservation's flight;
+    pass it when building many messages for the same flight.
+    """
+    flight = reservation.flight
+    context = dict(shared_context or flight_context(flight), reservation=reservation)
+    text, html = render_email(kind, context)
+    message = EmailMultiAlternatives(
+        subject=SUBJECTS[kind].format(code=reservation.reservation_code, flight_number=flight.flight_number),
+        body=text,
+        from_email=settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@airline.com',
+        to=[reservation.passenger_email],
+        connection=connection,
+    )
+    message.attach_alternative(html, 'text/html')
+    return message
+
+
+def send_batch(messages, connection=None):
+    """
+    Send ``messages`` over one backend connection; return the number sent.
+
+    The connection (SMTP session) is opened once for the whole batch instead
+    of once per message.
+    """
+    sent = 0
+    connection = connection or get_connection()
+    with connection:
+        batch = []
+        for message in messages:
+            batch.append(message)
+            if len(batch) >= EMAIL_BATCH_SIZE:
+                sent += connection.send_messages(batch) or 0
+                batch = []
+        if batch:
+            sent += connection.send_messages(batch) or 0
+    return sent
 
-    from_email = settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@airline.com'
 
+def send_reservation_confirmation_email(reservation):
+    """Send confirmation email to passenger after reservation is created."""
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=from_email,
-            recipient_list=[reservation.passenger_email],
-            fail_silently=False,
-        )
+        build_message('confirmation', reservation).send(fail_silently=False)
         logger.info(f'Confirmation email sent to {reservation.passenger_email}')
         return True
 
@@ -66,42 +127,109 @@ Airline Management Team
 
 def send_cancellation_email(reservation):
     """Send cancellation confirmation email to passenger."""
-    subject = f'Reservation Cancelled - {reservation.reservation_code}'
-    flight = reservation.flight
+    try:
+        build_message('cancellation', reservation).send(fail_silently=False)
+        logger.info(f'Cancellation email sent to {reservation.passenger_email}')
+        return True
 
-    message = f"""
-Dear {reservation.passenger_name},
+    except Exception as e:
+        logger.error(f'Failed to send cancellation email: {e}')
+        return False
 
-Your flight reservation has been cancelled as requested.
 
-CANCELLED RESERVATION
----------------------
-Reservation Code: {reservation.reservation_code}
-Flight Number: {flight.flight_number}
-Route: {flight.departure} → {flight.destination}
-Departure Time: {flight.departure_time.strftime('%B %d, %Y at %I:%M %p')}
+def _send_flight_update_chunk(flight_id, previous_departure_time, reason, reservation_ids):
+    """Worker: send schedule change emails for one chunk of a flight's reservations."""
+    from flights.models import Flight
+    from .models import Reservation
 
-If you did not request this cancellation, please contact us immediately.
+    try:
+        flight = Flight.objects.get(pk=flight_id)
+        shared_context = flight_context(flight, previous_departure_time, reason)
+        reservations = Reservation.objects.filter(id__in=reservation_ids, status=True).order_by('id')
+        sent = send_batch(
+            build_message('flight_update', reservation, shared_context)
+            for reservation in reservations.iterator()
+        )
+        logger.info(f'Flight update emails sent for {flight.flight_number}: {sent}/{len(reservation_ids)}')
+    except Exception as e:
+        logger.error(f'Failed to send flight update emails for flight {flight_id}: {e}')
+    finally:
+        close_old_connections()
+
+
+def queue_flight_update_emails(previous_departures, reason=''):
+    """
+    Notify passengers of rescheduled flights in the background once the transaction commits.
+
+    ``previous_departures`` maps flight ids to their departure time before the
+    change. Each flight's active reservations are split into chunks of
+    NOTIFICATION_CHUNK_SIZE, sent as separate background tasks over one
+    connection each. Returns the number of emails queued.
+    """
+    from .models import Reservation
+
+    reservation_ids = {}
+    for reservation_id, flight_id in (
+        Reservation.objects.filter(flight_id__in=previous_departures, status=True)
+        .order_by('flight_id', 'id')
+        .values_list('id', 'flight_id')
+    ):
+        reservation_ids.setdefault(flight_id, []).append(reservation_id)
+
+    def submit():
+        for flight_id, ids in reservation_ids.items():
+            for start in range(0, len(ids), NOTIFICATION_CHUNK_SIZE):
+                _email_executor.submit(
+                    _send_flight_update_chunk, flight_id, previous_departures[flight_id], reason,
+                    ids[start:start + NOTIFICATION_CHUNK_SIZE],
+                )
+
+    transaction.on_commit(submit)
+    return sum(len(ids) for ids in reservation_ids.values())
+
+
+def _send_queued_emails(kind, reservation_ids):
+    """Worker: send email ``kind`` for the given reservations over one connection."""
+    from .models import Reservation
 
-Thank you for your understanding.
+    try:
+        reservations = Reservation.objects.select_related('flight', 'flight__airplane').filter(id__in=reservation_ids)
+        contexts = {}
 
-Best regards,
-Airline Management Team
-    """.strip()
+        def messages():
+            for reservation in reservations.iterator():
+                if reservation.flight_id not in contexts:
+                    contexts[reservation.flight_id] = flight_context(reservation.flight)
+                yield build_message(kind, reservation, contexts[reservation.flight_id])
 
-    from_email = settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@airline.com'
+        sent = send_batch(messages())
+        logger.info(f'Queued {kind} emails sent: {sent}/{len(reservation_ids)}')
+    except Exception as e:
+        logger.error(f'Failed to send queued {kind} emails: {e}')
+    finally:
+        close_old_connections()
 
-    try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=from_email,
-            recipient_list=[reservation.passenger_email],
-            fail_silently=False,
-        )
-        logger.info(f'Cancellation email sent to {reservation.passenger_email}')
-        return True
 
-    except Exception as e:
-        logger.error(f'Failed to send cancellation email: {e}')
-        return False
+def _queue_emails(kind, reservation_ids):
+    reservation_ids = list(reservation_ids)
+    if reservation_ids:
+        transaction.on_commit(lambda: _email_executor.submit(_send_queued_emails, kind, reservation_ids))
+    return len(reservation_ids)
+
+
+def queue_cancellation_emails(reservation_ids):
+    """
+    Send cancellation emails in the background once the transaction commits.
+
+    Returns the number of emails queued.
+    """
+    return _queue_emails('cancellation', reservation_ids)
+
+
+def queue_waitlist_promotion_emails(reservation_ids):
+    """
+    Tell promoted waitlist passengers about their booking once the transaction commits.
+
+    Returns the number of emails queued.
+    """
+    return _queue_emails('waitlist_promotion', reservation_ids)
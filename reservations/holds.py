@@ -0,0 +1,144 @@
+"""
+Seat hold service.
+
+A hold reserves inventory on a flight for a short time while the passenger
+completes checkout. Active holds are tracked on ``Flight.held_seats`` so
+capacity checks read a single counter instead of scanning the hold table;
+the counter is moved with atomic ``UPDATE ... SET held_seats = held_seats ± n``
+statements inside the same transaction as the hold row. Seats freed by a
+released or reaped hold go to the flight's waitlist first, like cancelled
+seats.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from flights.availability import availability_hub
+from flights.connections import graph_cache
+from flights.models import Flight
+from .models import SeatHold
+from .throttling import clear_sold_out, mark_sold_out
+from .waitlist import promote_waitlist
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of expired holds removed per reaper batch
+REAP_BATCH_SIZE = 1000
+
+
+def _adjust_held_seats(flight_id, delta):
+    """Atomically move a flight's held seat counter by ``delta``."""
+    Flight.objects.filter(pk=flight_id).update(held_seats=Greatest(F('held_seats') + delta, 0))
+    transaction.on_commit(lambda: graph_cache.seats_changed(flight_id))
+    transaction.on_commit(lambda: availability_hub.publish([flight_id]))
+    if delta < 0:
+        transaction.on_commit(lambda: clear_sold_out([flight_id]))
+
+
+def create_hold(flight_id, seats=1, ttl=None):
+    """
+    Hold ``seats`` on a flight for ``ttl`` seconds (default: settings.SEAT_HOLD_TTL).
+
+    Raises ValidationError if the flight has departed or not enough seats are free.
+    """
+    ttl = ttl or settings.SEAT_HOLD_TTL
+
+    with transaction.atomic():
+        # Lock the flight row so concurrent holds for the same flight serialize
+        flight = Flight.objects.select_for_update(of=('self',)).select_related('airplane').get(pk=flight_id)
+
+        if flight.departure_time < timezone.now():
+            raise ValidationError("Cannot hold seats on a flight that has already departed.")
+
+        if flight.available_seats() < seats:
+            # Expired holds still count until reaped; free them before giving up
+            if reap_expired_holds(flight_id=flight.id):
+                flight.refresh_from_db(fields=['held_seats'])
+
+            if flight.available_seats() < seats:
+                if flight.available_seats() <= 0:
+                    mark_sold_out(flight)
+                raise ValidationError(
+                    f"Flight {flight.flight_number} does not have {seats} seat(s) available."
+                )
+
+        hold = SeatHold.objects.create(
+            flight=flight,
+            seats=seats,
+            expires_at=timezone.now() + timedelta(seconds=ttl),
+        )
+        _adjust_held_seats(flight.id, seats)
+
+    logger.info(f'Seat hold created: {hold.token} ({seats} seat(s) on {flight.flight_number})')
+    return hold
+
+
+def release_hold(hold, seats=None, promote=True):
+    """
+    Give back ``seats`` of a hold (default: all of them).
+
+    The hold row is deleted once no seats remain. The seats are offered to
+    the waitlist unless ``promote`` is False (the caller books them itself).
+    Must be called on a hold locked with select_for_update() when racing
+    with other requests.
+    """
+    seats = hold.seats if seats is None else min(seats, hold.seats)
+
+    with transaction.atomic():
+        if seats >= hold.seats:
+            SeatHold.objects.filter(pk=hold.pk).delete()
+        else:
+            SeatHold.objects.filter(pk=hold.pk).update(seats=F('seats') - seats)
+        _adjust_held_seats(hold.flight_id, -seats)
+        if promote:
+            promote_waitlist([hold.flight_id])
+
+    hold.seats -= seats
+    return seats
+
+
+def reap_expired_holds(flight_id=None, now=None, batch_size=REAP_BATCH_SIZE):
+    """
+    Delete expired holds in batches and return their seats to the flights.
+
+    Each batch issues one DELETE plus one counter UPDATE per affected flight.
+    Returns the number of holds removed.
+    """
+    now = now or timezone.now()
+    expired = SeatHold.objects.filter(expires_at__lte=now)
+    if flight_id is not None:
+        expired = expired.filter(flight_id=flight_id)
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            # skip_locked lets several reapers run without double-counting rows
+            batch = list(
+                expired.select_for_update(skip_locked=True)
+                .values_list('id', 'flight_id', 'seats')[:batch_size]
+            )
+            if not batch:
+                break
+
+            seats_per_flight = {}
+            for _, hold_flight_id, seats in batch:
+                seats_per_flight[hold_flight_id] = seats_per_flight.get(hold_flight_id, 0) + seats
+
+            SeatHold.objects.filter(id__in=[hold_id for hold_id, _, _ in batch]).delete()
+            for hold_flight_id, seats in seats_per_flight.items():
+                _adjust_held_seats(hold_flight_id, -seats)
+            promote_waitlist(list(seats_per_flight))
+
+        total += len(batch)
+        if len(batch) < batch_size:
+            break
+
+    if total:
+        logger.info(f'Reaped {total} expired seat hold(s)')
+    return total
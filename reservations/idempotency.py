@@ -0,0 +1,195 @@
+"""
+Idempotency-Key support for unsafe reservation endpoints.
+
+The first request with a given key claims a row in ``IdempotencyKey`` (the
+unique constraint makes the claim atomic across workers), runs the view and
+stores its response in the table and the cache. Retries with the same key
+replay the stored response without running the view again, so no second
+booking, validation pass or email happens. A retry that arrives while the
+first request is still running gets ``409 Conflict`` with a ``Retry-After``
+header straight away instead of processing the request a second time.
+
+Keys are scoped to the client (the authenticated user, or the IP address of
+anonymous callers), so two clients picking the same key never see each
+other's responses.
+
+Client errors (4xx) are stored like successful responses; server errors
+(5xx) and unexpected exceptions release the claim so the client can retry.
+"""
+from datetime import timedelta
+from functools import wraps
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+
+from .models import IdempotencyKey
+import logging
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# Retry-After sent to a retry that arrives while the first request is in flight
+RETRY_AFTER = 1  # seconds
+
+# An unfinished claim older than this is assumed to belong to a crashed worker
+STALE_CLAIM_AFTER = timedelta(minutes=2)
+
+
+def _client(request):
+    """Return the identity keys are scoped to: the user, or the IP address of anonymous callers."""
+    if request.user and request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    # Same client address resolution (NUM_PROXIES, X-Forwarded-For) as the throttles
+    return f'ip:{BaseThrottle().get_ident(request)}'
+
+
+def _cache_key(client, endpoint, key):
+    return 'idempotency:' + hashlib.sha256(f'{client}\n{endpoint}\n{key}'.encode()).hexdigest()
+
+
+def _request_hash(request):
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _claim(client, key, endpoint, request_hash):
+    """Try to claim ``key``; return True if this request should be processed."""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                client=client, key=key, endpoint=endpoint, request_hash=request_hash, expires_at=expires_at,
+            )
+        return True
+    except IntegrityError:
+        pass
+
+    # Expired keys and claims abandoned by a crashed worker can be taken over
+    reclaimable = Q(expires_at__lte=now) | Q(response_status__isnull=True, created_at__lt=now - STALE_CLAIM_AFTER)
+    taken_over = IdempotencyKey.objects.filter(reclaimable, client=client, key=key, endpoint=endpoint).update(
+        request_hash=request_hash,
+        response_status=None,
+        response_body=None,
+        created_at=now,
+        expires_at=expires_at,
+    )
+    return taken_over == 1
+
+
+def _stored_response(client, endpoint, key):
+    """Return the completed ``(request_hash, status, body)`` for a key, or None."""
+    stored = cache.get(_cache_key(client, endpoint, key))
+    if stored is not None:
+        return stored
+
+    record = IdempotencyKey.objects.filter(
+        client=client, key=key, endpoint=endpoint, response_status__isnull=False, expires_at__gt=timezone.now()
+    ).first()
+    if record is None:
+        return None
+    stored = (record.request_hash, record.response_status, record.response_body)
+    cache.set(_cache_key(client, endpoint, key), stored, settings.IDEMPOTENCY_KEY_TTL)
+    return stored
+
+
+def _replay(stored, request_hash):
+    stored_hash, response_status, body = stored
+    if stored_hash != request_hash:
+        return Response(
+            {'error': f'{HEADER} was already used with a different request body.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    return Response(body, status=response_status, headers={'Idempotent-Replayed': 'true'})
+
+
+def idempotent(view_method):
+    """
+    Make a DRF view method honour the ``Idempotency-Key`` request header.
+
+    Requests without the header are processed as usual.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        client = _client(request)
+        endpoint = f'{request.method} {request.path}'
+        request_hash = _request_hash(request)
+
+        stored = _stored_response(client, endpoint, key)
+        if stored is not None:
+            return _replay(stored, request_hash)
+
+        if not _claim(client, key, endpoint, request_hash):
+            # The first request may have finished since the lookup above
+            stored = _stored_response(client, endpoint, key)
+            if stored is None:
+                return Response(
+                    {'error': f'A request with this {HEADER} is still being processed. Retry later.'},
+                    status=status.HTTP_409_CONFLICT,
+                    headers={'Retry-After': str(RETRY_AFTER)}
+                )
+            return _replay(stored, request_hash)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            # Client errors (validation, not found) are stored and replayed like any response
+            response = self.handle_exception(exc)
+        except Exception:
+            IdempotencyKey.objects.filter(
+                client=client, key=key, endpoint=endpoint, response_status__isnull=True
+            ).delete()
+            raise
+
+        if response.status_code >= 500:
+            IdempotencyKey.objects.filter(
+                client=client, key=key, endpoint=endpoint, response_status__isnull=True
+            ).delete()
+            return response
+
+        body = json.loads(json.dumps(response.data, cls=DjangoJSONEncoder))
+        IdempotencyKey.objects.filter(client=client, key=key, endpoint=endpoint).update(
+            response_status=response.status_code, response_body=body
+        )
+        cache.set(
+            _cache_key(client, endpoint, key), (request_hash, response.status_code, body), settings.IDEMPOTENCY_KEY_TTL
+        )
+        logger.info(f'Stored response for {HEADER} on {endpoint}')
+        return response
+
+    return wrapper
+
+
+def prune_expired_keys(batch_size=1000):
+    """Delete expired idempotency rows in batches; return the number deleted."""
+    deleted = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
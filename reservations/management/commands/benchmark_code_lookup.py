@@ -0,0 +1,48 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations.cache import cache_key, get_reservation_payload, load_reservation_payload
+from reservations.models import Reservation
+
+
+class Command(BaseCommand):
+    """Compare uncached and cached reservation-by-code lookups on existing data."""
+
+    help = 'Benchmark reservation lookups by code with and without the read-through cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--codes', type=int, default=200,
+                            help='Number of reservation codes to sample (default: 200)')
+        parser.add_argument('--rounds', type=int, default=5,
+                            help='Lookups per code for each mode (default: 5)')
+
+    def handle(self, *args, **options):
+        codes = list(Reservation.objects.values_list('reservation_code', flat=True)[:options['codes']])
+        if not codes:
+            raise CommandError('No reservations found; create some data first.')
+        rounds = options['rounds']
+        lookups = len(codes) * rounds
+
+        cache.delete_many([cache_key(code) for code in codes])
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for code in codes:
+                load_reservation_payload(code)
+        uncached = time.perf_counter() - start
+
+        for code in codes:
+            get_reservation_payload(code)  # warm the cache
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for code in codes:
+                get_reservation_payload(code)
+        cached = time.perf_counter() - start
+
+        self.stdout.write(f'Lookups per mode: {lookups}')
+        self.stdout.write(f'Uncached: {uncached * 1000 / lookups:.3f} ms/lookup')
+        self.stdout.write(f'Cached:   {cached * 1000 / lookups:.3f} ms/lookup')
+        self.stdout.write(self.style.SUCCESS(f'Speedup:  {uncached / cached:.1f}x'))
@@ -0,0 +1,72 @@
+import time
+
+from django.core import mail
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airplanes.models import Airplane
+from flights.models import Flight
+from reservations.emails import build_message, flight_context, render_email, send_batch
+from reservations.models import Reservation
+
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class Command(BaseCommand):
+    """
+    Measure per-message cost of flight notification emails with the locmem backend.
+
+    Uses unsaved in-memory reservations, so no database rows are needed and
+    nothing is actually sent.
+    """
+
+    help = 'Benchmark templated email rendering and batched sending (locmem backend)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000,
+                            help='Number of notifications per mode (default: 10000)')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        airplane = Airplane(tail_number='TC-BNC', model='Airbus A320', capacity=180, production_year=2015)
+        departure_time = timezone.now()
+        flight = Flight(
+            flight_number='TK1000', departure='Istanbul', destination='London',
+            departure_time=departure_time, arrival_time=departure_time + timezone.timedelta(hours=4),
+            airplane=airplane,
+        )
+        reservations = [
+            Reservation(
+                passenger_name=f'Passenger {i}', passenger_email=f'passenger{i}@example.com',
+                reservation_code=f'B{i:07d}', flight=flight,
+            )
+            for i in range(count)
+        ]
+        context = flight_context(flight, departure_time - timezone.timedelta(hours=2), 'Weather')
+
+        start = time.perf_counter()
+        for reservation in reservations:
+            render_email('flight_update', dict(context, reservation=reservation))
+        render = time.perf_counter() - start
+
+        mail.outbox = []
+        start = time.perf_counter()
+        for reservation in reservations:
+            connection = mail.get_connection(LOCMEM_BACKEND)
+            build_message('flight_update', reservation, context, connection=connection).send()
+        single = time.perf_counter() - start
+
+        mail.outbox = []
+        start = time.perf_counter()
+        sent = send_batch(
+            (build_message('flight_update', reservation, context) for reservation in reservations),
+            connection=mail.get_connection(LOCMEM_BACKEND),
+        )
+        batched = time.perf_counter() - start
+        mail.outbox = []
+
+        self.stdout.write(f'Notifications per mode: {count} (batch sent {sent})')
+        self.stdout.write(f'Render only:              {render * 1e6 / count:.1f} us/message')
+        self.stdout.write(f'Connection per message:   {single * 1e6 / count:.1f} us/message')
+        self.stdout.write(f'Batched, one connection:  {batched * 1e6 / count:.1f} us/message')
+        self.stdout.write(self.style.SUCCESS(f'Speedup:  {single / batched:.2f}x'))
@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations import partitions
+
+
+class Command(BaseCommand):
+    """
+    Maintain the monthly partitions of the reservations table (PostgreSQL only).
+
+    Run daily from cron: creates the partitions for the coming months and,
+    optionally, detaches partitions of flights that departed long ago.
+    """
+
+    help = 'Create future reservation partitions and detach/archive old ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3,
+                            help='Create partitions through this many months ahead (default: 3)')
+        parser.add_argument('--detach-older-than', type=int, metavar='MONTHS',
+                            help='Detach partitions for flights that departed more than MONTHS months ago')
+        parser.add_argument('--archive-schema',
+                            help='Move detached partitions into this schema instead of leaving them in public')
+        parser.add_argument('--drop', action='store_true',
+                            help='Drop detached partitions (their reservations are deleted)')
+        parser.add_argument('--concurrently', action='store_true',
+                            help='Use DETACH PARTITION ... CONCURRENTLY (PostgreSQL 14+)')
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            self.stdout.write('Reservation partitioning is only used on PostgreSQL; nothing to do.')
+            return
+        if not partitions.is_partitioned():
+            raise CommandError('The reservations table is not partitioned. Run migrate first.')
+        if options['drop'] and options['archive_schema']:
+            raise CommandError('Use either --drop or --archive-schema, not both.')
+
+        created = partitions.ensure_future_partitions(options['months_ahead'])
+        for month in created:
+            self.stdout.write(f'Created partition {partitions.partition_name(month)}')
+
+        if options['detach_older_than'] is not None:
+            cutoff = partitions.add_months(partitions.month_start(date.today()), -options['detach_older_than'])
+            detached = partitions.detach_partitions_before(
+                cutoff,
+                archive_schema=options['archive_schema'],
+                drop=options['drop'],
+                concurrently=options['concurrently'],
+            )
+            for name in detached:
+                self.stdout.write(f'Detached partition {name}')
+
+        self.stdout.write(self.style.SUCCESS('Reservation partitions are up to date.'))
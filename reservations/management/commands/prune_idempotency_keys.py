@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reservations.idempotency import prune_expired_keys
+
+
+class Command(BaseCommand):
+    """Delete stored Idempotency-Key responses past their TTL (run from cron)."""
+
+    help = 'Delete expired idempotency keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = prune_expired_keys(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency key(s).'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reservations.holds import reap_expired_holds, REAP_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    """Return the seats of expired holds to their flights (run from cron)."""
+
+    help = 'Delete expired seat holds and release their seats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REAP_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        reaped = reap_expired_holds(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Reaped {reaped} expired seat hold(s).'))
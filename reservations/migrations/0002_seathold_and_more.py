@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0002_flight_held_seats_alter_flight_departure_and_more'),
+        ('reservations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(editable=False, help_text='Opaque token identifying the hold', max_length=32, unique=True)),
+                ('seats', models.PositiveSmallIntegerField(default=1, help_text='Number of seats held')),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='Time after which the hold may be reaped')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the hold was created')),
+            ],
+            options={
+                'verbose_name': 'Seat Hold',
+                'verbose_name_plural': 'Seat Holds',
+                'ordering': ['expires_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='seathold',
+            name='flight',
+            field=models.ForeignKey(help_text='The flight the seats are held on', on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to='flights.flight'),
+        ),
+    ]
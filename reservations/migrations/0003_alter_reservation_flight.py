@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0003_flight_archived_at_alter_flight_airplane_and_more'),
+        ('reservations', '0002_seathold_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservation',
+            name='flight',
+            field=models.ForeignKey(help_text='The flight this reservation is for', on_delete=django.db.models.deletion.PROTECT, related_name='reservations', to='flights.flight'),
+        ),
+    ]
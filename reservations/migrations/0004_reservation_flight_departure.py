@@ -0,0 +1,49 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_flight_departure(apps, schema_editor):
+    Reservation = apps.get_model('reservations', 'Reservation')
+    Flight = apps.get_model('flights', 'Flight')
+    Reservation.objects.update(
+        flight_departure=Subquery(
+            Flight.objects.filter(pk=OuterRef('flight_id')).values('departure_time')[:1]
+        )
+    )
+
+
+def partition_table(apps, schema_editor):
+    from reservations.partitions import partition_reservations_table
+    partition_reservations_table(schema_editor)
+
+
+def unpartition_table(apps, schema_editor):
+    from reservations.partitions import is_partitioned
+    if is_partitioned(schema_editor.connection):
+        raise RuntimeError(
+            'The partitioned reservations table cannot be converted back automatically.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0003_flight_archived_at_alter_flight_airplane_and_more'),
+        ('reservations', '0003_alter_reservation_flight'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='flight_departure',
+            field=models.DateTimeField(editable=False, null=True, help_text="Copy of the flight's departure time; partition key on PostgreSQL"),
+        ),
+        migrations.RunPython(backfill_flight_departure, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='reservation',
+            name='flight_departure',
+            field=models.DateTimeField(editable=False, help_text="Copy of the flight's departure time; partition key on PostgreSQL"),
+        ),
+        # PostgreSQL only: range partition the table by month of flight_departure
+        migrations.RunPython(partition_table, unpartition_table),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import F
+from django.db.models.functions import Lower, Trim
+
+BATCH_SIZE = 5000
+
+
+def normalize_emails(apps, schema_editor):
+    """
+    Lowercase and strip stored emails in id-range batches.
+
+    The migration is non-atomic, so each batch is its own short UPDATE and the
+    table is never locked for the whole backfill.
+    """
+    Reservation = apps.get_model('reservations', 'Reservation')
+    last_id = Reservation.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    for start in range(0, last_id + 1, BATCH_SIZE):
+        batch = Reservation.objects.filter(id__gte=start, id__lt=start + BATCH_SIZE)
+        ids = list(
+            batch.annotate(normalized=Lower(Trim('passenger_email')))
+            .exclude(passenger_email=F('normalized'))
+            .values_list('id', flat=True)
+        )
+        if ids:
+            Reservation.objects.filter(id__in=ids).update(passenger_email=Lower(Trim('passenger_email')))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('reservations', '0004_reservation_flight_departure'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
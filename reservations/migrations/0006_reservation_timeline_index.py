@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0003_flight_archived_at_alter_flight_airplane_and_more'),
+        ('reservations', '0005_normalize_passenger_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['passenger_email', 'status', 'flight_departure'], name='reservation_timeline_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0003_flight_archived_at_alter_flight_airplane_and_more'),
+        ('reservations', '0006_reservation_timeline_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='cancelled_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Timestamp when reservation was cancelled', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['cancelled_at'], name='reservation_cancell_4e076a_idx'),
+        ),
+    ]
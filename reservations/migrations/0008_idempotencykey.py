@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:42
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0007_reservation_cancelled_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='Client-supplied Idempotency-Key header', max_length=255)),
+                ('endpoint', models.CharField(help_text='HTTP method and path the key was used on', max_length=255)),
+                ('request_hash', models.CharField(help_text='SHA-256 of the request body, to reject reuse with a different payload', max_length=64)),
+                ('response_status', models.PositiveSmallIntegerField(blank=True, help_text='Stored HTTP status; empty while the first request is in progress', null=True)),
+                ('response_body', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='Time after which the key may be reused and the row pruned')),
+            ],
+            options={
+                'verbose_name': 'Idempotency Key',
+                'verbose_name_plural': 'Idempotency Keys',
+                'constraints': [models.UniqueConstraint(fields=('key', 'endpoint'), name='unique_idempotency_key')],
+            },
+        ),
+    ]
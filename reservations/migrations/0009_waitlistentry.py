@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0003_flight_archived_at_alter_flight_airplane_and_more'),
+        ('reservations', '0008_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('passenger_name', models.CharField(help_text='Full name of the passenger', max_length=200)),
+                ('passenger_email', models.EmailField(help_text='Email address for the promotion notice', max_length=254)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the passenger joined the waitlist')),
+                ('promoted_at', models.DateTimeField(blank=True, editable=False, help_text='Timestamp when the entry was turned into a reservation', null=True)),
+                ('reservation_code', models.CharField(blank=True, editable=False, help_text='Code of the reservation created on promotion', max_length=10)),
+                ('flight', models.ForeignKey(help_text='The flight the passenger is waiting for', on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='flights.flight')),
+            ],
+            options={
+                'verbose_name': 'Waitlist Entry',
+                'verbose_name_plural': 'Waitlist Entries',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(condition=models.Q(('promoted_at__isnull', True)), fields=['flight', 'created_at', 'id'], name='waitlist_queue_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('promoted_at__isnull', True)), fields=('flight', 'passenger_email'), name='unique_waiting_passenger')],
+            },
+        ),
+    ]
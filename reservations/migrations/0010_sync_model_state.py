@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:18
+#
+# Brings the migration state in line with the Reservation model as it was
+# shipped: the initial migration predates the model's help texts, the
+# dropped explicit EmailValidator (EmailField already validates) and its
+# reservation_code and created_at indexes. No data changes; the help text and
+# validator changes touch no schema.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0009_waitlistentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservation',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, help_text='Timestamp when reservation was created'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='passenger_email',
+            field=models.EmailField(help_text='Email address for confirmation', max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='reservation_code',
+            field=models.CharField(blank=True, editable=False, help_text='Auto-generated unique reservation code', max_length=10, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['reservation_code'], name='reservation_reserva_585b8c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['created_at'], name='reservation_created_fddb5a_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def create_code_registry(apps, schema_editor):
+    from reservations.partitions import create_code_registry
+    create_code_registry(schema_editor)
+
+
+def drop_code_registry(apps, schema_editor):
+    from reservations.partitions import drop_code_registry
+    drop_code_registry(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0010_sync_model_state'),
+    ]
+
+    operations = [
+        # PostgreSQL only: keep reservation codes unique across all partitions
+        migrations.RunPython(create_code_registry, drop_code_registry),
+    ]
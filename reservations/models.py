@@ -1,10 +1,21 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 import string
 import secrets
 
 
+def normalize_email(value):
+    """
+    Return the canonical (stripped, lowercased) form of an email address.
+
+    Emails are stored normalized so case-insensitive lookups can use a plain
+    equality match served by the passenger_email index instead of UPPER(...).
+    """
+    return (value or '').strip().lower()
+
+
 class Reservation(models.Model):
     """Reservation model representing a passenger's flight booking."""
 
@@ -28,11 +39,16 @@ class Reservation(models.Model):
 
     flight = models.ForeignKey(
         'flights.Flight',
-        on_delete=models.CASCADE,
+        on_delete=models.PROTECT,
         related_name='reservations',
         help_text="The flight this reservation is for"
     )
 
+    flight_departure = models.DateTimeField(
+        editable=False,
+        help_text="Copy of the flight's departure time; partition key on PostgreSQL"
+    )
+
     status = models.BooleanField(
         default=True,
         help_text="Reservation status (True=Active, False=Cancelled)"
@@ -43,14 +59,26 @@ class Reservation(models.Model):
         help_text="Timestamp when reservation was created"
     )
 
+    cancelled_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Timestamp when reservation was cancelled"
+    )
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Reservation"
         verbose_name_plural = "Reservations"
         indexes = [
+            # A flight's reservations, newest first (/api/flights/{id}/reservations/)
+            models.Index(fields=['flight', '-created_at'], name='reservation_flight__de020e_idx'),
             models.Index(fields=['reservation_code']),
-            models.Index(fields=['passenger_email']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['cancelled_at']),
+            # Passenger timeline: equality on email/status, range + order on departure.
+            # Its email prefix also serves plain passenger_email lookups.
+            models.Index(fields=['passenger_email', 'status', 'flight_departure'], name='reservation_timeline_idx'),
         ]
 
     def __str__(self):
@@ -66,11 +94,35 @@ class Reservation(models.Model):
             if not Reservation.objects.filter(reservation_code=code).exists():
                 return code
 
+    @staticmethod
+    def generate_reservation_codes(count):
+        """Generate ``count`` unique reservation codes, checking them in one query per round."""
+        characters = string.ascii_uppercase + string.digits
+        codes = set()
+
+        while len(codes) < count:
+            candidates = {''.join(secrets.choice(characters) for _ in range(8)) for _ in range(count - len(codes))}
+            taken = set(Reservation.objects.filter(reservation_code__in=candidates).values_list('reservation_code', flat=True))
+            codes |= candidates - taken
+        return list(codes)
+
     def save(self, *args, **kwargs):
-        """Auto-generate reservation code before saving."""
+        """Auto-generate reservation code and copy the partition key before saving."""
         if not self.pk and not self.reservation_code:
             self.reservation_code = self._generate_reservation_code()
 
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'passenger_email' in update_fields:
+            self.passenger_email = normalize_email(self.passenger_email)
+        if update_fields is None or 'flight' in update_fields:
+            self.flight_departure = self.flight.departure_time
+        if update_fields is None or 'status' in update_fields:
+            # Keep cancelled_at in step with status, however the status was changed
+            if not self.status and self.cancelled_at is None:
+                self.cancelled_at = timezone.now()
+            elif self.status:
+                self.cancelled_at = None
+
         super().save(*args, **kwargs)
 
     def clean(self):
@@ -84,7 +136,7 @@ class Reservation(models.Model):
         # Check if this email already has an active reservation for this flight
         duplicate_check = Reservation.objects.filter(
             flight=self.flight,
-            passenger_email__iexact=self.passenger_email,
+            passenger_email=normalize_email(self.passenger_email),
             status=True
         )
 
@@ -112,17 +164,233 @@ class Reservation(models.Model):
             except Reservation.DoesNotExist:
                 pass
 
-        if active_reservations >= self.flight.airplane.capacity:
+        # Seats held during checkout count against capacity as well
+        if self.flight.available_seats(active_reservations) <= 0:
             raise ValidationError(
                 f"Flight {self.flight.flight_number} is fully booked. "
-                f"Capacity: {self.flight.airplane.capacity}"
+                f"Capacity: {self.flight.effective_capacity}"
             )
 
     def cancel(self):
-        """Cancel this reservation (soft delete)."""
-        self.status = False
-        self.save(update_fields=['status'])  # Only update status field, skip validation
+        """Cancel this reservation (soft delete) and give the seat to the flight's waitlist."""
+        from .waitlist import promote_waitlist
+
+        with transaction.atomic():
+            self.status = False
+            self.save(update_fields=['status', 'cancelled_at'])  # Only update status fields, skip validation
+            promote_waitlist([self.flight_id])
 
     def is_active(self):
         """Check if reservation is active."""
         return self.status
+
+
+class SeatHold(models.Model):
+    """
+    Temporary inventory lock taken during checkout.
+
+    Held seats count against flight capacity through the ``Flight.held_seats``
+    counter until the hold is confirmed, released or reaped after expiry.
+    """
+
+    token = models.CharField(
+        max_length=32,
+        unique=True,
+        editable=False,
+        help_text="Opaque token identifying the hold"
+    )
+
+    flight = models.ForeignKey(
+        'flights.Flight',
+        on_delete=models.CASCADE,
+        related_name='seat_holds',
+        help_text="The flight the seats are held on"
+    )
+
+    seats = models.PositiveSmallIntegerField(
+        default=1,
+        help_text="Number of seats held"
+    )
+
+    expires_at = models.DateTimeField(
+        db_index=True,
+        help_text="Time after which the hold may be reaped"
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Timestamp when the hold was created"
+    )
+
+    class Meta:
+        ordering = ['expires_at']
+        verbose_name = "Seat Hold"
+        verbose_name_plural = "Seat Holds"
+
+    def __str__(self):
+        return f"{self.token} - {self.seats} seat(s) on {self.flight_id}"
+
+    def save(self, *args, **kwargs):
+        """Auto-generate hold token before saving."""
+        if not self.token:
+            self.token = secrets.token_urlsafe(16)
+        super().save(*args, **kwargs)
+
+    def is_expired(self):
+        """Check if the hold has passed its expiry time."""
+        return self.expires_at <= timezone.now()
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored response of a request sent with an ``Idempotency-Key`` header.
+
+    A row is claimed (``response_status`` null) before the request is
+    processed and filled in with the response afterwards; retries with the
+    same key replay the stored response. See ``reservations.idempotency``.
+    """
+
+    client = models.CharField(
+        max_length=100,
+        default='',
+        help_text="User or IP address that sent the key; keys are scoped per client"
+    )
+
+    key = models.CharField(
+        max_length=255,
+        help_text="Client-supplied Idempotency-Key header"
+    )
+
+    endpoint = models.CharField(
+        max_length=255,
+        help_text="HTTP method and path the key was used on"
+    )
+
+    request_hash = models.CharField(
+        max_length=64,
+        help_text="SHA-256 of the request body, to reject reuse with a different payload"
+    )
+
+    response_status = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Stored HTTP status; empty while the first request is in progress"
+    )
+
+    response_body = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    expires_at = models.DateTimeField(
+        db_index=True,
+        help_text="Time after which the key may be reused and the row pruned"
+    )
+
+    class Meta:
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+        constraints = [
+            models.UniqueConstraint(fields=['client', 'key', 'endpoint'], name='unique_client_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} [{self.key}] ({self.client})"
+
+    def is_completed(self):
+        """Check if the response for this key has been stored."""
+        return self.response_status is not None
+
+
+class WaitlistEntry(models.Model):
+    """
+    A passenger waiting for a seat on a fully booked flight.
+
+    Entries are served first come, first served: when cancellations free
+    seats, the oldest waiting entries are turned into reservations by
+    ``reservations.waitlist.promote_waitlist()``.
+    """
+
+    flight = models.ForeignKey(
+        'flights.Flight',
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        help_text="The flight the passenger is waiting for"
+    )
+
+    passenger_name = models.CharField(
+        max_length=200,
+        help_text="Full name of the passenger"
+    )
+
+    passenger_email = models.EmailField(
+        max_length=254,
+        help_text="Email address for the promotion notice"
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Timestamp when the passenger joined the waitlist"
+    )
+
+    promoted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Timestamp when the entry was turned into a reservation"
+    )
+
+    reservation_code = models.CharField(
+        max_length=10,
+        blank=True,
+        editable=False,
+        help_text="Code of the reservation created on promotion"
+    )
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        verbose_name = "Waitlist Entry"
+        verbose_name_plural = "Waitlist Entries"
+        indexes = [
+            # FIFO scan of the waiting entries of a flight
+            models.Index(
+                fields=['flight', 'created_at', 'id'],
+                condition=models.Q(promoted_at__isnull=True),
+                name='waitlist_queue_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['flight', 'passenger_email'],
+                condition=models.Q(promoted_at__isnull=True),
+                name='unique_waiting_passenger',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.passenger_email} waiting for {self.flight_id}"
+
+    def save(self, *args, **kwargs):
+        """Normalize the email before saving."""
+        self.passenger_email = normalize_email(self.passenger_email)
+        super().save(*args, **kwargs)
+
+    def is_waiting(self):
+        """Check if the entry has not been promoted yet."""
+        return self.promoted_at is None
+
+    def position(self):
+        """Return the 1-based place in the flight's queue, or None once promoted."""
+        if not self.is_waiting():
+            return None
+        ahead = WaitlistEntry.objects.filter(
+            models.Q(created_at__lt=self.created_at) | models.Q(created_at=self.created_at, id__lt=self.id),
+            flight_id=self.flight_id,
+            promoted_at__isnull=True,
+        ).count()
+        return ahead + 1
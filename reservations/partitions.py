@@ -0,0 +1,284 @@
+"""
+PostgreSQL range partitioning of the reservations table.
+
+On PostgreSQL ``reservations_reservation`` is a partitioned table keyed on
+``flight_departure`` (a copy of the flight's departure time kept on every
+reservation), with one partition per calendar month (UTC) plus a DEFAULT
+partition for anything outside the created ranges. Queries that filter on
+``flight_departure`` only touch the matching partitions.
+
+PostgreSQL requires the partition key in every unique constraint, so the
+primary key is ``(id, flight_departure)`` and the table itself only enforces
+``UNIQUE (reservation_code, flight_departure)``. Global ``reservation_code``
+uniqueness comes from a plain (non-partitioned) code registry table that a
+trigger claims every code in; see ``create_code_registry()``.
+
+Every helper is a no-op on other database backends, so SQLite keeps a plain
+table for development and tests.
+"""
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+TABLE = 'reservations_reservation'
+DEFAULT_PARTITION = f'{TABLE}_default'
+CODE_REGISTRY = 'reservations_reservation_code'
+CLAIM_CODE_FUNCTION = 'reservations_claim_code'
+
+
+def is_supported(conn=None):
+    """Return True if the database backend supports declarative partitioning."""
+    return (conn or connection).vendor == 'postgresql'
+
+
+def month_start(value):
+    """Return the first day of the month containing ``value``."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    """Return the first day of the month ``count`` months after ``month``."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y_%m}'
+
+
+def _bound(month):
+    """Return the UTC timestamp literal for the start of ``month``."""
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()
+
+
+def is_partitioned(conn=None):
+    """Return True if the reservations table is already partitioned."""
+    conn = conn or connection
+    if not is_supported(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s", [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(conn=None):
+    """Return ``{month: table name}`` for the attached monthly partitions."""
+    conn = conn or connection
+    prefix = f'{TABLE}_p'
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s", [TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        if name.startswith(prefix):
+            year, month = name[len(prefix):].split('_')
+            partitions[date(int(year), int(month), 1)] = name
+    return partitions
+
+
+def create_month_partition(month, conn=None):
+    """
+    Create and attach the partition for ``month`` if it does not exist.
+
+    Rows that already landed in the DEFAULT partition for that month are moved
+    into the new table before it is attached, so creating a partition late is safe.
+    Returns True if a partition was created.
+    """
+    conn = conn or connection
+    month = month_start(month)
+    if month in list_partitions(conn):
+        return False
+
+    name = partition_name(month)
+    start, end = _bound(month), _bound(add_months(month, 1))
+
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            f'WHERE flight_departure >= %s AND flight_departure < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end]
+        )
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+            [start, end]
+        )
+    return True
+
+
+def ensure_future_partitions(months_ahead, today=None, conn=None):
+    """Create partitions from the current month through ``months_ahead`` months ahead."""
+    current = month_start(today or date.today())
+    return [
+        add_months(current, offset)
+        for offset in range(months_ahead + 1)
+        if create_month_partition(add_months(current, offset), conn)
+    ]
+
+
+def detach_partitions_before(cutoff_month, archive_schema=None, drop=False, concurrently=False, conn=None):
+    """
+    Detach every monthly partition older than ``cutoff_month``.
+
+    Detached tables keep their data; they are moved into ``archive_schema``
+    when given, or dropped when ``drop`` is True. ``concurrently`` uses
+    DETACH ... CONCURRENTLY (PostgreSQL 14+), which must run outside a transaction.
+    Returns the detached table names.
+    """
+    conn = conn or connection
+    cutoff_month = month_start(cutoff_month)
+    detached = []
+
+    for month, name in sorted(list_partitions(conn).items()):
+        if month >= cutoff_month:
+            continue
+
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"' + (' CONCURRENTLY' if concurrently else '')
+            )
+            if drop:
+                cursor.execute(f'DROP TABLE "{name}"')
+            elif archive_schema:
+                cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"')
+                cursor.execute(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"')
+        detached.append(name)
+
+    return detached
+
+
+def partition_reservations_table(schema_editor):
+    """
+    Convert the plain reservations table into a partitioned one (migration helper).
+
+    Copies every row inside the migration transaction; on very large tables run
+    it in a maintenance window.
+    """
+    conn = schema_editor.connection
+    if not is_supported(conn) or is_partitioned(conn):
+        return
+
+    old = f'{TABLE}_unpartitioned'
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN ("
+            "  SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('p', 'u'))",
+            [TABLE, TABLE]
+        )
+        index_defs = [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'", [TABLE]
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f'SELECT min(flight_departure), max(flight_departure) FROM "{TABLE}"')
+        first, last = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{old}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE (flight_departure)'
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, flight_departure)')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_code_departure_uniq" '
+            f'UNIQUE (reservation_code, flight_departure)'
+        )
+        cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+
+    if first is not None:
+        month, last_month = month_start(first), month_start(last)
+        while month <= last_month:
+            create_month_partition(month, conn)
+            month = add_months(month, 1)
+
+    with conn.cursor() as cursor:
+        cursor.execute(f'INSERT INTO "{TABLE}" OVERRIDING SYSTEM VALUE SELECT * FROM "{old}"')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+            f"COALESCE((SELECT max(id) FROM \"{TABLE}\"), 0) + 1, false)"
+        )
+        cursor.execute(f'DROP TABLE "{old}"')
+
+        # Recreate secondary indexes and foreign keys under their original names
+        # (the definitions were captured before the rename, so they target the new table)
+        for index_def in index_defs:
+            cursor.execute(index_def)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+
+
+def create_code_registry(schema_editor):
+    """
+    Enforce globally unique reservation codes on the partitioned table (migration helper).
+
+    Every inserted reservation claims its code in ``CODE_REGISTRY`` (primary
+    key on the code) from an AFTER trigger; a code already claimed by another
+    reservation raises a unique violation, which Django reports as an
+    IntegrityError like any other unique constraint. A row moving to another
+    partition (a retimed flight) re-claims its own code, which is allowed.
+    Codes stay claimed after their reservation is deleted or its partition
+    detached, so they are never reused.
+    """
+    conn = schema_editor.connection
+    if not is_partitioned(conn):
+        return
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS "{CODE_REGISTRY}" ('
+            f'code varchar(10) PRIMARY KEY, reservation_id bigint NOT NULL)'
+        )
+        cursor.execute(
+            f'INSERT INTO "{CODE_REGISTRY}" (code, reservation_id) '
+            f'SELECT reservation_code, id FROM "{TABLE}" ON CONFLICT (code) DO NOTHING'
+        )
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION "{CLAIM_CODE_FUNCTION}"() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO "{CODE_REGISTRY}" (code, reservation_id)
+                VALUES (NEW.reservation_code, NEW.id)
+                ON CONFLICT (code) DO NOTHING;
+                IF NOT FOUND AND NOT EXISTS (
+                    SELECT 1 FROM "{CODE_REGISTRY}"
+                    WHERE code = NEW.reservation_code AND reservation_id = NEW.id
+                ) THEN
+                    RAISE unique_violation USING MESSAGE = format(
+                        'Reservation code %s is already taken.', NEW.reservation_code
+                    );
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute(f'DROP TRIGGER IF EXISTS "{CLAIM_CODE_FUNCTION}" ON "{TABLE}"')
+        cursor.execute(
+            f'CREATE TRIGGER "{CLAIM_CODE_FUNCTION}" AFTER INSERT OR UPDATE OF reservation_code ON "{TABLE}" '
+            f'FOR EACH ROW EXECUTE FUNCTION "{CLAIM_CODE_FUNCTION}"()'
+        )
+
+
+def drop_code_registry(schema_editor):
+    """Remove the code registry, its trigger and function (migration helper)."""
+    conn = schema_editor.connection
+    if not is_supported(conn):
+        return
+
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP TRIGGER IF EXISTS "{CLAIM_CODE_FUNCTION}" ON "{TABLE}"')
+        cursor.execute(f'DROP FUNCTION IF EXISTS "{CLAIM_CODE_FUNCTION}"()')
+        cursor.execute(f'DROP TABLE IF EXISTS "{CODE_REGISTRY}"')
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Reservation
+from .models import Reservation, SeatHold, WaitlistEntry, normalize_email
+from .throttling import mark_sold_out
 from flights.models import Flight
 from flights.serializers import FlightListSerializer
 
@@ -8,7 +9,7 @@ class ReservationSerializer(serializers.ModelSerializer):
     """Serializer for Reservation model with nested flight details."""
     reservation_code = serializers.CharField(read_only=True)
     flight_details = serializers.SerializerMethodField(read_only=True)
-    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.all())
+    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.active())
     status_display = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -25,6 +26,15 @@ class ReservationSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['id', 'reservation_code', 'flight_details', 'status_display', 'created_at']
+        # Columns read by computed fields (for ?fields= query pruning)
+        field_columns = {
+            'flight_details': [
+                'flight__id', 'flight__flight_number', 'flight__departure', 'flight__destination',
+                'flight__departure_time', 'flight__arrival_time',
+                'flight__airplane__tail_number', 'flight__airplane__model',
+            ],
+            'status_display': ['status'],
+        }
 
     def get_flight_details(self, obj):
         """Return detailed flight information."""
@@ -55,7 +65,7 @@ class ReservationSerializer(serializers.ModelSerializer):
 
     def validate_passenger_email(self, value):
         """Validate and normalize passenger email."""
-        return value.lower().strip()
+        return normalize_email(value)
 
     def validate(self, data):
         """Validate no duplicate email on the same flight when updating."""
@@ -67,7 +77,7 @@ class ReservationSerializer(serializers.ModelSerializer):
             # Check if this email already has an active reservation for this flight
             duplicate_check = Reservation.objects.filter(
                 flight=flight,
-                passenger_email__iexact=passenger_email,
+                passenger_email=passenger_email,
                 status=True
             )
 
@@ -100,15 +110,33 @@ class ReservationListSerializer(serializers.ModelSerializer):
             'status_display',
             'created_at',
         ]
+        # Columns read by computed fields (for ?fields= query pruning)
+        field_columns = {'status_display': ['status']}
 
     def get_status_display(self, obj):
         """Return human-readable status."""
         return 'Active' if obj.status else 'Cancelled'
 
 
+class ReservationSummarySerializer(serializers.ModelSerializer):
+    """Reservation fields embedded in a flight (?expand=reservations)."""
+
+    class Meta:
+        model = Reservation
+        fields = [
+            'id',
+            'reservation_code',
+            'passenger_name',
+            'passenger_email',
+            'status',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+
 class ReservationCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating reservations."""
-    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.all())
+    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.active())
 
     class Meta:
         model = Reservation
@@ -123,7 +151,7 @@ class ReservationCreateSerializer(serializers.ModelSerializer):
 
     def validate_passenger_email(self, value):
         """Validate and normalize email."""
-        return value.lower().strip()
+        return normalize_email(value)
 
     def validate(self, data):
         """Validate flight capacity, departure time, and duplicate email."""
@@ -138,7 +166,7 @@ class ReservationCreateSerializer(serializers.ModelSerializer):
         # Check if this email already has an active reservation for this flight
         existing_reservation = Reservation.objects.filter(
             flight=flight,
-            passenger_email__iexact=passenger_email,
+            passenger_email=passenger_email,
             status=True
         ).exists()
 
@@ -147,12 +175,150 @@ class ReservationCreateSerializer(serializers.ModelSerializer):
                 f"An active reservation already exists for {passenger_email} on flight {flight.flight_number}."
             )
 
-        # Check capacity
+        # Check capacity (seats held during checkout count as taken)
         active_reservations = Reservation.objects.filter(flight=flight, status=True).count()
-        if active_reservations >= flight.airplane.capacity:
+        if flight.available_seats(active_reservations) <= 0:
+            # Later bookings for this flight are rejected from the cache
+            raise serializers.ValidationError(mark_sold_out(flight))
+
+        return data
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    """Serializer for creating and displaying seat holds."""
+    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.active())
+    seats = serializers.IntegerField(min_value=1, max_value=9, default=1)
+
+    class Meta:
+        model = SeatHold
+        fields = ['token', 'flight', 'seats', 'expires_at', 'created_at']
+        read_only_fields = ['token', 'expires_at', 'created_at']
+
+
+class SeatHoldConfirmSerializer(serializers.Serializer):
+    """Passenger details used to convert one held seat into a reservation."""
+    passenger_name = serializers.CharField(max_length=200)
+    passenger_email = serializers.EmailField(max_length=254)
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """Serializer for joining and displaying a flight's waitlist."""
+    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.active().select_related('airplane'))
+    status = serializers.SerializerMethodField()
+    position = serializers.SerializerMethodField()
+
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id',
+            'flight',
+            'passenger_name',
+            'passenger_email',
+            'status',
+            'position',
+            'reservation_code',
+            'created_at',
+            'promoted_at',
+        ]
+        read_only_fields = ['reservation_code', 'created_at', 'promoted_at']
+
+    def validate_passenger_name(self, value):
+        """Validate passenger name."""
+        value = value.strip()
+        if len(value) < 2:
+            raise serializers.ValidationError("Passenger name must be at least 2 characters.")
+        return value
+
+    def validate_passenger_email(self, value):
+        """Validate and normalize email."""
+        return normalize_email(value)
+
+    def validate(self, data):
+        """Only fully booked, future flights have a waitlist; one entry per passenger."""
+        flight = data.get('flight')
+        passenger_email = data.get('passenger_email')
+
+        from django.utils import timezone
+        if flight.departure_time < timezone.now():
+            raise serializers.ValidationError("Cannot join the waitlist of a flight that has already departed.")
+
+        if Reservation.objects.filter(flight=flight, passenger_email=passenger_email, status=True).exists():
+            raise serializers.ValidationError(
+                f"An active reservation already exists for {passenger_email} on flight {flight.flight_number}."
+            )
+
+        if WaitlistEntry.objects.filter(flight=flight, passenger_email=passenger_email, promoted_at__isnull=True).exists():
+            raise serializers.ValidationError(
+                f"{passenger_email} is already on the waitlist for flight {flight.flight_number}."
+            )
+
+        if not flight.is_fully_booked():
             raise serializers.ValidationError(
-                f"Flight {flight.flight_number} is fully booked. "
-                f"Capacity: {flight.airplane.capacity}"
+                f"Flight {flight.flight_number} has seats available; book it directly."
             )
 
         return data
+
+    def get_status(self, obj):
+        """Return 'waiting' or 'promoted'."""
+        return 'waiting' if obj.is_waiting() else 'promoted'
+
+    def get_position(self, obj):
+        """Return the place in the queue while waiting."""
+        return obj.position()
+
+
+class ReservationBulkCancelSerializer(serializers.Serializer):
+    """Selection criteria for cancelling many reservations at once."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=1000,
+    )
+    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.all(), required=False)
+    passenger_email = serializers.EmailField(required=False)
+
+    def validate_passenger_email(self, value):
+        """Normalize email."""
+        return normalize_email(value)
+
+    def validate(self, data):
+        """Require at least one criterion so a request can never cancel everything."""
+        if not data:
+            raise serializers.ValidationError("Provide at least one of: ids, flight, passenger_email.")
+        return data
+
+
+class ReservationTimelineSerializer(serializers.ModelSerializer):
+    """Serializer for the passenger timeline; flight fields come from the joined row."""
+    flight_number = serializers.CharField(source='flight.flight_number', read_only=True)
+    departure = serializers.CharField(source='flight.departure', read_only=True)
+    destination = serializers.CharField(source='flight.destination', read_only=True)
+    departure_time = serializers.DateTimeField(source='flight.departure_time', read_only=True)
+    arrival_time = serializers.DateTimeField(source='flight.arrival_time', read_only=True)
+    airplane_model = serializers.CharField(source='flight.airplane.model', read_only=True)
+    status_display = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Reservation
+        fields = [
+            'id',
+            'reservation_code',
+            'passenger_name',
+            'flight',
+            'flight_number',
+            'departure',
+            'destination',
+            'departure_time',
+            'arrival_time',
+            'airplane_model',
+            'status',
+            'status_display',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+    def get_status_display(self, obj):
+        """Return human-readable status."""
+        return 'Active' if obj.status else 'Cancelled'
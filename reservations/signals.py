@@ -0,0 +1,61 @@
+"""
+Signal handlers that keep the reservation code cache and the sold-out
+markers consistent, and hand seats added by capacity changes to the
+waitlist.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from airline_project.tracking import saved_changes
+from .cache import invalidate_codes
+from .models import Reservation
+from .throttling import clear_sold_out
+from .waitlist import promote_waitlist
+
+
+@receiver(post_save, sender=Reservation)
+def reservation_saved(sender, instance, **kwargs):
+    """Evict the cached payload after an update or cancellation."""
+    transaction.on_commit(lambda: invalidate_codes([instance.reservation_code]))
+    if not instance.status:
+        transaction.on_commit(lambda: clear_sold_out([instance.flight_id]))
+
+
+@receiver(post_save, sender='flights.Flight')
+def flight_saved(sender, instance, created, **kwargs):
+    """
+    Evict cached payloads embedding this flight's details and hand seats
+    gained by a capacity change to the waitlist.
+    """
+    if created:
+        return
+    changed = saved_changes(instance)
+    if changed - {'effective_capacity'}:
+        codes = list(instance.reservations.values_list('reservation_code', flat=True))
+        transaction.on_commit(lambda: invalidate_codes(codes))
+    # The flight may have moved to a larger airplane or gained seats through
+    # its capacity override or overbooking allowance
+    if 'effective_capacity' in changed:
+        transaction.on_commit(lambda: clear_sold_out([instance.id]))
+        promote_waitlist([instance.id])
+
+
+@receiver(post_save, sender='airplanes.Airplane')
+def airplane_saved(sender, instance, created, **kwargs):
+    """
+    Evict cached payloads embedding this airplane's details and drop the
+    sold-out markers of its flights after a capacity change.
+    """
+    if created:
+        return
+    changed = saved_changes(instance)
+    if changed & {'tail_number', 'model'}:
+        codes = list(Reservation.objects.filter(flight__airplane=instance).values_list('reservation_code', flat=True))
+        transaction.on_commit(lambda: invalidate_codes(codes))
+    if 'capacity' not in changed:
+        return
+    flight_ids = list(instance.flights.values_list('id', flat=True))
+    transaction.on_commit(lambda: clear_sold_out(flight_ids))
+    # flights.signals (installed first) has already re-resolved their effective capacity
+    promote_waitlist(flight_ids)
@@ -1,3 +1,454 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airline_project.testing import AdminTestCase, APITestCase, create_flight, create_reservation
+from .cancellations import bulk_cancel
+from .holds import reap_expired_holds
+from .idempotency import HEADER
+from .models import IdempotencyKey, Reservation, SeatHold
+from .throttling import AdaptiveConcurrencyLimiter, BookingRateThrottle
+
+
+class ReservationAdminTests(AdminTestCase):
+
+    def test_changelist_query_count_is_constant(self):
+        flights = [create_flight(), create_flight()]
+
+        def add_rows():
+            for number in range(20):
+                create_reservation(flights[number % 2])
+
+        add_rows()
+        self.assertConstantQueries('/admin/reservations/reservation/', add_rows)
+
+
+class ReservationListTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def test_filter_by_flight(self):
+        flight, other = create_flight(), create_flight()
+        reservation = create_reservation(flight)
+        create_reservation(other)
+
+        response = self.client.get('/api/reservations/', {'flight': flight.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [reservation.id])
+
+
+class ReservationCacheTests(APITestCase):
+
+    def test_airplane_save_evicts_cached_payloads(self):
+        reservation = create_reservation(create_flight())
+        url = f'/api/reservations/by-code/{reservation.reservation_code}/'
+        self.assertEqual(APIClient().get(url).data['flight_details']['airplane']['model'], 'A320')
+
+        airplane = reservation.flight.airplane
+        airplane.model = 'A321neo'
+        with self.captureOnCommitCallbacks(execute=True):
+            airplane.save()
+
+        self.assertEqual(APIClient().get(url).data['flight_details']['airplane']['model'], 'A321neo')
+
+
+@mock.patch('reservations.signals.promote_waitlist')
+@mock.patch('reservations.signals.invalidate_codes')
+class SaveSignalTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.flight = create_flight()
+        create_reservation(self.flight)
+
+    def save(self, instance, **changes):
+        for name, value in changes.items():
+            setattr(instance, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save()
+
+    def test_unchanged_flight(self, invalidate_codes, promote_waitlist):
+        self.save(self.flight)
+        invalidate_codes.assert_not_called()
+        promote_waitlist.assert_not_called()
+
+    def test_flight_capacity_change(self, invalidate_codes, promote_waitlist):
+        self.save(self.flight, capacity_override=100)
+        invalidate_codes.assert_not_called()
+        promote_waitlist.assert_called_once_with([self.flight.id])
+
+    def test_flight_display_change(self, invalidate_codes, promote_waitlist):
+        self.save(self.flight, flight_number='ZZ1')
+        invalidate_codes.assert_called_once()
+        promote_waitlist.assert_not_called()
+
+    def test_airplane_changes(self, invalidate_codes, promote_waitlist):
+        airplane = self.flight.airplane
+        self.save(airplane, production_year=2012)
+        invalidate_codes.assert_not_called()
+        promote_waitlist.assert_not_called()
+
+        self.save(airplane, capacity=180)
+        promote_waitlist.assert_called_once_with([self.flight.id])
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.effective_capacity, 180)
+
+
+class IdempotencyTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.flight = create_flight()
+
+    def book(self, email='jane@example.com', remote_addr='10.0.0.1'):
+        return APIClient(REMOTE_ADDR=remote_addr).post(
+            '/api/reservations/',
+            {'flight': self.flight.id, 'passenger_name': 'Jane Doe', 'passenger_email': email},
+            format='json',
+            headers={HEADER: 'attempt-1'},
+        )
+
+    def test_retry_replays_response(self):
+        first = self.book()
+        self.assertEqual(first.status_code, 201)
+        retry = self.book()
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_keys_are_scoped_per_client(self):
+        self.assertEqual(self.book().status_code, 201)
+        other = self.book(email='john@example.com', remote_addr='10.0.0.2')
+        self.assertEqual(other.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', other)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_in_flight_request_returns_conflict(self):
+        IdempotencyKey.objects.create(
+            client='ip:10.0.0.1', key='attempt-1', endpoint='POST /api/reservations/',
+            request_hash='', expires_at=timezone.now() + timedelta(days=1),
+        )
+        response = self.book()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(Reservation.objects.exists())
+
+
+class SeatHoldTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.flight = create_flight(capacity_override=2)
+
+    def hold(self, seats):
+        return self.client.post('/api/holds/', {'flight': self.flight.id, 'seats': seats}, format='json')
+
+    def confirm(self, token, email='jane@example.com'):
+        return self.client.post(
+            f'/api/holds/{token}/confirm/', {'passenger_name': 'Jane Doe', 'passenger_email': email}, format='json'
+        )
+
+    def held_seats(self):
+        self.flight.refresh_from_db(fields=['held_seats'])
+        return self.flight.held_seats
+
+    def test_held_seats_count_against_capacity(self):
+        self.assertEqual(self.hold(2).status_code, 201)
+        self.assertEqual(self.held_seats(), 2)
+        self.assertEqual(self.hold(1).status_code, 400)
+        response = self.client.post('/api/reservations/', {
+            'flight': self.flight.id, 'passenger_name': 'John Doe', 'passenger_email': 'john@example.com',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_confirm_turns_one_held_seat_into_a_reservation(self):
+        token = self.hold(2).data['token']
+        response = self.confirm(token)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['remaining_held_seats'], 1)
+        self.assertEqual(self.held_seats(), 1)
+        self.assertTrue(Reservation.objects.filter(flight=self.flight, passenger_email='jane@example.com').exists())
+
+        self.assertEqual(self.confirm(token, email='john@example.com').status_code, 201)
+        self.assertEqual(self.held_seats(), 0)
+        self.assertEqual(self.client.get(f'/api/holds/{token}/').status_code, 404)
+
+    def test_failed_confirm_keeps_the_hold(self):
+        create_reservation(self.flight, passenger_email='jane@example.com')
+        token = self.hold(1).data['token']
+        # Already booked on this flight
+        self.assertEqual(self.confirm(token).status_code, 400)
+        self.assertEqual(self.held_seats(), 1)
+
+    def test_release(self):
+        token = self.hold(2).data['token']
+        self.assertEqual(self.client.delete(f'/api/holds/{token}/').status_code, 204)
+        self.assertEqual(self.held_seats(), 0)
+
+    def test_expired_holds(self):
+        token = self.hold(2).data['token']
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.confirm(token).status_code, 410)
+        self.assertEqual(self.held_seats(), 0)
+
+        # Expired holds still blocking a full flight are reaped by the next hold
+        self.hold(2)
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.hold(2).status_code, 201)
+        self.assertEqual(SeatHold.objects.count(), 1)
+        self.assertEqual(self.held_seats(), 2)
+
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(reap_expired_holds(), 1)
+        self.assertEqual(self.held_seats(), 0)
+
+
+class BulkCancelTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.flight = create_flight(capacity_override=3)
+        self.other = create_flight()
+        self.reservations = [create_reservation(self.flight) for _ in range(3)]
+        self.untouched = create_reservation(self.other)
+
+    def bulk_cancel(self, **criteria):
+        return self.client.post('/api/reservations/bulk-cancel/', criteria, format='json')
+
+    def test_cancel_by_ids_reports_flight_availability(self):
+        ids = [reservation.id for reservation in self.reservations[:2]]
+        response = self.bulk_cancel(ids=ids)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.data['cancelled_ids']), ids)
+        self.assertEqual(response.data['flights'], [{
+            'flight_id': self.flight.id,
+            'flight_number': self.flight.flight_number,
+            'available_seats': 2,
+            'total_capacity': 3,
+            'active_reservations': 1,
+            'is_fully_booked': False,
+        }])
+        self.assertEqual(Reservation.objects.filter(status=False, cancelled_at__isnull=False).count(), 2)
+
+        # Already cancelled reservations are skipped
+        self.assertEqual(self.bulk_cancel(ids=ids).data['cancelled'], 0)
+
+    def test_criteria_are_combined(self):
+        email = self.reservations[0].passenger_email
+        response = self.bulk_cancel(flight=self.flight.id, passenger_email=email.upper())
+        self.assertEqual(response.data['cancelled_ids'], [self.reservations[0].id])
+
+        response = self.bulk_cancel(flight=self.flight.id)
+        self.assertEqual(response.data['cancelled'], 2)
+        self.untouched.refresh_from_db()
+        self.assertTrue(self.untouched.status)
+
+    def test_criteria_are_required(self):
+        self.assertEqual(self.bulk_cancel().status_code, 400)
+        self.assertEqual(self.bulk_cancel(ids=[]).status_code, 400)
+        self.assertEqual(Reservation.objects.filter(status=True).count(), 4)
+
+
+class EmailLookupTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.flight = create_flight()
+
+    def book(self, email):
+        return self.client.post('/api/reservations/', {
+            'flight': self.flight.id, 'passenger_name': 'Jane Doe', 'passenger_email': email,
+        }, format='json')
+
+    def test_emails_are_stored_normalized(self):
+        self.assertEqual(self.book(' Jane.Doe@Example.COM ').status_code, 201)
+        self.assertEqual(Reservation.objects.get().passenger_email, 'jane.doe@example.com')
+
+    def test_lookups_ignore_case(self):
+        reservation = create_reservation(self.flight, passenger_email='jane.doe@example.com')
+        response = self.client.get('/api/reservations/', {'passenger_email': 'JANE.DOE@example.com'})
+        self.assertEqual([row['id'] for row in response.data['results']], [reservation.id])
+
+    def test_duplicate_booking_check_ignores_case(self):
+        create_reservation(self.flight, passenger_email='jane.doe@example.com')
+        self.assertEqual(self.book('Jane.Doe@Example.com').status_code, 400)
+
+
+class TimelineTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.email = 'jane@example.com'
+        now = timezone.now()
+        # Two upcoming flights share a departure time, so pages must tie-break on id
+        departures = [now + timedelta(days=days) for days in (3, 1, 2, 2, 4)]
+        self.upcoming = [
+            create_reservation(create_flight(departure_time=departure), passenger_email=self.email)
+            for departure in departures
+        ]
+        self.past = [
+            create_reservation(create_flight(departure_time=now - timedelta(days=days)), passenger_email=self.email)
+            for days in (2, 1, 3)
+        ]
+        create_reservation(create_flight(), passenger_email='john@example.com')
+
+    def timeline(self, **params):
+        response = self.client.get('/api/reservations/timeline/', {'passenger_email': self.email, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def walk(self, **params):
+        """Follow next_cursor through every page and return the reservation ids in order."""
+        ids, cursor = [], None
+        while True:
+            data = self.timeline(**params, **({'cursor': cursor} if cursor else {}))
+            ids += [row['id'] for row in data['results']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                return ids
+
+    def expected(self, reservations, descending=False):
+        ordered = sorted(reservations, key=lambda reservation: (reservation.flight_departure, reservation.id))
+        return [reservation.id for reservation in (ordered[::-1] if descending else ordered)]
+
+    def test_upcoming_pages(self):
+        self.assertEqual(self.walk(limit=2), self.expected(self.upcoming))
+        self.assertIsNone(self.timeline()['next_cursor'])
+
+    def test_past_pages(self):
+        self.assertEqual(self.walk(segment='past', limit=1), self.expected(self.past, descending=True))
+
+    def test_cancelled_bookings(self):
+        reservation = self.upcoming[0]
+        reservation.status = False
+        reservation.save()
+        self.assertEqual([row['id'] for row in self.timeline(status='false')['results']], [reservation.id])
+
+    def test_invalid_parameters(self):
+        url = '/api/reservations/timeline/'
+        self.assertEqual(self.client.get(url).status_code, 400)
+        for params in ({'segment': 'soon'}, {'cursor': 'not-a-cursor'}, {'cursor': 'WyJ4IiwgMV0='}):
+            response = self.client.get(url, {'passenger_email': self.email, **params})
+            self.assertEqual(response.status_code, 400, params)
+
+
+class BookingProtectionTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.flight = create_flight(capacity_override=1)
+
+    def book(self, email):
+        return self.client.post('/api/reservations/', {
+            'flight': self.flight.id, 'passenger_name': 'Jane Doe', 'passenger_email': email,
+        }, format='json')
+
+    def test_rate_limit(self):
+        with mock.patch.object(BookingRateThrottle, 'THROTTLE_RATES', {'booking': '2/min'}):
+            self.assertEqual(self.book('jane@example.com').status_code, 201)
+            self.assertEqual(self.book('john@example.com').status_code, 400)  # Fully booked
+            response = self.book('joan@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_sold_out_flights_are_rejected_without_queries(self):
+        reservation = create_reservation(self.flight)
+        first = self.book('jane@example.com')
+        self.assertEqual(first.status_code, 400)
+
+        with self.assertNumQueries(0):
+            second = self.book('john@example.com')
+        self.assertEqual(second.status_code, 400)
+        self.assertEqual(second.data, first.data)
+
+        # Freeing a seat invalidates the marker after commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/reservations/{reservation.id}/cancel/')
+        self.assertEqual(self.book('john@example.com').status_code, 201)
+
+    def test_load_shedding(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=1, latency_threshold=0.05)
+        self.assertTrue(limiter.acquire())
+        with mock.patch('reservations.throttling.booking_limiter', limiter):
+            response = self.book('jane@example.com')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+        # Slow queries shrink the cap down to min_limit; fast ones grow it back
+        limiter = AdaptiveConcurrencyLimiter(max_limit=4, latency_threshold=0.05)
+        limiter.record(1.0)
+        limiter.acquire()
+        limiter.release()
+        self.assertEqual(limiter.limit, 3)
+        limiter.latency = 0.0
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release()
+        self.assertEqual(limiter.limit, 4)
+
+
+class WaitlistTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.flight = create_flight(capacity_override=2)
+        self.booked = [create_reservation(self.flight) for _ in range(2)]
+
+    def join(self, email):
+        return self.client.post('/api/waitlist/', {
+            'flight': self.flight.id, 'passenger_name': 'Jane Doe', 'passenger_email': email,
+        }, format='json')
+
+    def entry(self, response):
+        return self.client.get(f"/api/waitlist/{response.data['id']}/").data
+
+    def test_only_full_flights_have_a_waitlist(self):
+        self.booked[0].cancel()
+        self.assertEqual(self.join('jane@example.com').status_code, 400)
+
+    def test_queue_positions(self):
+        first, second = self.join('jane@example.com'), self.join('john@example.com')
+        self.assertEqual((first.status_code, second.status_code), (201, 201))
+        self.assertEqual([self.entry(first)['position'], self.entry(second)['position']], [1, 2])
+        self.assertEqual(self.join('JANE@example.com').status_code, 400)
+
+    def test_cancellation_promotes_oldest_entry(self):
+        first, second = self.join('jane@example.com'), self.join('john@example.com')
+        response = self.client.post(f'/api/reservations/{self.booked[0].id}/cancel/')
+        self.assertEqual(response.data['flight_info']['available_seats'], 0)
+
+        promoted = self.entry(first)
+        self.assertEqual(promoted['status'], 'promoted')
+        reservation = Reservation.objects.get(reservation_code=promoted['reservation_code'])
+        self.assertEqual((reservation.passenger_email, reservation.status), ('jane@example.com', True))
+        self.assertEqual(self.entry(second)['position'], 1)
+
+        # Promoted entries can no longer be left; waiting ones can
+        self.assertEqual(self.client.delete(f"/api/waitlist/{first.data['id']}/").status_code, 400)
+        self.assertEqual(self.client.delete(f"/api/waitlist/{second.data['id']}/").status_code, 204)
+
+    def test_passengers_who_booked_directly_are_skipped(self):
+        first, second = self.join('jane@example.com'), self.join('john@example.com')
+        create_reservation(self.flight, passenger_email='jane@example.com')
+        bulk_cancel(Reservation.objects.filter(id__in=[reservation.id for reservation in self.booked]))
+
+        self.assertEqual(self.client.get(f"/api/waitlist/{first.data['id']}/").status_code, 404)
+        self.assertEqual(self.entry(second)['status'], 'promoted')
+        self.assertEqual(Reservation.objects.filter(flight=self.flight, status=True).count(), 2)
+
+    def test_capacity_increase_promotes(self):
+        first, second = self.join('jane@example.com'), self.join('john@example.com')
+        response = self.client.patch(f'/api/flights/{self.flight.id}/', {'capacity_override': 3}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([self.entry(first)['status'], self.entry(second)['status']], ['promoted', 'waiting'])
@@ -0,0 +1,197 @@
+"""
+Load protection for the booking endpoints.
+
+Three layers keep a sale launch from saturating the database:
+
+- Rate limits: ``BookingRateThrottle`` (per client address) and
+  ``FlightBookingRateThrottle`` (per flight, across all clients) are regular
+  DRF throttles. Their counters live in the default cache, so they are shared
+  by every worker once CACHE_BACKEND points at a shared backend such as Redis.
+  Throttled requests get 429 with Retry-After.
+- Fast reject: when a booking fails because the flight is full, the flight is
+  marked sold out in the cache. Later bookings for it are answered with the
+  same "fully booked" error before any query runs. Whenever seats are freed
+  (cancellations, released holds, capacity or airplane changes) the flight's
+  seat version is replaced after commit, which invalidates the marker; a
+  request that counted seats before that commit can therefore not bring a
+  stale marker back. Markers expire after settings.SOLD_OUT_CACHE_TTL
+  seconds in any case.
+- Load shedding: ``booking_limiter`` caps the number of booking requests a
+  worker runs at once. The cap adapts to database latency: it shrinks while
+  the moving average of query time is above
+  settings.BOOKING_DB_LATENCY_THRESHOLD and grows back by about one slot per
+  full window of fast requests. Requests over the cap get 503 with
+  Retry-After instead of queueing for a connection.
+"""
+from functools import wraps
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.throttling import SimpleRateThrottle
+
+from flights.models import Flight
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the query latency moving average
+LATENCY_SMOOTHING = 0.2
+
+# Factor the concurrency cap shrinks by, at most once per DECREASE_INTERVAL
+DECREASE_FACTOR = 0.75
+DECREASE_INTERVAL = 0.5  # seconds
+
+
+class BookingRateThrottle(SimpleRateThrottle):
+    """Limit how fast a single client can book (settings.BOOKING_RATE)."""
+    scope = 'booking'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class FlightBookingRateThrottle(SimpleRateThrottle):
+    """Limit how fast one flight is booked by all clients together (settings.FLIGHT_BOOKING_RATE)."""
+    scope = 'flight_booking'
+
+    def get_cache_key(self, request, view):
+        flight_id = _flight_id(request)
+        if flight_id is None:
+            # Invalid requests are rejected by validation anyway
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': flight_id}
+
+
+def _flight_id(request):
+    try:
+        return int(request.data.get('flight'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _sold_out_key(flight_id):
+    return f'flight:sold-out:{flight_id}'
+
+
+def _seats_version_key(flight_id):
+    return f'flight:seats-version:{flight_id}'
+
+
+def mark_sold_out(flight):
+    """
+    Remember that ``flight`` is full; return the "fully booked" message.
+
+    The seat version is read before the seats are recounted, so the marker
+    is invalid from the start if seats were freed in the meantime.
+    """
+    message = f"Flight {flight.flight_number} is fully booked. Capacity: {flight.effective_capacity}"
+    version = cache.get(_seats_version_key(flight.id))
+    current = Flight.objects.with_seat_counts().filter(pk=flight.id).first()
+    if current is not None and current.available_seats() <= 0:
+        cache.set(_sold_out_key(flight.id), (version, message), settings.SOLD_OUT_CACHE_TTL)
+    return message
+
+
+def clear_sold_out(flight_ids):
+    """Invalidate the sold-out marker of ``flight_ids`` (seats were freed)."""
+    version = uuid.uuid4().hex
+    cache.set_many({_seats_version_key(flight_id): version for flight_id in flight_ids}, None)
+    cache.delete_many([_sold_out_key(flight_id) for flight_id in flight_ids])
+
+
+def sold_out_message(request):
+    """Return the "fully booked" message if the requested flight is marked sold out, else None."""
+    flight_id = _flight_id(request)
+    if flight_id is None:
+        return None
+    values = cache.get_many([_sold_out_key(flight_id), _seats_version_key(flight_id)])
+    marker = values.get(_sold_out_key(flight_id))
+    if marker is None or marker[0] != values.get(_seats_version_key(flight_id)):
+        return None
+    return marker[1]
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Per-process cap on concurrent requests, adjusted from database latency.
+
+    ``max_limit`` of 0 disables the limiter.
+    """
+
+    def __init__(self, max_limit, latency_threshold, min_limit=1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_threshold = latency_threshold
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.latency = 0.0  # moving average of query time, in seconds
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a slot; return False if the request should be shed."""
+        with self._lock:
+            if self.max_limit and self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        """Give back a slot and adjust the cap to the current latency."""
+        with self._lock:
+            self.in_flight -= 1
+            if not self.max_limit:
+                return
+            if self.latency > self.latency_threshold:
+                now = time.monotonic()
+                if now - self._last_decrease >= DECREASE_INTERVAL:
+                    self.limit = max(self.min_limit, self.limit * DECREASE_FACTOR)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def record(self, seconds):
+        with self._lock:
+            self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+
+    def time_query(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook feeding query times into the average."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(time.perf_counter() - start)
+
+
+booking_limiter = AdaptiveConcurrencyLimiter(
+    max_limit=settings.BOOKING_CONCURRENCY_LIMIT,
+    latency_threshold=settings.BOOKING_DB_LATENCY_THRESHOLD / 1000,
+)
+
+
+def shed_load(view_method):
+    """Run a booking view under ``booking_limiter``, answering 503 when it is full."""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if not booking_limiter.acquire():
+            logger.warning(
+                f'Booking request shed: {booking_limiter.in_flight} in flight, '
+                f'limit {int(booking_limiter.limit)}, query latency {booking_limiter.latency * 1000:.1f} ms'
+            )
+            return Response(
+                {'error': 'The booking service is busy. Please retry shortly.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(settings.BOOKING_RETRY_AFTER)},
+            )
+        try:
+            with connection.execute_wrapper(booking_limiter.time_query):
+                return view_method(self, request, *args, **kwargs)
+        finally:
+            booking_limiter.release()
+    return wrapper
@@ -2,7 +2,7 @@
 from rest_framework.routers import DefaultRouter
 
 # Import our viewset
-from .views import ReservationViewSet
+from .views import ReservationViewSet, SeatHoldViewSet, WaitlistViewSet
 
 # Create a router instance
 router = DefaultRouter()
@@ -17,5 +17,18 @@ router = DefaultRouter()
 # Note: No DELETE operation since we excluded DestroyModelMixin
 router.register(r'reservations', ReservationViewSet, basename='reservation')
 
+# Register the SeatHoldViewSet
+# - POST /holds/ -> Hold seats on a flight during checkout
+# - GET /holds/{token}/ -> Get hold details
+# - DELETE /holds/{token}/ -> Release held seats
+# - POST /holds/{token}/confirm/ -> Convert a held seat into a reservation
+router.register(r'holds', SeatHoldViewSet, basename='seat-hold')
+
+# Register the WaitlistViewSet
+# - POST /waitlist/ -> Join the waitlist of a fully booked flight
+# - GET /waitlist/{id}/ -> Get entry status and queue position
+# - DELETE /waitlist/{id}/ -> Leave the waitlist
+router.register(r'waitlist', WaitlistViewSet, basename='waitlist')
+
 # Export the URL patterns
 urlpatterns = router.urls
@@ -1,19 +1,46 @@
-from rest_framework import viewsets, status, mixins
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, Subquery
+from django.utils import timezone
+from rest_framework import viewsets, status, mixins, serializers
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import Reservation
+from airline_project.expansions import Expansion, ExpandMixin
+from airline_project.fieldsets import SparseFieldsetMixin
+from airline_project.pagination import KeysetPagination
+from airplanes.serializers import AirplaneListSerializer
+from flights.models import Flight
+from flights.serializers import FlightListSerializer
+from .models import Reservation, SeatHold, WaitlistEntry, normalize_email
 from .serializers import (
     ReservationSerializer,
     ReservationListSerializer,
-    ReservationCreateSerializer
+    ReservationCreateSerializer,
+    SeatHoldSerializer,
+    SeatHoldConfirmSerializer,
+    WaitlistEntrySerializer,
+    ReservationBulkCancelSerializer,
+    ReservationTimelineSerializer,
 )
 from .emails import send_reservation_confirmation_email, send_cancellation_email
+from .holds import create_hold, release_hold
+from .cancellations import bulk_cancel, flight_availability
+from .cache import get_reservation_payload, get_reservation_payloads
+from .idempotency import idempotent
+from .throttling import BookingRateThrottle, FlightBookingRateThrottle, shed_load, sold_out_message
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of reservation codes per batch request
+RESERVATION_BATCH_MAX = 500
+
 
-class ReservationViewSet(mixins.CreateModelMixin,
+class ReservationViewSet(SparseFieldsetMixin,
+                          ExpandMixin,
+                          mixins.CreateModelMixin,
                           mixins.RetrieveModelMixin,
                           mixins.UpdateModelMixin,
                           mixins.ListModelMixin,
@@ -23,9 +50,24 @@ class ReservationViewSet(mixins.CreateModelMixin,
 
     Uses mixins for selective CRUD operations (no DELETE).
     Reservations should be cancelled, not deleted, for record-keeping.
+    List and detail responses can be narrowed with ?fields= and embed the
+    flight (and its airplane) with ?expand=.
     """
     queryset = Reservation.objects.select_related('flight', 'flight__airplane').all()
     serializer_class = ReservationSerializer
+    expansions = {
+        # Flights are fetched once per page with their seat counts, instead of
+        # being joined to every row and counted one by one
+        'flight': Expansion(
+            FlightListSerializer,
+            prefetched=True,
+            prepare=lambda queryset, limit: queryset.select_related(None).prefetch_related(Prefetch(
+                'flight', queryset=Flight.objects.select_related('airplane').with_seat_counts(),
+            )),
+        ),
+        # Joined by the flight prefetch
+        'flight.airplane': Expansion(AirplaneListSerializer),
+    }
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -35,6 +77,12 @@ class ReservationViewSet(mixins.CreateModelMixin,
             return ReservationListSerializer
         return ReservationSerializer
 
+    def get_throttles(self):
+        """Rate limit bookings per client and per flight."""
+        if self.action == 'create':
+            return [BookingRateThrottle(), FlightBookingRateThrottle()]
+        return super().get_throttles()
+
     def get_queryset(self):
         """Apply filters based on query parameters."""
         queryset = super().get_queryset()
@@ -50,15 +98,41 @@ class ReservationViewSet(mixins.CreateModelMixin,
         if flight_id:
             queryset = queryset.filter(flight_id=flight_id)
 
+            # Adding the partition key lets PostgreSQL scan a single partition; as an
+            # uncorrelated subquery it is pruned at execution time, in the same query
+            queryset = queryset.filter(
+                flight_departure=Subquery(Flight.objects.filter(pk=flight_id).values('departure_time')[:1])
+            )
+
+        # Filter by flight departure date (prunes to one monthly partition)
+        departure_date = self.request.query_params.get('departure_date')
+        if departure_date:
+            try:
+                day = datetime.strptime(departure_date, '%Y-%m-%d').date()
+                start = timezone.make_aware(datetime.combine(day, time.min))
+                queryset = queryset.filter(
+                    flight_departure__gte=start,
+                    flight_departure__lt=start + timedelta(days=1),
+                )
+            except ValueError:
+                pass  # Invalid date format, skip filtering
+
         # Filter by passenger email
         email = self.request.query_params.get('passenger_email')
         if email:
-            queryset = queryset.filter(passenger_email__iexact=email)
+            queryset = queryset.filter(passenger_email=normalize_email(email))
 
         return queryset
 
+    @shed_load
+    @idempotent
     def create(self, request, *args, **kwargs):
-        """Create reservation and send confirmation email."""
+        """Create reservation and send confirmation email (honours Idempotency-Key)."""
+        # Flights known to be full are rejected without running the validation queries
+        sold_out = sold_out_message(request)
+        if sold_out:
+            return Response({'non_field_errors': [sold_out]}, status=status.HTTP_400_BAD_REQUEST)
+
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
@@ -84,8 +158,9 @@ class ReservationViewSet(mixins.CreateModelMixin,
         return Response(response_data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'], url_path='cancel')
+    @idempotent
     def cancel(self, request, pk=None):
-        """Cancel reservation and send cancellation email."""
+        """Cancel reservation and send cancellation email (honours Idempotency-Key)."""
         reservation = self.get_object()
 
         if not reservation.status:
@@ -94,25 +169,280 @@ class ReservationViewSet(mixins.CreateModelMixin,
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get flight info before cancellation
-        flight = reservation.flight
-
         # Cancel the reservation
         reservation.cancel()
         email_sent = send_cancellation_email(reservation)
 
         logger.info(f'Reservation cancelled: {reservation.reservation_code}')
 
-        # Return updated flight availability info
+        # Return updated flight availability info (single grouped query)
+        flight_info = flight_availability([reservation.flight_id])[0]
+        flight_info.pop('flight_id')
+
         return Response({
             'message': 'Reservation cancelled successfully.',
             'reservation_code': reservation.reservation_code,
             'email_sent': email_sent,
-            'flight_info': {
-                'flight_number': flight.flight_number,
-                'available_seats': flight.available_seats(),
-                'total_capacity': flight.airplane.capacity,
-                'active_reservations': flight.get_reservation_count(),
-                'is_fully_booked': flight.is_fully_booked()
-            }
+            'flight_info': flight_info,
+        })
+
+    @action(detail=False, methods=['get'], url_path='timeline')
+    def timeline(self, request):
+        """
+        List a passenger's bookings as an upcoming or past timeline.
+
+        Query Parameters:
+        - passenger_email: Passenger email (required)
+        - segment: 'upcoming' (default, soonest first) or 'past' (most recent first)
+        - status: 'true' for active (default) or 'false' for cancelled bookings
+        - cursor: Cursor from the previous page's next_cursor
+        - limit: Number of items per page (default: 20, max: 100)
+
+        Served by the (passenger_email, status, flight_departure) index with
+        keyset pagination, so no COUNT query runs and deep pages stay cheap.
+        """
+        email = request.query_params.get('passenger_email')
+        if not email:
+            return Response(
+                {'error': 'passenger_email query parameter is required.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        segment = request.query_params.get('segment', 'upcoming')
+        if segment not in ('upcoming', 'past'):
+            return Response(
+                {'error': "segment must be 'upcoming' or 'past'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        is_active = request.query_params.get('status', 'true').lower() == 'true'
+        queryset = Reservation.objects.select_related('flight', 'flight__airplane').filter(
+            passenger_email=normalize_email(email),
+            status=is_active,
+        )
+
+        now = timezone.now()
+        if segment == 'upcoming':
+            queryset = queryset.filter(flight_departure__gte=now)
+        else:
+            queryset = queryset.filter(flight_departure__lt=now)
+
+        paginator = KeysetPagination('flight_departure', descending=segment == 'past')
+        reservations, next_cursor = paginator.paginate_queryset(queryset, request)
+
+        return Response({
+            'segment': segment,
+            'next_cursor': next_cursor,
+            'results': ReservationTimelineSerializer(reservations, many=True).data,
+        })
+
+    @action(detail=False, methods=['get'], url_path=r'by-code/(?P<code>[A-Za-z0-9]{8})')
+    def by_code(self, request, code=None):
+        """Get reservation details by reservation code (served from cache when hot)."""
+        payload = get_reservation_payload(code)
+        if payload is None:
+            return Response(
+                {'error': f'Reservation {code.upper()} not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(payload)
+
+    @action(detail=False, methods=['get'], url_path='batch')
+    def batch(self, request):
+        """
+        Get many reservations by code in one request.
+
+        Query Parameters:
+        - codes: Comma-separated reservation codes (required, max 500)
+
+        Returns results keyed by code (same payload as by-code, read through the
+        same cache); unknown codes map to null and are listed in not_found.
+        """
+        codes = list(dict.fromkeys(
+            code.strip().upper() for code in request.query_params.get('codes', '').split(',') if code.strip()
+        ))
+        if not codes:
+            return Response({'error': 'codes query parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(codes) > RESERVATION_BATCH_MAX:
+            return Response(
+                {'error': f'At most {RESERVATION_BATCH_MAX} codes can be requested at once.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        invalid = [code for code in codes if len(code) != 8 or not code.isalnum()]
+        if invalid:
+            return Response(
+                {'error': f'Invalid reservation code(s): {", ".join(invalid[:10])}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        payloads = get_reservation_payloads(codes)
+        return Response({
+            'count': len(payloads),
+            'results': {code: payloads.get(code) for code in codes},
+            'not_found': [code for code in codes if code not in payloads],
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk-cancel')
+    def bulk_cancel(self, request):
+        """
+        Cancel many reservations at once.
+
+        Body (at least one criterion, combined with AND):
+        - ids: List of reservation ids (max 1000)
+        - flight: Cancel every active reservation on this flight
+        - passenger_email: Cancel every active reservation for this email
+
+        Cancellation emails are queued and sent in the background.
+        """
+        serializer = ReservationBulkCancelSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        criteria = serializer.validated_data
+
+        queryset = Reservation.objects.all()
+        if 'ids' in criteria:
+            queryset = queryset.filter(id__in=criteria['ids'])
+        if 'flight' in criteria:
+            queryset = queryset.filter(flight=criteria['flight'])
+        if 'passenger_email' in criteria:
+            queryset = queryset.filter(passenger_email=criteria['passenger_email'])
+
+        cancelled_ids, flight_ids = bulk_cancel(queryset)
+
+        return Response({
+            'message': f'{len(cancelled_ids)} reservation(s) cancelled successfully.',
+            'cancelled': len(cancelled_ids),
+            'cancelled_ids': cancelled_ids,
+            'emails_queued': len(cancelled_ids),
+            'flights': flight_availability(flight_ids),
         })
+
+
+class SeatHoldViewSet(mixins.CreateModelMixin,
+                      mixins.RetrieveModelMixin,
+                      mixins.DestroyModelMixin,
+                      viewsets.GenericViewSet):
+    """
+    ViewSet for temporary seat holds taken during checkout.
+
+    A hold counts against flight capacity until it is confirmed into a
+    reservation, released (DELETE) or reaped after it expires.
+    """
+    queryset = SeatHold.objects.select_related('flight').all()
+    serializer_class = SeatHoldSerializer
+    lookup_field = 'token'
+
+    def get_throttles(self):
+        """Holds and confirmations count towards the booking rate limits."""
+        if self.action == 'create':
+            return [BookingRateThrottle(), FlightBookingRateThrottle()]
+        if self.action == 'confirm':
+            return [BookingRateThrottle()]
+        return super().get_throttles()
+
+    @shed_load
+    def create(self, request, *args, **kwargs):
+        """Hold seats on a flight."""
+        sold_out = sold_out_message(request)
+        if sold_out:
+            return Response({'error': sold_out}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            hold = create_hold(
+                serializer.validated_data['flight'].id,
+                seats=serializer.validated_data['seats'],
+            )
+        except DjangoValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(self.get_serializer(hold).data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        """Release the held seats back to the flight."""
+        release_hold(instance)
+        logger.info(f'Seat hold released: {instance.token}')
+
+    @action(detail=True, methods=['post'], url_path='confirm')
+    @shed_load
+    def confirm(self, request, token=None):
+        """Convert one held seat into a reservation and send confirmation email."""
+        passenger = SeatHoldConfirmSerializer(data=request.data)
+        passenger.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            hold = self.get_queryset().select_for_update(of=('self',)).get(pk=self.get_object().pk)
+
+            if hold.is_expired():
+                release_hold(hold)
+                return Response(
+                    {'error': 'Seat hold has expired.'},
+                    status=status.HTTP_410_GONE
+                )
+
+            # Free the held seat first so the regular capacity check can take it
+            # (not the waitlist); a validation error below rolls the release back.
+            release_hold(hold, seats=1, promote=False)
+            serializer = ReservationCreateSerializer(data={
+                **passenger.validated_data,
+                'flight': hold.flight_id,
+            })
+            serializer.is_valid(raise_exception=True)
+            reservation = serializer.save()
+
+        reservation = Reservation.objects.select_related('flight', 'flight__airplane').get(id=reservation.id)
+        email_sent = send_reservation_confirmation_email(reservation)
+
+        response_data = ReservationListSerializer(reservation).data
+        response_data['email_sent'] = email_sent
+        response_data['remaining_held_seats'] = hold.seats
+        response_data['message'] = 'Reservation created successfully!'
+
+        logger.info(f'Seat hold {hold.token} confirmed as {reservation.reservation_code}')
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+class WaitlistViewSet(mixins.CreateModelMixin,
+                      mixins.RetrieveModelMixin,
+                      mixins.DestroyModelMixin,
+                      viewsets.GenericViewSet):
+    """
+    ViewSet for flight waitlists.
+
+    Passengers join the waitlist of a fully booked flight instead of retrying
+    the booking; cancelled seats are given to the oldest entries (see
+    reservations.waitlist). Entries can be left (DELETE) until promoted.
+    """
+    queryset = WaitlistEntry.objects.all()
+    serializer_class = WaitlistEntrySerializer
+
+    def get_throttles(self):
+        """Joining counts towards the per-client booking rate limit."""
+        if self.action == 'create':
+            return [BookingRateThrottle()]
+        return super().get_throttles()
+
+    def perform_create(self, serializer):
+        try:
+            with transaction.atomic():
+                entry = serializer.save()
+        except IntegrityError:
+            # A concurrent request for the same passenger won the unique_waiting_passenger race
+            data = serializer.validated_data
+            raise serializers.ValidationError({'non_field_errors': [
+                f"{data['passenger_email']} is already on the waitlist for flight {data['flight'].flight_number}."
+            ]})
+        logger.info(f'Waitlist joined: {entry.passenger_email} on flight {entry.flight_id}')
+
+    def destroy(self, request, *args, **kwargs):
+        """Leave the waitlist."""
+        entry = self.get_object()
+        if not entry.is_waiting():
+            return Response(
+                {'error': f'Entry was already promoted to reservation {entry.reservation_code}; cancel that instead.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        entry.delete()
+        logger.info(f'Waitlist left: {entry.passenger_email} on flight {entry.flight_id}')
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,149 @@
+"""
+Flight waitlists.
+
+A passenger who finds a flight fully booked joins its waitlist instead of
+retrying. When cancellations free seats, ``promote_waitlist()`` hands them to
+the oldest waiting entries in the transaction that freed them:
+
+- the affected flights are locked once (bookings and other promotions on
+  them wait for the transaction);
+- free seats for all of them come from one grouped COUNT;
+- the first N waiting entries of every flight are picked by one query using
+  ``ROW_NUMBER() OVER (PARTITION BY flight_id ORDER BY created_at, id)``;
+- the reservations are written with one ``bulk_create()`` and the entries
+  marked promoted with one UPDATE.
+
+So the cost does not grow with the number of freed seats: cancelling 500
+reservations promotes up to 500 passengers in the same handful of queries.
+Promotion emails are queued after commit.
+"""
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from changes.log import record_changes
+from flights.availability import availability_hub
+from flights.connections import graph_cache
+from flights.models import Flight
+from .emails import queue_waitlist_promotion_emails
+from .models import Reservation, WaitlistEntry
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _free_seats(flights):
+    """Return ``{flight_id: free seats}`` for ``flights``, counted in one query."""
+    booked = dict(
+        Reservation.objects.filter(flight__in=flights, status=True)
+        .order_by()
+        .values('flight_id')
+        .annotate(count=Count('id'))
+        .values_list('flight_id', 'count')
+    )
+    return {flight.id: flight.available_seats(booked.get(flight.id, 0)) for flight in flights}
+
+
+def _next_in_line(free):
+    """Return the waiting entries that get the ``free`` seats (``{flight_id: seats}``)."""
+    entries = (
+        WaitlistEntry.objects.filter(flight_id__in=free, promoted_at__isnull=True)
+        .annotate(place=Window(RowNumber(), partition_by=[F('flight_id')], order_by=[F('created_at'), F('id')]))
+        .filter(place__lte=max(free.values()))
+    )
+    return [entry for entry in entries if entry.place <= free[entry.flight_id]]
+
+
+def _promote(entries, flights, now):
+    """Create one reservation per entry and mark the entries promoted."""
+    codes = Reservation.generate_reservation_codes(len(entries))
+    reservations = Reservation.objects.bulk_create([
+        Reservation(
+            passenger_name=entry.passenger_name,
+            passenger_email=entry.passenger_email,
+            flight_id=entry.flight_id,
+            flight_departure=flights[entry.flight_id].departure_time,
+            reservation_code=code,
+        )
+        for entry, code in zip(entries, codes)
+    ])
+    WaitlistEntry.objects.filter(id__in=[entry.id for entry in entries]).update(
+        promoted_at=now,
+        reservation_code=Case(
+            *[When(id=entry.id, then=Value(code)) for entry, code in zip(entries, codes)],
+            output_field=CharField(),
+        ),
+    )
+    return reservations
+
+
+def promote_waitlist(flight_ids, notify=True):
+    """
+    Fill the free seats of ``flight_ids`` from their waitlists, oldest entry first.
+
+    Call it in the transaction that freed the seats. Returns the created
+    reservations; promotion emails are queued after commit when ``notify``.
+    """
+    with transaction.atomic():
+        waiting = set(
+            WaitlistEntry.objects.filter(flight_id__in=flight_ids, promoted_at__isnull=True)
+            .order_by()
+            .values_list('flight_id', flat=True)
+            .distinct()
+        )
+        if not waiting:
+            return []
+
+        now = timezone.now()
+        flights = {
+            flight.id: flight
+            for flight in Flight.objects.active()
+            .filter(id__in=waiting, departure_time__gt=now)
+            .select_for_update(of=('self',))
+            .order_by('id')
+        }
+        free = {flight_id: seats for flight_id, seats in _free_seats(flights.values()).items() if seats > 0}
+
+        promoted = []
+        while free:
+            entries = _next_in_line(free)
+            # Passengers who booked the flight directly in the meantime leave the queue
+            booked = set(
+                Reservation.objects.filter(
+                    flight_id__in=free, status=True,
+                    passenger_email__in={entry.passenger_email for entry in entries},
+                ).values_list('flight_id', 'passenger_email')
+            )
+            duplicates = [entry.id for entry in entries if (entry.flight_id, entry.passenger_email) in booked]
+            entries = [entry for entry in entries if (entry.flight_id, entry.passenger_email) not in booked]
+            if entries:
+                promoted += _promote(entries, flights, now)
+            if not duplicates:
+                break
+
+            # The skipped entries' seats go to the next passengers in line
+            WaitlistEntry.objects.filter(id__in=duplicates).delete()
+            for entry in entries:
+                free[entry.flight_id] -= 1
+            free = {flight_id: seats for flight_id, seats in free.items() if seats > 0}
+
+        if not promoted:
+            return []
+
+        promoted_ids = [reservation.id for reservation in promoted]
+        promoted_flights = sorted({reservation.flight_id for reservation in promoted})
+        record_changes(Reservation, promoted_ids, 'created')
+
+        # bulk_create() skips post_save, so refresh the seat counts the signal handlers maintain
+        def refresh_seats():
+            for flight_id in promoted_flights:
+                graph_cache.seats_changed(flight_id)
+            availability_hub.publish(promoted_flights)
+        transaction.on_commit(refresh_seats)
+
+        if notify:
+            queue_waitlist_promotion_emails(promoted_ids)
+
+    logger.info(f'Promoted {len(promoted)} waitlisted passenger(s) on {len(promoted_flights)} flight(s)')
+    return promoted